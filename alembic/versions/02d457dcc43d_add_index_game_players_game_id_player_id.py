@@ -0,0 +1,30 @@
+"""Add index game_players (game_id, player_id)
+
+Revision ID: 02d457dcc43d
+Revises: 36ae04121301
+Create Date: 2026-10-19 15:10:37.263190
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "02d457dcc43d"
+down_revision: Union[str, Sequence[str], None] = "36ae04121301"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_game_players_game_id_player_id", "game_players", ["game_id", "player_id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_game_players_game_id_player_id", table_name="game_players")
@@ -0,0 +1,33 @@
+"""Add table revoked_sessions
+
+Revision ID: 120783ddd1a3
+Revises: da84c077d6fb
+Create Date: 2026-10-19 10:02:17.418530
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "120783ddd1a3"
+down_revision: Union[str, Sequence[str], None] = "da84c077d6fb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "revoked_sessions",
+        sa.Column("jti", sa.String(length=32), primary_key=True),
+        sa.Column("expires", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("revoked_sessions")
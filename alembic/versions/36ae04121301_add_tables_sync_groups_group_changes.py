@@ -0,0 +1,75 @@
+"""Add tables sync_groups and group_changes
+
+Revision ID: 36ae04121301
+Revises: 9c3391f2db52
+Create Date: 2026-10-19 14:41:52.117604
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "36ae04121301"
+down_revision: Union[str, Sequence[str], None] = "9c3391f2db52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "sync_groups",
+        sa.Column("player_group", sa.String(length=50), primary_key=True),
+        sa.Column("seq", sa.BigInteger(), nullable=False),
+    )
+    op.create_table(
+        "group_changes",
+        sa.Column("player_group", sa.String(length=50), primary_key=True),
+        sa.Column("entity", sa.String(length=20), primary_key=True),
+        sa.Column("entity_id", sa.UUID(as_uuid=True), primary_key=True),
+        sa.Column("seq", sa.BigInteger(), nullable=False),
+    )
+    op.create_index(
+        "ix_group_changes_player_group_seq", "group_changes", ["player_group", "seq"]
+    )
+
+    # Seed the feed with what already exists, so syncing from 0 yields a
+    # complete replica.
+    op.execute(
+        """
+        INSERT INTO group_changes (player_group, entity, entity_id, seq)
+        SELECT player_group, entity, entity_id,
+               row_number() OVER (
+                   PARTITION BY player_group ORDER BY changed_at, entity_id
+               )
+        FROM (
+            SELECT player_group, 'player' AS entity, id AS entity_id,
+                   updated_at AS changed_at
+            FROM players WHERE player_group IS NOT NULL
+            UNION ALL
+            SELECT player_group, 'game', id, updated_at
+            FROM games WHERE player_group IS NOT NULL
+            UNION ALL
+            SELECT g.player_group, 'round', m.id, m.created_at
+            FROM game_matches m JOIN games g ON g.id = m.game_id
+            WHERE g.player_group IS NOT NULL
+        ) existing
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO sync_groups (player_group, seq)
+        SELECT player_group, max(seq) FROM group_changes GROUP BY player_group
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_group_changes_player_group_seq", table_name="group_changes")
+    op.drop_table("group_changes")
+    op.drop_table("sync_groups")
@@ -0,0 +1,37 @@
+"""Add version to games and game_players
+
+Revision ID: 4f7284ff408b
+Revises: be012d527947
+Create Date: 2026-10-19 16:48:12.905531
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4f7284ff408b"
+down_revision: Union[str, Sequence[str], None] = "be012d527947"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "games",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "game_players",
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("game_players", "version")
+    op.drop_column("games", "version")
@@ -0,0 +1,142 @@
+"""Add table game_match_players and move round details into it
+
+Revision ID: 52057a5adafb
+Revises: dfaa4cc74642
+Create Date: 2026-10-19 13:17:29.650184
+
+"""
+
+import json
+from datetime import timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "52057a5adafb"
+down_revision: Union[str, Sequence[str], None] = "dfaa4cc74642"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+game_player_status = sa.Enum("active", "disabled", "deleted", name="game_player_status")
+
+
+def _iso_utc(value):
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.isoformat()
+
+
+def match_details(players, started_at, ended_at, winner_id) -> list[dict]:
+    """The details JSON as it was stored when this migration was written.
+
+    A frozen copy of src.game.service.match_details; migrations don't
+    import application code.
+    """
+    start, end = _iso_utc(started_at), _iso_utc(ended_at)
+    return [
+        {
+            "name": p.name,
+            "start_time": start,
+            "end_time": end,
+            "status": p.status,
+            "score": p.score,
+            "is_winner": p.player_id == winner_id,
+            "score_added": p.score_added,
+        }
+        for p in players
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("game_matches", sa.Column("started_at", sa.DateTime(), nullable=True))
+    op.create_table(
+        "game_match_players",
+        sa.Column("match_id", sa.UUID(as_uuid=True), primary_key=True),
+        sa.Column("player_id", sa.UUID(as_uuid=True), primary_key=True),
+        sa.Column("game_id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column("status", game_player_status, nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("score_added", sa.SmallInteger(), nullable=False),
+    )
+    op.create_index("ix_game_match_players_game_id", "game_match_players", ["game_id"])
+
+    # The old JSON only has player names; map them back to ids through the
+    # game's roster. Entries that no longer resolve are skipped.
+    op.execute(
+        """
+        INSERT INTO game_match_players
+            (match_id, player_id, game_id, status, score, score_added)
+        SELECT DISTINCT ON (m.id, gp.player_id)
+            m.id, gp.player_id, m.game_id,
+            (d->>'status')::game_player_status,
+            (d->>'score')::int,
+            (d->>'score_added')::int
+        FROM game_matches m
+        CROSS JOIN LATERAL json_array_elements(m.details::json) AS d
+        JOIN game_players gp ON gp.game_id = m.game_id
+        JOIN players p ON p.id = gp.player_id AND p.name = d->>'name'
+        WHERE m.details IS NOT NULL
+          AND d->>'status' IN ('active', 'disabled', 'deleted')
+        """
+    )
+    op.execute(
+        """
+        UPDATE game_matches
+        SET started_at =
+            ((details::json->0->>'start_time')::timestamptz AT TIME ZONE 'UTC')
+        WHERE details IS NOT NULL
+        """
+    )
+    # Drop the JSON only where every entry made it across; the rest keep
+    # serving history from details.
+    op.execute(
+        """
+        UPDATE game_matches m
+        SET details = NULL
+        WHERE details IS NOT NULL
+          AND json_array_length(details::json) = (
+              SELECT count(*) FROM game_match_players mp WHERE mp.match_id = m.id
+          )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    matches = bind.execute(
+        sa.text(
+            "SELECT id, created_at, started_at, winner_id FROM game_matches "
+            "WHERE details IS NULL"
+        )
+    ).all()
+    for match in matches:
+        players = bind.execute(
+            sa.text(
+                "SELECT mp.player_id, p.name, mp.status, mp.score, mp.score_added "
+                "FROM game_match_players mp JOIN players p ON p.id = mp.player_id "
+                "WHERE mp.match_id = :match_id"
+            ),
+            {"match_id": match.id},
+        ).all()
+        details = match_details(
+            players, match.started_at, match.created_at, match.winner_id
+        )
+        bind.execute(
+            sa.text(
+                "UPDATE game_matches SET details = :details "
+                "WHERE id = :id AND created_at = :created_at"
+            ),
+            {"details": json.dumps(details), "id": match.id, "created_at": match.created_at},
+        )
+
+    op.drop_index("ix_game_match_players_game_id", table_name="game_match_players")
+    op.drop_table("game_match_players")
+    game_player_status.drop(bind)
+    op.drop_column("game_matches", "started_at")
@@ -0,0 +1,42 @@
+"""Add jti to oauth_sessions
+
+Revision ID: 7d2e5b1c9a40
+Revises: ac653c41d9fd
+Create Date: 2026-10-19 21:14:07.532118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7d2e5b1c9a40"
+down_revision: Union[str, Sequence[str], None] = "ac653c41d9fd"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("oauth_sessions", sa.Column("jti", sa.String(32), nullable=True))
+    op.create_index("ix_oauth_sessions_jti", "oauth_sessions", ["jti"], unique=True)
+    # Signed sessions used their jti (token_urlsafe(16), 22 chars) as
+    # session_token; opaque tokens are 43 chars. Move the jti over and
+    # replace the session_token with one nobody holds.
+    op.execute(
+        "UPDATE oauth_sessions "
+        "SET jti = session_token, session_token = md5(random()::text || id::text) "
+        "WHERE length(session_token) = 22"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "UPDATE oauth_sessions SET session_token = jti WHERE jti IS NOT NULL"
+    )
+    op.drop_index("ix_oauth_sessions_jti", table_name="oauth_sessions")
+    op.drop_column("oauth_sessions", "jti")
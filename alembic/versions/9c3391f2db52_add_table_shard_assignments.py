@@ -0,0 +1,35 @@
+"""Add table shard_assignments
+
+Revision ID: 9c3391f2db52
+Revises: 52057a5adafb
+Create Date: 2026-10-19 14:02:11.408317
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9c3391f2db52"
+down_revision: Union[str, Sequence[str], None] = "52057a5adafb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "shard_assignments",
+        sa.Column("player_group", sa.String(length=50), primary_key=True),
+        sa.Column("shard", sa.String(length=50), nullable=False),
+        sa.Column("moving", sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("shard_assignments")
@@ -0,0 +1,84 @@
+"""Add default partitions to game_matches and game_logs
+
+Revision ID: ac653c41d9fd
+Revises: 4f7284ff408b
+Create Date: 2026-10-19 18:02:41.117306
+
+"""
+
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "ac653c41d9fd"
+down_revision: Union[str, Sequence[str], None] = "4f7284ff408b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copied from src.core.partitions at this revision, so the migration keeps
+# working however that module changes later.
+PARTITIONED_TABLES = {
+    "game_matches": "created_at",
+    "game_logs": "timestamp",
+}
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def add_months(day: datetime.date, months: int) -> datetime.date:
+    index = day.year * 12 + day.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def default_months(bind, table: str) -> list[datetime.date]:
+    """Months that have rows in the default partition."""
+    rows = bind.execute(
+        sa.text(
+            f"SELECT DISTINCT date_trunc('month', \"{PARTITIONED_TABLES[table]}\") "
+            f"FROM {default_partition_name(table)}"
+        )
+    ).scalars()
+    return sorted(month.date() for month in rows)
+
+
+def create_partition(bind, table: str, month: datetime.date):
+    """Move ``month``'s rows out of the default into their own partition."""
+    name = f"{table}_p{month.year:04d}_{month.month:02d}"
+    key = PARTITIONED_TABLES[table]
+    bounds = f"FROM ('{month}') TO ('{add_months(month, 1)}')"
+    bind.execute(sa.text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+    bind.execute(
+        sa.text(
+            f"WITH moved AS (DELETE FROM {default_partition_name(table)} "
+            f"WHERE \"{key}\" >= :start AND \"{key}\" < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {"start": month, "end": add_months(month, 1)},
+    )
+    bind.execute(
+        sa.text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds}")
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in PARTITIONED_TABLES:
+        op.execute(
+            f"CREATE TABLE {default_partition_name(table)} PARTITION OF {table} DEFAULT"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    for table in PARTITIONED_TABLES:
+        # Give the rows a month partition before their fallback goes away.
+        for month in default_months(bind, table):
+            create_partition(bind, table, month)
+        op.drop_table(default_partition_name(table))
@@ -0,0 +1,51 @@
+"""Add player_count and round_count to games
+
+Revision ID: be012d527947
+Revises: 02d457dcc43d
+Create Date: 2026-10-19 16:02:51.418377
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "be012d527947"
+down_revision: Union[str, Sequence[str], None] = "02d457dcc43d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "games",
+        sa.Column("player_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "games",
+        sa.Column("round_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.execute(
+        """
+        UPDATE games SET
+            player_count = (
+                SELECT count(*) FROM game_players
+                JOIN players ON players.id = game_players.player_id
+                WHERE game_players.game_id = games.id
+            ),
+            round_count = (
+                SELECT count(*) FROM game_matches
+                WHERE game_matches.game_id = games.id
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("games", "round_count")
+    op.drop_column("games", "player_count")
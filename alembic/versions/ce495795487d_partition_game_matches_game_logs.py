@@ -0,0 +1,139 @@
+"""Partition game_matches and game_logs by month
+
+Revision ID: ce495795487d
+Revises: e19c9b29b1db
+Create Date: 2026-10-19 11:26:03.584417
+
+"""
+
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "ce495795487d"
+down_revision: Union[str, Sequence[str], None] = "e19c9b29b1db"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+
+# Frozen copies of the src.core.partitions helpers as of this revision;
+# migrations don't import application code.
+def month_start(day: datetime.date) -> datetime.date:
+    return day.replace(day=1)
+
+
+def add_months(day: datetime.date, months: int) -> datetime.date:
+    index = day.year * 12 + day.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def create_partitions(bind, table: str, first: datetime.date, last: datetime.date):
+    """Create a ``<table>_pYYYY_MM`` partition for every month in the range."""
+    month = month_start(first)
+    while month <= last:
+        name = f"{table}_p{month.year:04d}_{month.month:02d}"
+        bind.execute(
+            sa.text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+            )
+        )
+        month = add_months(month, 1)
+
+
+def game_matches_columns():
+    return [
+        sa.Column("id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column("game_id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column("round", sa.Integer(), nullable=False),
+        sa.Column("winner_id", sa.UUID(as_uuid=True), nullable=True),
+        sa.Column("score", sa.Integer(), nullable=True),
+        sa.Column("details", sa.Text, nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    ]
+
+
+def game_logs_columns():
+    return [
+        sa.Column("id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column("game_id", sa.UUID(as_uuid=True), nullable=False),
+        sa.Column("player_id", sa.UUID(as_uuid=True), nullable=True),
+        sa.Column("action", sa.String(200), nullable=False),
+        sa.Column("details", sa.Text, nullable=True),
+        sa.Column(
+            "timestamp",
+            sa.DateTime,
+            nullable=False,
+            server_default=sa.text("CURRENT_TIMESTAMP"),
+        ),
+        sa.Column("created_by", sa.UUID(as_uuid=True), nullable=True),
+    ]
+
+
+def _move_aside(table: str):
+    # Free the table, primary key and index names for the new table.
+    op.rename_table(table, f"{table}_old")
+    op.execute(f"ALTER TABLE {table}_old RENAME CONSTRAINT {table}_pkey TO {table}_old_pkey")
+    op.execute(f"ALTER INDEX IF EXISTS ix_{table}_id RENAME TO ix_{table}_old_id")
+
+
+def _copy_back_and_drop(table: str, columns):
+    names = ", ".join(f'"{c.name}"' for c in columns())
+    op.execute(f"INSERT INTO {table} ({names}) SELECT {names} FROM {table}_old")
+    op.drop_table(f"{table}_old")
+
+
+def _partition(table: str, key: str, columns):
+    _move_aside(table)
+    op.create_table(
+        table,
+        *columns(),
+        # A partitioned table's primary key must contain the partition key.
+        sa.PrimaryKeyConstraint("id", key, name=f"{table}_pkey"),
+        postgresql_partition_by=f'RANGE ("{key}")',
+    )
+    op.create_index(f"ix_{table}_id", table, ["id"])
+
+    bind = op.get_bind()
+    oldest = bind.execute(sa.text(f'SELECT min("{key}") FROM {table}_old')).scalar()
+    this_month = month_start(datetime.datetime.utcnow().date())
+    first = month_start(oldest.date()) if oldest else this_month
+    create_partitions(bind, table, first, add_months(this_month, MONTHS_AHEAD))
+
+    _copy_back_and_drop(table, columns)
+
+
+def _unpartition(table: str, key: str, columns):
+    _move_aside(table)
+    op.create_table(
+        table,
+        *columns(),
+        sa.PrimaryKeyConstraint("id", name=f"{table}_pkey"),
+    )
+    _copy_back_and_drop(table, columns)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _partition("game_matches", "created_at", game_matches_columns)
+    op.create_index("ix_game_matches_game_id_round", "game_matches", ["game_id", "round"])
+
+    _partition("game_logs", "timestamp", game_logs_columns)
+    op.create_index("ix_game_logs_game_id", "game_logs", ["game_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Dropping the partitioned parent also drops its partitions.
+    op.drop_index("ix_game_logs_game_id", table_name="game_logs")
+    _unpartition("game_logs", "timestamp", game_logs_columns)
+
+    op.drop_index("ix_game_matches_game_id_round", table_name="game_matches")
+    _unpartition("game_matches", "created_at", game_matches_columns)
@@ -0,0 +1,73 @@
+"""Add tables users, oauth_sessions and game_details
+
+Revision ID: da84c077d6fb
+Revises: e30c661fd7c6
+Create Date: 2026-10-19 09:12:41.305118
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "da84c077d6fb"
+down_revision: Union[str, Sequence[str], None] = "e30c661fd7c6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # These tables used to be created by create_all() at app startup, so
+    # existing databases already have them.
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("name", sa.String(), nullable=True),
+            sa.Column("picture", sa.String(), nullable=True),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "oauth_sessions" not in existing:
+        op.create_table(
+            "oauth_sessions",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("user_id", sa.Integer(), nullable=True),
+            sa.Column("session_token", sa.String(), nullable=True),
+            sa.Column("expires", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_oauth_sessions_id", "oauth_sessions", ["id"])
+        op.create_index(
+            "ix_oauth_sessions_session_token",
+            "oauth_sessions",
+            ["session_token"],
+            unique=True,
+        )
+
+    if "game_details" not in existing:
+        op.create_table(
+            "game_details",
+            sa.Column("id", sa.UUID(as_uuid=True), primary_key=True),
+            sa.Column("game_id", sa.UUID(as_uuid=True), nullable=False),
+            sa.Column("winner_id", sa.UUID(as_uuid=True), nullable=True),
+            sa.Column("total_score", sa.Integer(), nullable=False),
+            sa.Column("details", sa.Text, nullable=True),
+            sa.Column("round_number", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("game_details")
+    op.drop_table("oauth_sessions")
+    op.drop_table("users")
@@ -0,0 +1,39 @@
+"""Add table game_archives
+
+Revision ID: dfaa4cc74642
+Revises: ce495795487d
+Create Date: 2026-10-19 12:08:44.931270
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "dfaa4cc74642"
+down_revision: Union[str, Sequence[str], None] = "ce495795487d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "game_archives",
+        sa.Column("game_id", sa.UUID(as_uuid=True), primary_key=True),
+        sa.Column("player_group", sa.String(length=50), nullable=True),
+        sa.Column("player_count", sa.Integer(), nullable=False),
+        sa.Column("winners", sa.Text, nullable=True),
+        sa.Column("payload", sa.LargeBinary(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_game_archives_player_group", "game_archives", ["player_group"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_game_archives_player_group", table_name="game_archives")
+    op.drop_table("game_archives")
@@ -0,0 +1,30 @@
+"""Add indexes on oauth_sessions expires and user_id
+
+Revision ID: e19c9b29b1db
+Revises: 120783ddd1a3
+Create Date: 2026-10-19 10:41:52.760213
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e19c9b29b1db"
+down_revision: Union[str, Sequence[str], None] = "120783ddd1a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_oauth_sessions_expires", "oauth_sessions", ["expires"])
+    op.create_index("ix_oauth_sessions_user_id", "oauth_sessions", ["user_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_oauth_sessions_user_id", table_name="oauth_sessions")
+    op.drop_index("ix_oauth_sessions_expires", table_name="oauth_sessions")
@@ -0,0 +1,21 @@
+"""Micro-benchmarks, run as ``python -m benchmarks.<name>``.
+
+Settings are read when ``src`` is first imported, so importing this package
+puts a throwaway environment in place first: a SQLite file in a temporary
+directory unless ``DATABASE_URL`` is already set.
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp(prefix='uno-bench-')}/bench.db"
+)
+os.environ.setdefault("GOOGLE_CLIENT_ID", "bench-client")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "bench-secret")
+os.environ.setdefault("SECRET_KEY", "bench-secret-key")
+os.environ.setdefault("FRONTEND_URL", "http://localhost:3000")
+os.environ.setdefault("FRONTEND_URL_DEV", "http://localhost:3000")
+os.environ.setdefault("BACKEND_URL", "http://localhost:8000")
+os.environ.setdefault("DB_POOL_WARM", "0")
+os.environ.setdefault("GAME_TIMER_TICK_SECONDS", "0")
@@ -0,0 +1,88 @@
+"""Cost of authenticating a request in each ``SESSION_MODE``.
+
+    python -m benchmarks.auth [--requests 5000] [--sessions 10000]
+
+Times ``get_current_user`` on its own: an opaque token is looked up in
+``oauth_sessions`` (plus the user row), a signed one is verified and
+checked against the in-memory revocation list. ``--sessions`` other
+sessions and as many revoked tokens are created first, so neither lookup
+runs against an empty table or list.
+"""
+
+import argparse
+import datetime
+import secrets
+import statistics
+import time
+from src.auth.models import OAuthSession, User
+from src.auth.service import create_session
+from src.core.config import settings
+from src.core.database import Base, SessionLocal, engine
+from src.core.security import revoked_tokens
+from src.dependencies import get_current_user
+from src.main import app  # noqa: F401  registers every model on Base.metadata
+
+
+def setup(sessions: int) -> User:
+    Base.metadata.create_all(engine)
+    expires = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=1)
+    db = SessionLocal()
+    try:
+        user = User(email="bench@example.com", name="Bench")
+        db.add(user)
+        db.flush()
+        db.add_all(
+            OAuthSession(
+                user_id=user.id,
+                session_token=secrets.token_urlsafe(32),
+                expires=expires,
+            )
+            for _ in range(sessions)
+        )
+        db.commit()
+        db.refresh(user)
+        db.expunge(user)
+    finally:
+        db.close()
+    revoked_tokens.replace(
+        {secrets.token_urlsafe(16): expires.timestamp() for _ in range(sessions)}
+    )
+    return user
+
+
+def measure(mode: str, user: User, requests: int) -> list[float]:
+    settings.SESSION_MODE = mode
+    db = SessionLocal()
+    try:
+        token = create_session(db, user)
+    finally:
+        db.close()
+    timings = []
+    for _ in range(requests):
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            get_current_user(token, db)
+            timings.append(time.perf_counter() - started)
+        finally:
+            db.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--sessions", type=int, default=10000)
+    args = parser.parse_args()
+
+    user = setup(args.sessions)
+    for mode in ("opaque", "signed"):
+        timings = sorted(measure(mode, user, args.requests))
+        print(
+            f"{mode:>7}: median {statistics.median(timings) * 1e6:7.1f} us, "
+            f"p99 {timings[int(len(timings) * 0.99)] * 1e6:7.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
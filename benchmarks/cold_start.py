@@ -0,0 +1,112 @@
+"""Cold start: from a new process to the first response it serves.
+
+    python -m benchmarks.cold_start [--runs 5]
+
+Each run starts a fresh interpreter that imports ``src.main``, runs the
+lifespan startup and then serves ``GET /auth/me`` for an existing session,
+which goes through the database. Runs with ``DB_POOL_WARM=0`` and with the
+default warm-up are reported separately. Set ``DATABASE_URL`` to measure
+against Postgres instead of a temporary SQLite file.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import secrets
+import statistics
+import subprocess
+import sys
+import time
+
+PHASES = ("interpreter", "import", "startup", "first_request", "total")
+
+
+def child():
+    started = time.perf_counter()
+    # Imported here, not at the top: importing the app is what is measured.
+    from fastapi.testclient import TestClient
+    from src.main import app
+
+    imported = time.perf_counter()
+    with TestClient(app) as client:
+        ready = time.perf_counter()
+        client.cookies.set("session_token", os.environ["BENCH_SESSION_TOKEN"])
+        response = client.get("/auth/me")
+        answered = time.perf_counter()
+        total = time.time() - float(os.environ["BENCH_SPAWNED_AT"])
+    assert response.status_code == 200, response.text
+    result = {
+        "interpreter": total - (answered - started),
+        "import": imported - started,
+        "startup": ready - imported,
+        "first_request": answered - ready,
+        "total": total,
+    }
+    print("RESULT " + json.dumps(result), flush=True)
+
+
+def create_session() -> str:
+    from src.auth.models import OAuthSession, User
+    from src.core.database import Base, SessionLocal, engine
+    from src.main import app  # noqa: F401  registers every model on Base.metadata
+
+    Base.metadata.create_all(engine)
+    token = secrets.token_urlsafe(32)
+    expires = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=1)
+    db = SessionLocal()
+    try:
+        user = User(email=f"{token}@example.com", name="Bench")
+        db.add(user)
+        db.flush()
+        db.add(OAuthSession(user_id=user.id, session_token=token, expires=expires))
+        db.commit()
+    finally:
+        db.close()
+    return token
+
+
+def run(env: dict) -> dict:
+    env = {**env, "BENCH_SPAWNED_AT": repr(time.time())}
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.cold_start", "--child"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    line = next(line for line in out.splitlines() if line.startswith("RESULT "))
+    return json.loads(line[len("RESULT "):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    # The children inherit the database (and everything else) set up by the
+    # benchmarks package, and find the session created here.
+    env = {
+        **os.environ,
+        "BENCH_SESSION_TOKEN": create_session(),
+        "LOG_LEVEL": "WARNING",
+    }
+    variants = {"no warm-up": "0", "warm-up": "2"}
+    results = {label: [] for label in variants}
+    # Interleaved, so a noisy stretch on the machine hits both alike.
+    for _ in range(args.runs):
+        for label, warm in variants.items():
+            results[label].append(run({**env, "DB_POOL_WARM": warm}))
+    for label, runs in results.items():
+        medians = {phase: statistics.median(r[phase] for r in runs) for phase in PHASES}
+        print(
+            f"{label:>10}: "
+            + ", ".join(f"{phase} {medians[phase] * 1e3:.0f} ms" for phase in PHASES)
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Per-round latency of ``PUT /game/play/winner``'s work, with and without
+the in-process game engine.
+
+    python -m benchmarks.game_engine [--rounds 2000]
+
+Calls the endpoint's ``_add_winner`` directly, so HTTP handling is left
+out. With ``GAME_ENGINE`` the journal is flushed once at the end and timed
+separately: that is the database work the engine moves off the request.
+"""
+
+import argparse
+import statistics
+import time
+from src.auth.models import User
+from src.core.config import settings
+from src.core.database import Base, SessionLocal, engine
+from src.game.engine import game_engine
+from src.game.models import Game, GamePlayer, Player
+from src.game.router import _add_winner
+from src.game.schemas import PlayerWinner
+from src.main import app  # noqa: F401  registers every model on Base.metadata
+
+
+def new_game(user: User) -> tuple[str, list[str]]:
+    group = "usergroup_" + str(user.id)
+    db = SessionLocal()
+    try:
+        players = [Player(name=name, player_group=group) for name in "ABCD"]
+        game = Game(
+            name="Bench",
+            player_group=group,
+            status="ongoing",
+            end_condition="score",
+            score_to_win=10**9,
+        )
+        db.add_all([*players, game])
+        db.flush()
+        db.add_all(GamePlayer(game_id=game.id, player_id=p.id) for p in players)
+        db.commit()
+        return str(game.id), [str(p.id) for p in players]
+    finally:
+        db.close()
+
+
+def play(user: User, rounds: int) -> list[float]:
+    game_id, player_ids = new_game(user)
+    timings = []
+    for i in range(rounds):
+        data = PlayerWinner(game_id=game_id, player_id=player_ids[i % 4])
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            _add_winner(data, user, db)
+            timings.append(time.perf_counter() - started)
+        finally:
+            db.close()
+    return timings
+
+
+def report(label: str, timings: list[float]):
+    timings = sorted(timings)
+    print(
+        f"{label:>10}: median {statistics.median(timings) * 1e6:8.1f} us, "
+        f"p99 {timings[int(len(timings) * 0.99)] * 1e6:8.1f} us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    # The audit writer isn't running here, so keep each run under its queue
+    # size (AUDIT_MAX_PENDING): past that every round waits for a slot.
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    user = User(email="bench@example.com", name="Bench")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.expunge(user)
+    db.close()
+
+    settings.GAME_ENGINE = False
+    report("database", play(user, args.rounds))
+
+    settings.GAME_ENGINE = True
+    report("engine", play(user, args.rounds))
+    started = time.perf_counter()
+    game_engine.journal.flush()
+    elapsed = time.perf_counter() - started
+    print(f"{'flush':>10}: {elapsed * 1e3:8.1f} ms for {args.rounds} rounds")
+
+
+if __name__ == "__main__":
+    main()
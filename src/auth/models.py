@@ -12,6 +12,13 @@ class User(Base):
 class OAuthSession(Base):
     __tablename__ = "oauth_sessions"
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer)
+    user_id = Column(Integer, index=True)
     session_token = Column(String, unique=True, index=True)
-    expires = Column(DateTime, default=lambda: datetime.datetime.utcnow())
+    jti = Column(String(32), unique=True, index=True)  # set for signed sessions
+    expires = Column(DateTime, default=lambda: datetime.datetime.utcnow(), index=True)
+
+
+class RevokedSession(Base):
+    __tablename__ = "revoked_sessions"
+    jti = Column(String(32), primary_key=True)
+    expires = Column(DateTime, nullable=False)
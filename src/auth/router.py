@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, Response, HTTPException
 from sqlalchemy.orm import Session
 from src.auth import service, schemas
 from src.core.database import SessionLocal
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import RedirectResponse
 from datetime import datetime
 from src.core.database import SessionLocal
@@ -37,10 +38,13 @@ def login():
 
 
 @router.get("/callback", response_model=schemas.UserOut)
-def callback(code: str, response: Response, db: Session = Depends(get_db)):
-    info = service.exchange_code(code, redirect_uri=f"{BACKEND_URL}/auth/callback")
-    user = service.get_or_create_user(db, info)
-    token = service.create_session(db, user)
+async def callback(code: str, response: Response, db: Session = Depends(get_db)):
+    info = await service.exchange_code(
+        code, redirect_uri=f"{BACKEND_URL}/auth/callback"
+    )
+    # The DB work is still blocking, keep it off the event loop.
+    user = await run_in_threadpool(service.get_or_create_user, db, info)
+    token = await run_in_threadpool(service.create_session, db, user)
     redirect = RedirectResponse(
         url=settings.FRONTEND_URL_DEV + "/callback-success", status_code=303
     )
@@ -48,10 +52,10 @@ def callback(code: str, response: Response, db: Session = Depends(get_db)):
         key="session_token",
         value=token,
         httponly=True,
-        secure=True,
-        samesite="none",
+        secure=settings.COOKIE_SECURE,
+        samesite=settings.COOKIE_SAMESITE,
         max_age=30 * 24 * 3600,
-        domain=".up.railway.app",
+        domain=settings.COOKIE_DOMAIN,
         path="/",
     )
 
@@ -64,17 +68,14 @@ def logout(
     token: str = Depends(get_token_cookie),
     db: Session = Depends(get_db),
 ):
-    sess = db.query(OAuthSession).filter_by(session_token=token).first()
-    if sess:
-        db.delete(sess)
-        db.commit()
+    service.revoke_session(db, token)
     response.delete_cookie(
         key="session_token",
         path="/",
         httponly=True,
-        domain=".up.railway.app",
-        samesite="none",
-        secure=True,
+        domain=settings.COOKIE_DOMAIN,
+        samesite=settings.COOKIE_SAMESITE,
+        secure=settings.COOKIE_SECURE,
     )
     return {"message": "Logged out"}
 
@@ -1,13 +1,22 @@
-import secrets, datetime, requests
-from jose import jwt
-from src.auth.models import User, OAuthSession
+import asyncio, logging, re, secrets, datetime, time
+from fastapi.concurrency import run_in_threadpool
+from src.auth.models import User, OAuthSession, RevokedSession
 from src.core.config import settings
+from src.core.database import SessionLocal, is_sqlite
+from src.core.http import get_http_client
+from src.core.metrics import registry
+from src.core.security import create_signed_token, decode_signed_token, revoked_tokens
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from src.core.database import SessionLocal
-from google.oauth2 import id_token as google_id_token
-from google.auth.transport import requests as grequests
+from google.auth import jwt as google_jwt
 from fastapi import HTTPException
 
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+logger = logging.getLogger(__name__)
+
+_SWEEP_LOCK_ID = 720362
+
 def get_or_create_user(db: Session, userinfo: dict):
     user = db.query(User).filter_by(email=userinfo["email"]).first()
     if not user:
@@ -16,13 +25,187 @@ def get_or_create_user(db: Session, userinfo: dict):
     return user
 
 def create_session(db: Session, user: User):
-    token = secrets.token_urlsafe(32)
     expires = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=30)
+    if settings.SESSION_MODE == "signed":
+        # The row keeps the session listable and revocable; requests only
+        # check the signature and never read it back. Its session_token is
+        # never handed out: the jti is readable in the JWT and must not work
+        # as an opaque token.
+        jti = secrets.token_urlsafe(16)
+        sess = OAuthSession(
+            user_id=user.id,
+            session_token=secrets.token_urlsafe(32),
+            jti=jti,
+            expires=expires,
+        )
+        db.add(sess); db.commit()
+        claims = {
+            "sub": str(user.id),
+            "jti": jti,
+            "email": user.email,
+            "name": user.name,
+            "picture": user.picture,
+        }
+        return create_signed_token(claims, expires)
+    token = secrets.token_urlsafe(32)
     sess = OAuthSession(user_id=user.id, session_token=token, expires=expires)
     db.add(sess); db.commit()
     return token
 
-def exchange_code(code: str, redirect_uri: str):
+def user_from_claims(claims: dict) -> User:
+    """Build a detached User from signed-token claims, without a DB lookup."""
+    return User(
+        id=int(claims["sub"]),
+        email=claims["email"],
+        name=claims.get("name"),
+        picture=claims.get("picture"),
+    )
+
+def revoke_session(db: Session, token: str):
+    claims = decode_signed_token(token) if "." in token else None
+    if claims:
+        sess = db.query(OAuthSession).filter_by(jti=claims["jti"]).first()
+    else:
+        sess = db.query(OAuthSession).filter_by(session_token=token).first()
+    if sess:
+        db.delete(sess)
+    if claims:
+        expires = datetime.datetime.fromtimestamp(
+            claims["exp"], datetime.timezone.utc
+        )
+        db.merge(RevokedSession(jti=claims["jti"], expires=expires))
+        revoked_tokens.add(claims["jti"], claims["exp"])
+    db.commit()
+
+def sync_revocations(db: Session):
+    now = datetime.datetime.utcnow()
+    rows = db.query(RevokedSession.jti, RevokedSession.expires).filter(
+        RevokedSession.expires > now
+    )
+    revoked_tokens.replace(
+        {
+            jti: expires.replace(tzinfo=datetime.timezone.utc).timestamp()
+            for jti, expires in rows
+        }
+    )
+
+def _sync_revocations_once():
+    db = SessionLocal()
+    try:
+        sync_revocations(db)
+    finally:
+        db.close()
+
+async def run_revocation_sync(interval: int):
+    """Pull logouts made in other workers into the local revocation list."""
+    while True:
+        try:
+            await run_in_threadpool(_sync_revocations_once)
+        except Exception:
+            logger.exception("Revocation list sync failed")
+        await asyncio.sleep(interval)
+
+def sweep_expired_sessions(db: Session, batch_size: int) -> int:
+    """Delete expired sessions and revocations, ``batch_size`` rows at a time.
+
+    Each batch is its own transaction so the sweep never holds locks on
+    more than one batch of rows. On Postgres each batch first takes an
+    advisory lock; when another worker holds it, that worker is sweeping and
+    this one stops.
+    """
+    removed = 0
+    postgres = db.get_bind().dialect.name == "postgresql"
+    row_id = "ctid" if postgres else "rowid"
+    for table in ("oauth_sessions", "revoked_sessions"):
+        while True:
+            if postgres and not db.execute(
+                text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": _SWEEP_LOCK_ID}
+            ).scalar():
+                db.rollback()
+                return removed
+            deleted = db.execute(
+                text(
+                    f"DELETE FROM {table} WHERE {row_id} IN ("
+                    f"SELECT {row_id} FROM {table} WHERE expires < :now LIMIT :batch)"
+                ),
+                {"now": datetime.datetime.utcnow(), "batch": batch_size},
+            ).rowcount
+            db.commit()
+            removed += deleted
+            if deleted < batch_size:
+                break
+    return removed
+
+def _sweep_sessions_once(batch_size: int):
+    db = SessionLocal()
+    try:
+        removed = sweep_expired_sessions(db, batch_size)
+        if is_sqlite:
+            sessions = db.query(OAuthSession).count()
+            index_bytes = None
+        else:
+            sessions, index_bytes = db.execute(
+                text(
+                    "SELECT count(*), "
+                    "pg_relation_size('ix_oauth_sessions_session_token') "
+                    "FROM oauth_sessions"
+                )
+            ).one()
+    finally:
+        db.close()
+    registry.set_gauge("oauth_sessions_rows", sessions)
+    if index_bytes is not None:
+        registry.set_gauge("oauth_sessions_token_index_bytes", index_bytes)
+    logger.info(
+        "Swept expired sessions",
+        extra={"removed": removed, "sessions": sessions, "index_bytes": index_bytes},
+    )
+
+async def run_session_sweeper(interval: int, batch_size: int):
+    while True:
+        try:
+            await run_in_threadpool(_sweep_sessions_once, batch_size)
+        except Exception:
+            logger.exception("Session sweep failed")
+        await asyncio.sleep(interval)
+
+
+class GoogleCertCache:
+    """Google's ID token signing certs, kept until their Cache-Control max-age.
+
+    Without a max-age they are kept for default_ttl seconds. Concurrent logins
+    that find the cache stale share a single refresh.
+    """
+
+    def __init__(self, url: str, default_ttl: int = 3600):
+        self.url = url
+        self.default_ttl = default_ttl
+        self._certs = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> dict:
+        if self._certs is not None and time.monotonic() < self._expires_at:
+            return self._certs
+        async with self._lock:
+            if self._certs is None or time.monotonic() >= self._expires_at:
+                await self._refresh()
+        return self._certs
+
+    async def _refresh(self):
+        r = await get_http_client().get(self.url)
+        if r.status_code != 200:
+            raise HTTPException(status_code=502, detail="Could not fetch Google certs")
+        match = re.search(r"max-age=(\d+)", r.headers.get("cache-control", ""))
+        max_age = int(match.group(1)) if match else self.default_ttl
+        self._certs = r.json()
+        self._expires_at = time.monotonic() + max_age
+
+
+google_certs = GoogleCertCache(settings.GOOGLE_CERTS_URL, settings.GOOGLE_CERTS_TTL)
+
+
+async def exchange_code(code: str, redirect_uri: str):
     data = {
         "code": code,
         "client_id": settings.GOOGLE_CLIENT_ID,
@@ -30,22 +213,25 @@ def exchange_code(code: str, redirect_uri: str):
         "redirect_uri": redirect_uri,
         "grant_type": "authorization_code",
     }
-    r = requests.post("https://oauth2.googleapis.com/token", data=data)
+    r = await get_http_client().post(settings.GOOGLE_TOKEN_URL, data=data)
     resp = r.json()
     if r.status_code != 200:
         raise HTTPException(status_code=400, detail=f"Token exchange failed: {resp}")
-    
+
     token = resp.get("id_token")
     if not token:
         raise HTTPException(status_code=400, detail="Missing ID token")
 
-    # Verify ID token (check signature, expiration, audience automatically)
+    # Verify ID token (check signature, expiration, audience) against the
+    # cached certs; same checks as google_id_token.verify_oauth2_token.
     try:
-        user_info = google_id_token.verify_oauth2_token(
+        user_info = google_jwt.decode(
             token,
-            grequests.Request(),
-            settings.GOOGLE_CLIENT_ID
+            certs=await google_certs.get(),
+            audience=settings.GOOGLE_CLIENT_ID,
         )
+        if user_info.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError(f"Wrong issuer: {user_info.get('iss')}")
     except ValueError as e:
         raise HTTPException(status_code=400, detail=f"Invalid ID token: {e}")
 
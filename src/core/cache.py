@@ -0,0 +1,131 @@
+import logging
+import select
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from src.core.database import engine, is_sqlite
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache_invalidation"
+_MISSING = object()
+
+
+class LocalCache:
+    """Per-process LRU cache whose entries also expire after ``ttl`` seconds.
+
+    The TTL is only a backstop; entries are normally evicted by invalidation
+    messages as soon as the underlying rows change.
+
+    ``version`` changes on every eviction. A loader reads it before querying
+    and passes it to ``set``, so a value loaded before a concurrent write
+    committed is not cached after that write's eviction.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING or entry[0] < time.monotonic():
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, version: int | None = None):
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self.version += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.version += 1
+
+
+local_cache = LocalCache()
+
+
+def invalidate(db, *keys: str):
+    """Invalidate ``keys`` in every worker once ``db``'s transaction commits.
+
+    NOTIFY is transactional, so other workers only hear about committed
+    changes; this worker evicts from the ``after_commit`` hook below, which
+    applies to every session whichever factory made it. SQLite
+    has no NOTIFY, so there only this worker's cache is invalidated.
+    """
+    db.info.setdefault("invalidate_keys", set()).update(keys)
+    if is_sqlite:
+        return
+    for key in keys:
+        db.execute(text("SELECT pg_notify(:channel, :key)"), {"channel": CHANNEL, "key": key})
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed(session):
+    for key in session.info.pop("invalidate_keys", ()):
+        local_cache.delete(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session):
+    session.info.pop("invalidate_keys", None)
+
+
+class InvalidationListener(threading.Thread):
+    """Background thread that LISTENs for invalidations from other workers.
+
+    It holds one dedicated connection outside the pool. Notifications sent
+    while it was not listening are lost, so the local cache is cleared every
+    time LISTEN is (re)established.
+    """
+
+    def __init__(self, bind=engine):
+        super().__init__(name="cache-invalidation", daemon=True)
+        self.bind = bind
+        self._stopping = threading.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    def run(self):
+        while not self._stopping.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Cache invalidation listener failed, reconnecting")
+                self._stopping.wait(1.0)
+
+    def _listen(self):
+        raw = self.bind.raw_connection()
+        raw.detach()
+        conn = raw.driver_connection
+        try:
+            conn.autocommit = True
+            conn.cursor().execute(f"LISTEN {CHANNEL}")
+            # Anything cached before we were listening may have gone stale.
+            local_cache.clear()
+            while not self._stopping.is_set():
+                if select.select([conn], [], [], 1.0) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    local_cache.delete(conn.notifies.pop(0).payload)
+        finally:
+            conn.close()
@@ -8,12 +8,46 @@ class Settings(BaseSettings):
     )
 
     DATABASE_URL: str
+    DATABASE_READ_URL: str | None = None
+    DATABASE_SHARDS: dict[str, str] = {}  # JSON: {"shard1": "postgresql://..."}
+    READ_YOUR_WRITES_SECONDS: int = 5
     GOOGLE_CLIENT_ID: str
     GOOGLE_CLIENT_SECRET: str
     SECRET_KEY: str
-    COOKIE_SECURE: bool = False
+    JWT_ALGORITHM: str = "HS256"
+    SESSION_MODE: str = "opaque"  # opaque, signed
+    REVOCATION_SYNC_SECONDS: int = 30
+    SESSION_SWEEP_SECONDS: int = 3600
+    SESSION_SWEEP_BATCH: int = 1000
+    PARTITION_MAINTENANCE_SECONDS: int = 24 * 3600
+    PARTITION_MONTHS_AHEAD: int = 3
+    GAME_MATCHES_RETAIN_MONTHS: int = 0  # 0 keeps every partition
+    GAME_LOGS_RETAIN_MONTHS: int = 0
+    PARTITION_DROP_DETACHED: bool = False
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_SECONDS: float = 1.0
+    AUDIT_MAX_PENDING: int = 10000
+    GAME_ENGINE: bool = False  # serve ongoing games from memory, see src/game/engine.py
+    GAME_ENGINE_FLUSH_SECONDS: float = 0.5
+    GAME_ENGINE_MAX_PENDING: int = 10000  # unwritten journal entries kept
+    GAME_ENGINE_FLUSH_ATTEMPTS: int = 5  # failed passes before quarantine
+    GAME_ENGINE_IDLE_SECONDS: float = 900  # unplayed games leave memory, 0 = never
+    GAME_TIMER_TICK_SECONDS: float = 1.0  # 0 leaves time limits unenforced
+    SCORE_UPDATE_RETRIES: int = 5  # compare-and-swap attempts before a 409
+    COOKIE_SECURE: bool = True
+    COOKIE_SAMESITE: str = "none"
+    COOKIE_DOMAIN: str | None = ".up.railway.app"
     FRONTEND_URL: str
     FRONTEND_URL_DEV: str
     BACKEND_URL: str
+    GOOGLE_TOKEN_URL: str = "https://oauth2.googleapis.com/token"
+    GOOGLE_CERTS_URL: str = "https://www.googleapis.com/oauth2/v1/certs"
+    GOOGLE_CERTS_TTL: int = 3600  # used when the response has no max-age
+    DEV_MODE: bool = False
+    N_PLUS_ONE_THRESHOLD: int = 5
+    LOG_LEVEL: str = "INFO"
+    LOG_SAMPLE_RATE: float = 1.0
+    CREATE_SCHEMA: bool = False
+    DB_POOL_WARM: int = 2
 
 settings = Settings()
\ No newline at end of file
@@ -1,7 +1,173 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from .config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",  # readers don't block the writer and vice versa
+    "synchronous": "NORMAL",  # fsync at checkpoints only; safe with WAL
+    "busy_timeout": 5000,  # ms to wait on another process's write lock
+    "cache_size": -64000,  # 64 MiB page cache per connection
+    "temp_store": "MEMORY",
+    "mmap_size": 256 * 1024 * 1024,
+    "foreign_keys": "ON",
+}
+
+_WRITE_VERBS = {"INSERT", "UPDATE", "DELETE", "REPLACE", "CREATE", "DROP", "ALTER"}
+
+# SQLite allows one writer at a time. Rather than letting concurrent write
+# transactions collide and spin on SQLITE_BUSY, threads in this process take
+# turns: a connection acquires the lock on its first write statement and
+# releases it on commit or rollback. Reads never take it.
+sqlite_writer_lock = threading.Lock()
+
+
+def _configure_sqlite(engine: Engine):
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _take_writer_lock(conn, cursor, statement, parameters, context, executemany):
+        if conn.info.get("holds_writer_lock"):
+            return
+        words = statement.split(None, 1)
+        if words and words[0].upper() in _WRITE_VERBS:
+            sqlite_writer_lock.acquire()
+            conn.info["holds_writer_lock"] = True
+
+    @event.listens_for(engine, "commit")
+    @event.listens_for(engine, "rollback")
+    def _release_writer_lock(conn):
+        if conn.info.pop("holds_writer_lock", False):
+            sqlite_writer_lock.release()
+
+
+def make_engine(url: str) -> Engine:
+    if not url.startswith("sqlite"):
+        return create_engine(url)
+    # Pooled connections move between request threads.
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    _configure_sqlite(engine)
+    return engine
+
+
+engine = make_engine(settings.DATABASE_URL)
+is_sqlite = engine.dialect.name == "sqlite"
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+# Optional streaming replica for read-only endpoints; without one, reads go
+# to the primary like everything else.
+if settings.DATABASE_READ_URL:
+    read_engine = make_engine(settings.DATABASE_READ_URL)
+    ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+else:
+    read_engine = None
+    ReadSessionLocal = SessionLocal
+
+
+class RequestDBStats:
+    """Mutable per-request accumulator for statements sent to the database.
+
+    ``shapes`` counts statements by their SQL text. Bound parameters are not
+    part of the text, so the same query issued for different rows has the same
+    shape; it is only tracked when ``track_shapes`` is set (dev mode).
+    """
+
+    __slots__ = ("elapsed", "queries", "shapes")
+
+    def __init__(self, track_shapes: bool = False):
+        self.elapsed = 0.0
+        self.queries = 0
+        self.shapes = Counter() if track_shapes else None
+
+    def repeated_shapes(self, threshold: int):
+        if self.shapes is None:
+            return []
+        return [(sql, n) for sql, n in self.shapes.items() if n > threshold]
+
+
+# Set by the metrics middleware. Sync endpoints run in a threadpool that copies
+# the context, so the hooks below mutate the same object the middleware holds.
+# The hooks are registered on the Engine class so every engine is covered.
+request_db_stats: ContextVar[RequestDBStats | None] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = request_db_stats.get()
+    if stats is not None:
+        stats.elapsed += elapsed
+        stats.queries += 1
+        if stats.shapes is not None:
+            stats.shapes[statement] += 1
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def warm_pool(connections: int):
+    """Open ``connections`` pooled connections up front.
+
+    Holding them all at once forces the pool to create distinct connections
+    instead of handing the same one back each time.
+    """
+    opened = []
+    try:
+        for _ in range(min(connections, engine.pool.size())):
+            conn = engine.connect()
+            opened.append(conn)
+            conn.execute(text("SELECT 1"))
+    finally:
+        for conn in opened:
+            conn.close()
+
+
+@contextmanager
+def assert_query_budget(max_queries: int):
+    """Fail if the wrapped block sends more than ``max_queries`` statements.
+
+    Counts on the engines rather than through the request context, so it also
+    sees statements issued from TestClient's worker thread::
+
+        with assert_query_budget(4):
+            client.get("/game/recent")
+    """
+    statements = []
+
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(Engine, "after_cursor_execute", _count)
+    try:
+        yield statements
+    finally:
+        event.remove(Engine, "after_cursor_execute", _count)
+
+    if len(statements) > max_queries:
+        shapes = Counter(statements).most_common(3)
+        raise AssertionError(
+            f"Expected at most {max_queries} queries, got {len(statements)}. "
+            f"Most repeated: {shapes}"
+        )
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+from fastapi import HTTPException
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "done", "ok", "result", "error", "created")
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.ok = False
+        self.result = None
+        self.error = None
+        self.created = time.monotonic()
+
+
+class IdempotencyStore:
+    """Recent ``Idempotency-Key`` values and the responses they produced.
+
+    The first request with a key runs the handler; a retry gets the stored
+    response back without touching the database, and a retry that arrives
+    while the first is still running waits up to ``wait_timeout`` seconds for
+    it instead of running again, then gets a 409. Only the newest
+    ``max_entries`` finished keys are kept, each for ``ttl`` seconds; keys
+    still in flight are never evicted.
+
+    Entries live in this process only; retries are expected to land on the
+    same worker often enough that this catches most duplicates.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        ttl: float = 24 * 3600,
+        wait_timeout: float = 30.0,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def run(self, key, fingerprint: str, fn):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.created > self.ttl:
+                del self._entries[key]
+                entry = None
+            owner = entry is None
+            if owner:
+                entry = _Entry(fingerprint)
+                self._entries[key] = entry
+                self._evict()
+
+        if entry.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail=[{"msg": "Idempotency-Key was already used for another request"}],
+            )
+
+        if not owner:
+            if not entry.done.wait(self.wait_timeout):
+                raise HTTPException(
+                    status_code=409,
+                    detail=[{"msg": "A request with this Idempotency-Key is still running"}],
+                )
+            if entry.error is not None:
+                raise entry.error
+            if entry.ok:
+                return entry.result
+            # The first attempt failed unexpectedly and was forgotten; run it.
+            return self.run(key, fingerprint, fn)
+
+        try:
+            entry.result = fn()
+            entry.ok = True
+        except HTTPException as e:
+            # Deterministic rejections are replayed like any other response.
+            entry.error = e
+            raise
+        except Exception:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            raise
+        finally:
+            entry.done.set()
+        return entry.result
+
+    def _evict(self):
+        excess = len(self._entries) - self.max_entries
+        if excess <= 0:
+            return
+        finished = []
+        for key, entry in self._entries.items():
+            if len(finished) == excess:
+                break
+            if entry.done.is_set():
+                finished.append(key)
+        for key in finished:
+            del self._entries[key]
+
+
+idempotency_store = IdempotencyStore()
+
+
+def idempotent(key: str | None, scope, fingerprint: str, fn):
+    """Run ``fn`` once per ``(scope, key)``; without a key just run it."""
+    if not key:
+        return fn()
+    return idempotency_store.run((scope, key), fingerprint, fn)
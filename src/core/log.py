@@ -0,0 +1,150 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import re
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+# Attributes every LogRecord has; anything else came in through ``extra=``.
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+REDACTED = "[REDACTED]"
+SECRET_KEYS = {
+    "authorization",
+    "client_secret",
+    "code",
+    "cookie",
+    "id_token",
+    "password",
+    "secret",
+    "session_token",
+    "token",
+}
+
+
+# ``key=value``, ``key: value`` and ``'key': 'value'`` inside free text, such
+# as a message built from a response body or a query string in a traceback.
+_SECRET_TEXT = re.compile(
+    r"(?P<key>\b(?:%s)\b)"
+    r"(?P<sep>['\"]?\s*[:=]\s*['\"]?)"
+    r"(?:bearer\s+)?[^\s'\",&;)}\]]+"
+    % "|".join(sorted(SECRET_KEYS, key=len, reverse=True)),
+    re.IGNORECASE,
+)
+_BEARER = re.compile(r"\b(bearer)\s+[\w.~+/=-]+", re.IGNORECASE)
+
+
+def redact_text(text: str) -> str:
+    text = _SECRET_TEXT.sub(lambda m: m["key"] + m["sep"] + REDACTED, text)
+    return _BEARER.sub(lambda m: f"{m[1]} {REDACTED}", text)
+
+
+def _redact(key, value):
+    if key.lower() in SECRET_KEYS:
+        return REDACTED
+    if isinstance(value, dict):
+        return {k: _redact(k, v) for k, v in value.items()}
+    if isinstance(value, str):
+        return redact_text(value)
+    return value
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with ``extra=`` fields as top-level keys."""
+
+    def format(self, record):
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": redact_text(record.getMessage()),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                payload[key] = _redact(key, value)
+        if record.exc_info:
+            payload["exc"] = redact_text(self.formatException(record.exc_info))
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of records below ``WARNING``; warnings always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Never blocks the caller: when the queue is full the record is dropped."""
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Bind the args now so later mutation of them can't change the
+        # message; JSON formatting is left to the listener thread.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class DrainingQueueListener(QueueListener):
+    """``stop`` waits for room for its sentinel rather than raise ``Full``.
+
+    The listener thread keeps draining meanwhile, so the wait is short.
+    """
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+_listener = None
+
+
+def configure_logging(level: str = "INFO", sample_rate: float = 1.0, queue_size: int = 10000):
+    """Route the root logger through a bounded queue to a stdout writer thread.
+
+    Request handlers only pay for building a record and a ``put_nowait``; the
+    JSON encoding and the write to stdout happen on the listener thread.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JSONFormatter())
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+    if sample_rate < 1.0:
+        handler.addFilter(SamplingFilter(sample_rate))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(level.upper())
+
+    _listener = DrainingQueueListener(
+        handler.queue, stream, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
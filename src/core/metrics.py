@@ -0,0 +1,191 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from src.core.database import RequestDBStats, request_db_stats
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, Prometheus style. The implicit last bucket is +Inf.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class _Shard:
+    """Counters owned by a single thread.
+
+    Only the owning thread ever writes to a shard, so recording needs no lock.
+    The scraper reads every shard and merges them; a scrape may miss an
+    observation that is being recorded at that instant, which is fine for
+    monotonically increasing counters.
+    """
+
+    __slots__ = ("histograms", "in_flight")
+
+    def __init__(self):
+        # (metric, labels) -> [bucket counts..., +Inf count, sum]
+        self.histograms = {}
+        self.in_flight = 0
+
+    def observe(self, metric, labels, buckets, value):
+        key = (metric, labels)
+        series = self.histograms.get(key)
+        if series is None:
+            series = [0] * (len(buckets) + 2)
+            self.histograms[key] = series
+        series[bisect_left(buckets, value)] += 1
+        series[-1] += value
+
+
+class Registry:
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+        self._buckets = {}
+        # Set from background jobs, not per request; plain assignment is fine.
+        self._gauges = {}
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard()
+            self._local.shard = shard
+            # Taken once per thread, never on the recording path.
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def register_histogram(self, metric, buckets):
+        self._buckets[metric] = buckets
+
+    def observe(self, metric, labels, value):
+        self._shard().observe(metric, labels, self._buckets[metric], value)
+
+    def set_gauge(self, metric, value):
+        self._gauges[metric] = value
+
+    def add_in_flight(self, delta):
+        self._shard().in_flight += delta
+
+    def collect(self):
+        with self._shards_lock:
+            shards = list(self._shards)
+
+        merged = {}
+        in_flight = 0
+        for shard in shards:
+            in_flight += shard.in_flight
+            for key, series in list(shard.histograms.items()):
+                total = merged.get(key)
+                if total is None:
+                    merged[key] = list(series)
+                else:
+                    for i, value in enumerate(series):
+                        total[i] += value
+        return merged, in_flight
+
+    def render(self):
+        merged, in_flight = self.collect()
+        lines = [
+            "# HELP http_requests_in_flight Requests currently being served.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {in_flight}",
+        ]
+        for metric, value in sorted(self._gauges.items()):
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+        for metric, buckets in self._buckets.items():
+            lines.append(f"# TYPE {metric} histogram")
+            for (name, labels), series in sorted(merged.items()):
+                if name != metric:
+                    continue
+                label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+                cumulative = 0
+                for bound, count in zip(buckets, series):
+                    cumulative += count
+                    lines.append(
+                        f'{metric}_bucket{{{label_str},le="{bound}"}} {cumulative}'
+                    )
+                cumulative += series[len(buckets)]
+                lines.append(f'{metric}_bucket{{{label_str},le="+Inf"}} {cumulative}')
+                lines.append(f"{metric}_sum{{{label_str}}} {series[-1]}")
+                lines.append(f"{metric}_count{{{label_str}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+registry.register_histogram("http_request_duration_seconds", LATENCY_BUCKETS)
+registry.register_histogram("http_response_size_bytes", SIZE_BUCKETS)
+registry.register_histogram("http_request_db_seconds", DB_TIME_BUCKETS)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency, size and DB time per route.
+
+    Routes are labelled by their path template (``/game/history/{game_id}``),
+    not the raw URL, so the number of series stays bounded.
+
+    With ``dev_mode`` on, responses also carry ``X-DB-Queries`` and
+    ``X-DB-Time`` headers, and a warning is logged when one statement shape
+    runs more than ``n_plus_one_threshold`` times in a single request.
+    """
+
+    def __init__(self, app, dev_mode: bool = False, n_plus_one_threshold: int = 5):
+        self.app = app
+        self.dev_mode = dev_mode
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        size = 0
+        stats = RequestDBStats(track_shapes=self.dev_mode)
+        token = request_db_stats.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.dev_mode:
+                    # Body-producing work is done by now; streaming responses
+                    # only report the queries made before the first byte.
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-db-queries", str(stats.queries).encode()),
+                        (b"x-db-time", f"{stats.elapsed * 1000:.2f}ms".encode()),
+                    ]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        registry.add_in_flight(1)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            registry.add_in_flight(-1)
+            request_db_stats.reset(token)
+
+            route = scope.get("route")
+            labels = (
+                ("method", scope["method"]),
+                ("route", route.path if route is not None else "unmatched"),
+                ("status", str(status)),
+            )
+            registry.observe("http_request_duration_seconds", labels, elapsed)
+            registry.observe("http_response_size_bytes", labels, size)
+            registry.observe("http_request_db_seconds", labels, stats.elapsed)
+
+            for sql, n in stats.repeated_shapes(self.n_plus_one_threshold):
+                logger.warning(
+                    "Possible N+1 on %s %s: statement ran %d times: %s",
+                    scope["method"],
+                    labels[1][1],
+                    n,
+                    " ".join(sql.split())[:200],
+                )
@@ -0,0 +1,197 @@
+"""Monthly range partitions for append-mostly tables.
+
+Used both from Alembic migrations (pass ``op.get_bind()``) and from the
+maintenance task the app runs in the background. Partitions are named
+``<table>_pYYYY_MM`` and cover one calendar month each. Each table also has
+a ``<table>_default`` partition, so a row outside every month partition is
+still stored; maintenance later moves such rows into their own month.
+"""
+
+import asyncio
+import datetime
+import logging
+import re
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import DDL, text
+from src.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> partition key column
+PARTITIONED_TABLES = {
+    "game_matches": "created_at",
+    "game_logs": "timestamp",
+}
+
+# Arbitrary constant; serializes maintenance across workers.
+_MAINTENANCE_LOCK_ID = 720361
+
+
+def month_start(day: datetime.date) -> datetime.date:
+    return day.replace(day=1)
+
+
+def add_months(day: datetime.date, months: int) -> datetime.date:
+    index = day.year * 12 + day.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: datetime.date) -> str:
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def default_partition_ddl(table: str) -> DDL:
+    """DDL for ``after_create`` so ``create_all`` gives the table a default."""
+    return DDL(
+        f"CREATE TABLE IF NOT EXISTS {default_partition_name(table)} "
+        f"PARTITION OF {table} DEFAULT"
+    ).execute_if(dialect="postgresql")
+
+
+def _exists(conn, name: str) -> bool:
+    found = conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar()
+    return found is not None
+
+
+def create_partition(conn, table: str, month: datetime.date):
+    month = month_start(month)
+    name = partition_name(table, month)
+    bounds = f"FROM ('{month}') TO ('{add_months(month, 1)}')"
+    default = default_partition_name(table)
+    if _exists(conn, name):
+        return
+    if not _exists(conn, default):
+        conn.execute(
+            text(f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES {bounds}")
+        )
+        return
+    # Postgres refuses a new partition while the default holds rows for its
+    # range, so move them over first and attach the filled table.
+    key = PARTITIONED_TABLES[table]
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS)"))
+    conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {default} "
+            f"WHERE \"{key}\" >= :start AND \"{key}\" < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {"start": month, "end": add_months(month, 1)},
+    )
+    conn.execute(
+        text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES {bounds}")
+    )
+
+
+def create_partitions(conn, table: str, first: datetime.date, last: datetime.date):
+    """Create every monthly partition from ``first`` through ``last``."""
+    month = month_start(first)
+    while month <= last:
+        create_partition(conn, table, month)
+        month = add_months(month, 1)
+
+
+def default_months(conn, table: str) -> list[datetime.date]:
+    """Months that have rows in the default partition."""
+    if not _exists(conn, default_partition_name(table)):
+        return []
+    key = PARTITIONED_TABLES[table]
+    rows = conn.execute(
+        text(
+            f"SELECT DISTINCT date_trunc('month', \"{key}\") "
+            f"FROM {default_partition_name(table)}"
+        )
+    ).scalars()
+    return sorted(month.date() for month in rows)
+
+
+def list_partitions(conn, table: str) -> list[tuple[str, datetime.date]]:
+    rows = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table"
+        ),
+        {"table": table},
+    ).scalars()
+    pattern = re.compile(rf"^{table}_p(\d{{4}})_(\d{{2}})$")
+    partitions = []
+    for name in rows:
+        match = pattern.match(name)
+        if match:
+            month = datetime.date(int(match.group(1)), int(match.group(2)), 1)
+            partitions.append((name, month))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def detach_partitions_before(conn, table: str, cutoff: datetime.date, drop: bool = False):
+    """Detach (and optionally drop) partitions that end on or before ``cutoff``."""
+    removed = []
+    for name, month in list_partitions(conn, table):
+        if add_months(month, 1) > cutoff:
+            break
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if drop:
+            conn.execute(text(f"DROP TABLE {name}"))
+        removed.append(name)
+    return removed
+
+
+def maintain_partitions(
+    conn, months_ahead: int, retain_months: dict[str, int], drop: bool = False
+):
+    """Keep ``months_ahead`` future partitions and retire expired ones.
+
+    Rows that landed in the default partition, from a past month or one
+    beyond the pre-created range, get their month partition here too.
+
+    ``retain_months`` maps table name to how many whole months to keep; a
+    table that is missing or mapped to 0 is never trimmed. Returns False when
+    another worker is already doing the maintenance.
+    """
+    got_lock = conn.execute(
+        text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": _MAINTENANCE_LOCK_ID}
+    ).scalar()
+    if not got_lock:
+        return False
+
+    this_month = month_start(datetime.datetime.utcnow().date())
+    for table in PARTITIONED_TABLES:
+        create_partitions(conn, table, this_month, add_months(this_month, months_ahead))
+        for month in default_months(conn, table):
+            create_partition(conn, table, month)
+        keep = retain_months.get(table, 0)
+        if keep > 0:
+            removed = detach_partitions_before(
+                conn, table, add_months(this_month, -keep), drop=drop
+            )
+            if removed:
+                logger.info(
+                    "Retired partitions",
+                    extra={"table": table, "partitions": removed, "dropped": drop},
+                )
+    return True
+
+
+async def run_partition_maintenance(
+    interval: int,
+    months_ahead: int,
+    retain_months: dict[str, int],
+    drop: bool,
+    engines=(engine,),
+):
+    def _once():
+        for bind in engines:
+            with bind.begin() as conn:
+                maintain_partitions(conn, months_ahead, retain_months, drop)
+
+    while True:
+        try:
+            await run_in_threadpool(_once)
+        except Exception:
+            logger.exception("Partition maintenance failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,54 @@
+import datetime
+import threading
+import time
+from jose import JWTError, jwt
+from src.core.config import settings
+
+
+def create_signed_token(claims: dict, expires: datetime.datetime) -> str:
+    payload = dict(claims)
+    payload["exp"] = int(expires.timestamp())
+    return jwt.encode(payload, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+def decode_signed_token(token: str) -> dict | None:
+    """Return the claims of a valid, unexpired token, or None."""
+    try:
+        return jwt.decode(
+            token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+        )
+    except JWTError:
+        return None
+
+
+class RevocationList:
+    """In-memory set of revoked token ids, each kept until its token expires.
+
+    ``replace`` builds the merged mapping aside and swaps it in with one
+    assignment, so lookups never take the lock.
+    """
+
+    def __init__(self):
+        self._revoked: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self._revoked
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def add(self, jti: str, expires_at: float):
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def replace(self, entries: dict[str, float]):
+        now = time.time()
+        with self._lock:
+            # Keep local revocations the DB rows may not reflect yet.
+            merged = {j: e for j, e in self._revoked.items() if e > now}
+            merged.update(entries)
+            self._revoked = merged
+
+
+revoked_tokens = RevocationList()
@@ -0,0 +1,115 @@
+"""Routes each player group's game data to one of several databases.
+
+``DATABASE_SHARDS`` maps shard names to URLs; the main database is always
+available as the ``default`` shard and keeps users, sessions and the audit
+log. A group is placed on the shard its name hashes to on a consistent-hash
+ring, so adding a shard only moves about 1/n of the groups. A row in
+``shard_assignments`` overrides the ring for one group; the rebalancing tool
+(``python -m src.game.rebalance``) writes these while it moves data.
+"""
+
+import bisect
+import datetime
+import hashlib
+from sqlalchemy import Boolean, Column, DateTime, String
+from sqlalchemy.orm import Session
+from src.core.cache import invalidate, local_cache
+from src.core.config import settings
+from src.core.database import Base, SessionLocal, engine, make_engine
+
+DEFAULT_SHARD = "default"
+
+
+class ShardAssignment(Base):
+    __tablename__ = "shard_assignments"
+    player_group = Column(String(50), primary_key=True)
+    shard = Column(String(50), nullable=False)
+    # Writes for the group are refused while its rows are being copied.
+    moving = Column(Boolean, default=False, nullable=False)
+    updated_at = Column(
+        DateTime,
+        default=datetime.datetime.utcnow,
+        onupdate=datetime.datetime.utcnow,
+        nullable=False,
+    )
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """Consistent-hash ring with ``vnodes`` points per shard."""
+
+    def __init__(self, names, vnodes: int = 64):
+        points = sorted(
+            (_hash(f"{name}#{i}"), name) for name in names for i in range(vnodes)
+        )
+        self._keys = [p[0] for p in points]
+        self._names = [p[1] for p in points]
+
+    def node_for(self, key: str) -> str:
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._names[index]
+
+
+def shard_key(player_group: str) -> str:
+    return f"shard:{player_group}"
+
+
+class ShardRouter:
+    def __init__(self, urls: dict[str, str]):
+        self.engines = {DEFAULT_SHARD: engine}
+        for name, url in urls.items():
+            self.engines[name] = make_engine(url)
+        self.ring = HashRing(self.engines)
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.engines) > 1
+
+    def locate(self, player_group: str) -> tuple[str, bool]:
+        """``(shard, moving)`` for the group, cached per process."""
+        if not self.enabled:
+            return DEFAULT_SHARD, False
+        key = shard_key(player_group)
+        location = local_cache.get(key)
+        if location is None:
+            version = local_cache.version
+            db = SessionLocal()
+            try:
+                row = db.get(ShardAssignment, player_group)
+            finally:
+                db.close()
+            if row is not None and row.shard in self.engines:
+                location = (row.shard, row.moving)
+            else:
+                location = (self.ring.node_for(player_group), False)
+            local_cache.set(key, location, version)
+        return location
+
+    def session(self, shard: str) -> Session:
+        # Same sessionmaker, so the cache invalidation hooks apply too.
+        return SessionLocal(bind=self.engines[shard])
+
+    def session_for(self, player_group: str) -> Session:
+        return self.session(self.locate(player_group)[0])
+
+    def assign(self, db: Session, player_group: str, shard: str, moving: bool):
+        """Pin ``player_group`` to ``shard``; ``db`` is a default-shard session."""
+        row = db.get(ShardAssignment, player_group)
+        if row is None:
+            row = ShardAssignment(player_group=player_group)
+            db.add(row)
+        row.shard = shard
+        row.moving = moving
+        invalidate(db, shard_key(player_group))
+        db.commit()
+
+    def dispose(self):
+        for name, shard_engine in self.engines.items():
+            if name != DEFAULT_SHARD:
+                shard_engine.dispose()
+
+
+shard_router = ShardRouter(settings.DATABASE_SHARDS)
@@ -0,0 +1,19 @@
+import uuid
+from sqlalchemy.types import TypeDecorator, Uuid
+
+
+class GUID(TypeDecorator):
+    """UUID column that works on every backend.
+
+    Native ``uuid`` on Postgres, ``CHAR(32)`` elsewhere (SQLite). Path
+    parameters and request bodies carry ids as strings, which the non-native
+    storage can't bind directly, so they are parsed here first.
+    """
+
+    impl = Uuid
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(str(value))
@@ -1,9 +1,17 @@
 # src/auth/dependencies.py
-from fastapi import Depends, Cookie, HTTPException
+import logging
+from fastapi import Depends, Cookie, HTTPException, Request
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from datetime import datetime
-from src.core.database import SessionLocal
+from src.core.database import ReadSessionLocal, SessionLocal
 from src.auth.models import OAuthSession, User
+from src.auth.service import user_from_claims
+from src.core.config import settings
+from src.core.security import decode_signed_token, revoked_tokens
+from src.core.shards import shard_router
+
+logger = logging.getLogger(__name__)
 
 def get_db():
     db = SessionLocal()
@@ -12,22 +20,65 @@ def get_db():
     finally:
         db.close()
 
+PRIMARY_PIN_COOKIE = "primary_pin"
+
 def get_token_cookie(session_token: str | None = Cookie(default=None)):
-    print(f"Session token from cookie: {session_token}")
-    # session_token = "n8khfyIjqmYVuBLRJOh4HxtzXogbIpdfBjX0RvuFFGs"
     if not session_token:
         raise HTTPException(status_code=401, detail="Missing session cookie")
     return session_token
 
+def find_session(db: Session, token: str) -> OAuthSession | None:
+    return db.scalars(
+        select(OAuthSession).where(OAuthSession.session_token == token).limit(1)
+    ).first()
+
 def get_current_user(
     token: str = Depends(get_token_cookie),
     db: Session = Depends(get_db)
 ) -> User:
-    sess = db.query(OAuthSession).filter_by(session_token=token).first()
+    # Opaque tokens issued before switching modes still go through the DB.
+    if settings.SESSION_MODE == "signed" and "." in token:
+        claims = decode_signed_token(token)
+        if not claims or claims["jti"] in revoked_tokens:
+            raise HTTPException(status_code=401, detail="Invalid or expired session")
+        return user_from_claims(claims)
+    sess = find_session(db, token)
     if not sess or sess.expires < datetime.now(sess.expires.tzinfo):
         raise HTTPException(status_code=401, detail="Invalid or expired session")
-    user = db.query(User).get(sess.user_id)
+    user = db.get(User, sess.user_id)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
-    print(f"Current user: {user.email}")
+    logger.debug("Authenticated request", extra={"user_id": user.id})
     return user
+
+def get_game_db(request: Request, user: User = Depends(get_current_user)):
+    """Session on the shard that holds the user's game data."""
+    shard, moving = shard_router.locate("usergroup_" + str(user.id))
+    if moving and request.method not in ("GET", "HEAD"):
+        raise HTTPException(
+            status_code=503,
+            detail=[{"msg": "Your games are being moved, please retry shortly"}],
+        )
+    db = shard_router.session(shard)
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_read_db(request: Request, user: User = Depends(get_current_user)):
+    """Session for read-only endpoints, on the replica when one is configured.
+
+    A client that wrote recently carries the pin cookie and keeps reading
+    from the primary until the replica has caught up with its write. With
+    shards configured, reads go to the group's shard instead.
+    """
+    if shard_router.enabled:
+        db = shard_router.session_for("usergroup_" + str(user.id))
+    elif PRIMARY_PIN_COOKIE in request.cookies:
+        db = SessionLocal()
+    else:
+        db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,244 @@
+"""Cold archive for completed games.
+
+Archiving folds a completed game's rounds, players and winners into a single
+zlib-compressed ``game_archives`` row and deletes the hot rows; only the
+``games`` row stays. Restoring reverses it exactly.
+
+    python -m src.game.archive archive --older-than-days 30
+    python -m src.game.archive restore <game_id>
+"""
+
+import argparse
+import datetime
+import json
+import uuid
+import zlib
+from types import SimpleNamespace
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from src.core.cache import invalidate
+from src.core.shards import shard_router
+from src.game.models import (
+    Game,
+    GameArchive,
+    GameMatch,
+    GameMatchPlayer,
+    GamePlayer,
+    Player,
+    Winner,
+)
+from src.game.service import game_key, match_details
+from src.game.sync import record_changes
+
+ARCHIVED_MODELS = {
+    "matches": GameMatch,
+    "match_players": GameMatchPlayer,
+    "players": GamePlayer,
+    "winners": Winner,
+}
+
+
+def _encode(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _dump(row) -> dict:
+    return {c.key: _encode(getattr(row, c.key)) for c in row.__table__.columns}
+
+
+def _load(model, data: dict) -> dict:
+    row = {}
+    for column in model.__table__.columns:
+        if column.key not in data:
+            continue  # archived before the column existed; use its default
+        value = data[column.key]
+        if value is not None:
+            python_type = column.type.python_type
+            if python_type is datetime.datetime:
+                value = datetime.datetime.fromisoformat(value)
+            elif python_type is uuid.UUID:
+                value = uuid.UUID(value)
+        row[column.key] = value
+    return row
+
+
+def load_payload(archive: GameArchive) -> dict:
+    return json.loads(zlib.decompress(archive.payload))
+
+
+def archive_game(db: Session, game: Game):
+    rows = {
+        key: db.query(model).filter(model.game_id == game.id).all()
+        for key, model in ARCHIVED_MODELS.items()
+    }
+    player_ids = (
+        {p.player_id for p in rows["players"]}
+        | {p.player_id for p in rows["match_players"]}
+        | {w.player_id for w in rows["winners"]}
+        | {m.winner_id for m in rows["matches"] if m.winner_id}
+    )
+    names = dict(
+        db.query(Player.id, Player.name).filter(Player.id.in_(player_ids)).all()
+    )
+
+    payload = {key: [_dump(r) for r in group] for key, group in rows.items()}
+    payload["names"] = {str(k): v for k, v in names.items()}
+    winners = [
+        {"player_id": str(w.player_id), "player_name": names.get(w.player_id)}
+        for w in rows["winners"]
+        if w.player_id in names
+    ]
+
+    db.add(
+        GameArchive(
+            game_id=game.id,
+            player_group=game.player_group,
+            player_count=len(rows["players"]),
+            winners=json.dumps(winners),
+            payload=zlib.compress(
+                json.dumps(payload, separators=(",", ":")).encode(), 9
+            ),
+        )
+    )
+    for model in ARCHIVED_MODELS.values():
+        db.query(model).filter(model.game_id == game.id).delete(
+            synchronize_session=False
+        )
+    if game.player_group is not None:
+        record_changes(db, game.player_group, [("game", game.id)])
+    invalidate(db, game_key(game.id))
+    db.commit()
+
+
+def unarchive_game(db: Session, game_id) -> bool:
+    archive = db.get(GameArchive, game_id)
+    if archive is None:
+        return False
+    payload = load_payload(archive)
+    for key, model in ARCHIVED_MODELS.items():
+        # Archives written before game_match_players existed lack that key.
+        if payload.get(key):
+            db.execute(insert(model), [_load(model, r) for r in payload[key]])
+    db.delete(archive)
+    if archive.player_group is not None:
+        record_changes(db, archive.player_group, [("game", archive.game_id)])
+    invalidate(db, game_key(game_id))
+    db.commit()
+    return True
+
+
+def archived_history(archive: GameArchive) -> dict:
+    """The ``matches``/``players``/``winners`` parts of a history response."""
+    payload = load_payload(archive)
+    names = payload["names"]
+    match_players = {}
+    for p in payload.get("match_players", []):
+        if p["player_id"] in names:
+            match_players.setdefault(p["match_id"], []).append(
+                SimpleNamespace(name=names[p["player_id"]], **p)
+            )
+
+    def _details(m):
+        if m["details"] is not None:
+            return json.loads(m["details"])
+        match = _load(GameMatch, m)
+        return match_details(
+            match_players.get(m["id"], []),
+            match["started_at"],
+            match["created_at"],
+            m["winner_id"],
+        )
+
+    # Same inner-join semantics as the live query: rows whose player has
+    # since been deleted are left out.
+    return {
+        "matches": [
+            {
+                "round": m["round"],
+                "player_name": names[m["winner_id"]],
+                "winner_id": uuid.UUID(m["winner_id"]),
+                "score": m["score"],
+                "details": _details(m),
+                "created_at": m["created_at"],
+            }
+            for m in sorted(payload["matches"], key=lambda m: m["round"])
+            if m["winner_id"] in names
+        ],
+        "players": [
+            {"player_id": uuid.UUID(p["player_id"]), "name": names[p["player_id"]]}
+            for p in payload["players"]
+            if p["player_id"] in names
+        ],
+        "winners": [
+            {"player_id": uuid.UUID(w["player_id"]), "name": names[w["player_id"]]}
+            for w in payload["winners"]
+            if w["player_id"] in names
+        ],
+    }
+
+
+def archive_completed_games(older_than: datetime.timedelta, limit: int | None = None):
+    return sum(
+        _archive_shard(shard, older_than, limit) for shard in shard_router.engines
+    )
+
+
+def _archive_shard(shard: str, older_than: datetime.timedelta, limit: int | None):
+    cutoff = datetime.datetime.utcnow() - older_than
+    db = shard_router.session(shard)
+    try:
+        query = (
+            db.query(Game)
+            .outerjoin(GameArchive, GameArchive.game_id == Game.id)
+            .filter(
+                Game.status == "completed",
+                Game.end_time < cutoff,
+                GameArchive.game_id.is_(None),
+            )
+            .order_by(Game.end_time)
+        )
+        if limit:
+            query = query.limit(limit)
+        archived = 0
+        for game in query.all():
+            archive_game(db, game)
+            archived += 1
+        return archived
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    archive = commands.add_parser("archive", help="archive completed games")
+    archive.add_argument("--older-than-days", type=int, default=30)
+    archive.add_argument("--limit", type=int, default=None)
+    restore = commands.add_parser("restore", help="move a game back to hot tables")
+    restore.add_argument("game_id", type=uuid.UUID)
+    args = parser.parse_args()
+
+    if args.command == "archive":
+        count = archive_completed_games(
+            datetime.timedelta(days=args.older_than_days), args.limit
+        )
+        print(f"Archived {count} games")
+    else:
+        restored = False
+        for shard in shard_router.engines:
+            db = shard_router.session(shard)
+            try:
+                restored = unarchive_game(db, args.game_id)
+            finally:
+                db.close()
+            if restored:
+                break
+        print("Restored" if restored else "No archive found for that game")
+
+
+if __name__ == "__main__":
+    main()
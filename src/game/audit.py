@@ -0,0 +1,102 @@
+import datetime
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from sqlalchemy import insert
+from src.core.config import settings
+from src.core.database import SessionLocal
+from src.core.metrics import registry
+from src.game.models import GameLog
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLogWriter(threading.Thread):
+    """Buffers GameLog rows in memory and writes them in multi-row batches.
+
+    Endpoints call ``log`` after their own commit and return immediately. The
+    writer thread flushes when ``batch_size`` events are waiting or
+    ``flush_interval`` seconds have passed, whichever comes first. When the
+    buffer is full, ``log`` waits up to ``put_timeout`` for room and then
+    drops the event rather than stall the request.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_pending: int = 10000,
+        put_timeout: float = 0.05,
+    ):
+        super().__init__(name="audit-log-writer", daemon=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stopping = threading.Event()
+
+    def log(self, game_id, action: str, player_id=None, details: dict | None = None):
+        row = {
+            "id": uuid.uuid4(),
+            "game_id": game_id,
+            "player_id": player_id,
+            "action": action,
+            "details": json.dumps(details, default=str) if details else None,
+            "timestamp": datetime.datetime.utcnow(),
+        }
+        try:
+            self._queue.put(row, timeout=self.put_timeout)
+        except queue.Full:
+            self.dropped += 1
+            registry.set_gauge("audit_log_dropped_total", self.dropped)
+
+    def run(self):
+        while not self._stopping.is_set():
+            self._flush(self._collect())
+        # Drain whatever is left once stop() was called.
+        while not self._queue.empty():
+            self._flush(self._collect(wait=False))
+
+    def stop(self, timeout: float = 10.0):
+        self._stopping.set()
+        self.join(timeout)
+
+    def _collect(self, wait: bool = True):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if wait and remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if self._stopping.is_set():
+                wait = False
+        return batch
+
+    def _flush(self, batch):
+        if not batch:
+            return
+        db = SessionLocal()
+        try:
+            # One executemany; SQLAlchemy sends it as multi-row INSERTs.
+            db.execute(insert(GameLog), batch)
+            db.commit()
+        except Exception:
+            logger.exception("Audit log flush failed", extra={"rows": len(batch)})
+        finally:
+            db.close()
+
+
+audit_log = AuditLogWriter(
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_SECONDS,
+    max_pending=settings.AUDIT_MAX_PENDING,
+)
@@ -0,0 +1,632 @@
+"""In-process scoreboards for ongoing games.
+
+With ``GAME_ENGINE`` enabled, a game's scoreboard is loaded into memory the
+first time a round is played and served from there until the game ends.
+``add_winner``, ``disable_player`` and ``get_players_by_game`` then touch no
+rows at all; each change is appended to a write-behind journal that a
+background thread writes to the database at most ``flush_interval`` seconds
+later. Endpoints that still read the database, such as the game history,
+lag behind by at most that long.
+
+The database stays the source of truth: after a restart, games are simply
+loaded again on first use, and games nobody plays for
+``GAME_ENGINE_IDLE_SECONDS`` are dropped from memory. The engine assumes
+every request for a game reaches the same process (run a single worker, or
+route by group); changes still in the journal when the process dies are
+lost. Each journal write is conditional on the game still being ongoing at
+the version the engine last wrote, so a game changed behind the engine's
+back is quarantined instead of overwritten.
+``python -m benchmarks.game_engine`` compares a round's latency with and
+without the engine.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+from src.core.cache import invalidate
+from src.core.config import settings
+from src.core.metrics import registry
+from src.core.shards import shard_router
+from src.game.audit import audit_log
+from src.game.models import Game, GameMatch, GameMatchPlayer, GamePlayer, Player
+from src.game.service import as_utc, game_key, ongoing_key
+from src.game.sync import record_changes
+
+logger = logging.getLogger(__name__)
+
+
+class LivePlayer:
+    __slots__ = (
+        "game_player_id",
+        "player_id",
+        "name",
+        "avatar",
+        "score",
+        "total_win",
+        "status",
+        "version",
+    )
+
+    def __init__(self, row):
+        for name in self.__slots__:
+            setattr(self, name, getattr(row, name))
+
+    def state(
+        self, score: int = 0, wins: int = 0, status: str | None = None
+    ) -> dict:
+        """The row's state after adding ``score`` and ``wins``.
+
+        Any change bumps the version, like the CAS writes in the router do.
+        """
+        changed = bool(score or wins) or status is not None
+        return {
+            "id": self.game_player_id,
+            "score": self.score + score,
+            "total_win": self.total_win + wins,
+            "status": self.status if status is None else status,
+            "version": self.version + changed,
+        }
+
+    def apply(self, state: dict):
+        self.score = state["score"]
+        self.total_win = state["total_win"]
+        self.status = state["status"]
+        self.version = state["version"]
+
+
+class LiveGame:
+    __slots__ = (
+        "id",
+        "player_group",
+        "version",
+        "rounds",
+        "last_round_at",
+        "players",
+        "lock",
+        "closed",
+        "last_used",
+    )
+
+    def __init__(
+        self, game_id, player_group, version, rounds, last_round_at, players
+    ):
+        self.id = game_id
+        self.player_group = player_group
+        self.version = version  # games.version when loaded
+        self.rounds = rounds
+        self.last_round_at = last_round_at
+        self.players = {p.player_id: p for p in players}
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        # Set once the game has been handed back to the database; a request
+        # that still holds a reference has to load it again.
+        self.closed = False
+
+
+class JournalConflict(Exception):
+    """The game is no longer ongoing at the version the journal expected."""
+
+
+def _as_uuid(value):
+    try:
+        return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+class WriteBehindJournal(threading.Thread):
+    """Writes queued scoreboard changes, one transaction per shard and batch.
+
+    Rounds become multi-row ``game_matches``/``game_match_players`` inserts;
+    ``game_players`` gets one bulk UPDATE with each row's latest state, so a
+    player who changed in ten rounds is written once. Each game's ``games``
+    row is updated only while it is ongoing at the version this journal last
+    left it at; anything else is a ``JournalConflict``.
+
+    When a shard's batch fails, its games are written one by one so that one
+    bad game can't hold up the rest. A game whose entries conflict, failed
+    ``max_attempts`` passes, or are the oldest once more than ``max_pending``
+    entries are waiting, is quarantined: its entries are logged and written
+    to the audit log, and ``on_quarantine`` makes the engine reload the game
+    from the database. ``append`` raises a 503 once ``max_pending`` entries
+    are queued, before the caller changes anything.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 0.5,
+        max_pending: int = 10000,
+        max_attempts: int = 5,
+    ):
+        super().__init__(name="game-engine-journal", daemon=True)
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.on_quarantine = None
+        self.quarantined = 0
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._pending = []
+        self._attempts = {}  # game_id -> failed passes in a row
+        self._versions = {}  # game_id -> games.version after our last write
+        self._quarantined_now = set()
+        self._flush_lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def append(self, entry: dict):
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            raise HTTPException(
+                status_code=503,
+                detail=[{"msg": "Too many rounds are waiting to be saved, retry"}],
+            )
+
+    def forget(self, game_id):
+        """Drop the version kept for a game that left memory."""
+        with self._flush_lock:
+            self._versions.pop(game_id, None)
+
+    def run(self):
+        while not self._stopping.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                pass  # logged in flush; failed entries are retried next pass
+        self.flush()
+
+    def stop(self, timeout: float = 10.0):
+        self._stopping.set()
+        self.join(timeout)
+
+    def flush(self, game_id=None):
+        """Write everything appended so far; safe to call from any thread.
+
+        Raises if entries are left unwritten or were quarantined by this
+        call: any at all, or with ``game_id`` only that game's.
+        """
+        with self._flush_lock:
+            self._quarantined_now.clear()
+            while True:
+                try:
+                    self._pending.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not self._pending:
+                return
+            by_shard = {}
+            for entry in self._pending:
+                shard = shard_router.locate(entry["player_group"])[0]
+                by_shard.setdefault(shard, []).append(entry)
+            failed = []
+            for shard, entries in by_shard.items():
+                failed.extend(self._write_shard(shard, entries))
+            # Entries keep their order within a game, which is all that matters.
+            self._pending = self._enforce_limits(failed)
+            left = [
+                e for e in self._pending if game_id is None or e["game_id"] == game_id
+            ]
+            if left:
+                raise RuntimeError(f"{len(left)} journal entries not written")
+            if self._quarantined_now and (
+                game_id is None or game_id in self._quarantined_now
+            ):
+                raise RuntimeError("journal entries quarantined")
+
+    def _write_shard(self, shard: str, entries) -> list:
+        """Write ``entries``; returns the ones that could not be written."""
+        try:
+            self._write(shard, entries)
+        except Exception:
+            logger.exception(
+                "Game journal flush failed, writing games one by one",
+                extra={"shard": shard, "entries": len(entries)},
+            )
+        else:
+            for entry in entries:
+                self._attempts.pop(entry["game_id"], None)
+            return []
+
+        by_game = {}
+        for entry in entries:
+            by_game.setdefault(entry["game_id"], []).append(entry)
+        failed = []
+        for game_id, game_entries in by_game.items():
+            try:
+                self._write(shard, game_entries)
+            except JournalConflict:
+                self._quarantine(game_id, game_entries, "changed in the database")
+            except Exception:
+                self._attempts[game_id] = self._attempts.get(game_id, 0) + 1
+                failed.extend(game_entries)
+            else:
+                self._attempts.pop(game_id, None)
+        return failed
+
+    def _enforce_limits(self, failed: list) -> list:
+        by_game = {}
+        for entry in failed:
+            by_game.setdefault(entry["game_id"], []).append(entry)
+        kept = len(failed)
+        for game_id, entries in by_game.items():
+            if self._attempts.get(game_id, 0) >= self.max_attempts:
+                self._quarantine(game_id, entries, "retries exhausted")
+                kept -= len(entries)
+        # Over the cap, the games waiting longest go first.
+        for game_id, entries in by_game.items():
+            if kept <= self.max_pending:
+                break
+            if game_id in self._attempts:
+                self._quarantine(game_id, entries, "journal full")
+                kept -= len(entries)
+        return [e for e in failed if e["game_id"] in self._attempts]
+
+    def _quarantine(self, game_id, entries, reason: str):
+        self._attempts.pop(game_id, None)
+        self._versions.pop(game_id, None)
+        self._quarantined_now.add(game_id)
+        self.quarantined += len(entries)
+        registry.set_gauge("game_journal_quarantined", self.quarantined)
+        # The log line keeps the entries even when the database is what
+        # failed; the audit row keeps them next to the game's other events.
+        logger.error(
+            "Game journal entries quarantined",
+            extra={"game_id": str(game_id), "reason": reason, "entries": entries},
+        )
+        audit_log.log(
+            game_id,
+            "journal_quarantined",
+            details={"reason": reason, "entries": entries},
+        )
+        if self.on_quarantine is not None:
+            self.on_quarantine(game_id)
+
+    def _write(self, shard: str, entries):
+        matches, match_players, states, keys = [], [], {}, set()
+        changes, rounds, versions = {}, {}, {}
+        for entry in entries:
+            game_id = entry["game_id"]
+            versions.setdefault(
+                game_id, self._versions.get(game_id, entry["game_version"])
+            )
+            group_changes = changes.setdefault(entry["player_group"], [])
+            group_changes.append(("game", entry["game_id"]))
+            if "match" in entry:
+                matches.append(entry["match"])
+                rounds[entry["game_id"]] = rounds.get(entry["game_id"], 0) + 1
+                match_players.extend(entry["match_players"])
+                group_changes.append(("round", entry["match"]["id"]))
+            for state in entry["players"]:
+                states[state["id"]] = state
+            keys.add(game_key(entry["game_id"]))
+            keys.add(ongoing_key(entry["player_group"]))
+
+        db = shard_router.session(shard)
+        try:
+            for game_id, version in versions.items():
+                claimed = db.execute(
+                    update(Game)
+                    .where(
+                        Game.id == game_id,
+                        Game.status == "ongoing",
+                        Game.version == version,
+                    )
+                    .values(
+                        round_count=Game.round_count + rounds.get(game_id, 0),
+                        version=version + 1,
+                    )
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                if not claimed:
+                    raise JournalConflict(game_id)
+            if matches:
+                db.execute(insert(GameMatch), matches)
+                db.execute(insert(GameMatchPlayer), match_players)
+            db.execute(update(GamePlayer), list(states.values()))
+            for player_group, group_changes in changes.items():
+                record_changes(db, player_group, group_changes)
+            invalidate(db, *keys)
+            db.commit()
+        finally:
+            db.close()
+        for game_id, version in versions.items():
+            self._versions[game_id] = version + 1
+
+
+class GameEngine:
+    def __init__(self, journal: WriteBehindJournal):
+        self.journal = journal
+        self.journal.on_quarantine = self._evict
+        self._games: dict[uuid.UUID, LiveGame] = {}
+        self._held: dict[uuid.UUID, int] = {}  # game_id -> callers in released()
+        self._releases = 0
+        self._lock = threading.Lock()
+
+    def peek(self, game_id, player_group: str) -> LiveGame | None:
+        """The game if it is already in memory; never touches the database."""
+        game = self._games.get(_as_uuid(game_id))
+        if game is None or game.player_group != player_group:
+            return None
+        return game
+
+    def get(self, db: Session, game_id, player_group: str) -> LiveGame | None:
+        """The ongoing game, loading it from ``db`` on first use."""
+        game_id = _as_uuid(game_id)
+        if game_id is None:
+            return None
+        game = self._games.get(game_id)
+        while game is None:
+            with self._lock:
+                if game_id in self._held:
+                    raise HTTPException(
+                        status_code=409,
+                        detail=[{"msg": "The game is being updated, please retry"}],
+                    )
+                releases = self._releases
+            game = self._load(db, game_id)
+            if game is None:
+                return None
+            with self._lock:
+                # A release that started meanwhile may be changing the rows
+                # just read; load them again.
+                if self._releases != releases:
+                    game = None
+                    continue
+                game = self._games.setdefault(game_id, game)
+        if game.player_group != player_group:
+            return None
+        game.last_used = time.monotonic()
+        return game
+
+    def release(self, game_id):
+        """Flush the game's changes and drop it from memory.
+
+        Raises RuntimeError, and keeps the game, when its changes could not
+        be written.
+        """
+        game = self._games.get(_as_uuid(game_id))
+        if game is None:
+            return
+        with game.lock:
+            self.journal.flush(game.id)
+            game.closed = True
+            with self._lock:
+                self._games.pop(game.id, None)
+            self.journal.forget(game.id)
+
+    @contextmanager
+    def released(self, game_id):
+        """Release the game and keep it out of memory until the block exits.
+
+        Wraps endpoint code that changes the game directly in the database
+        (adding players, replaying rounds, ending it): it sees the latest
+        scores, and a round arriving before its commit gets a 409 instead of
+        loading rows that are about to change. With the engine off nothing is
+        in memory and this only does the bookkeeping.
+        """
+        game_id = _as_uuid(game_id)
+        if game_id is None:
+            yield
+            return
+        with self._lock:
+            self._held[game_id] = self._held.get(game_id, 0) + 1
+            self._releases += 1
+        try:
+            try:
+                self.release(game_id)
+            except RuntimeError:
+                raise HTTPException(
+                    status_code=503,
+                    detail=[{"msg": "The game's last rounds aren't saved yet, retry"}],
+                )
+            yield
+        finally:
+            with self._lock:
+                if self._held[game_id] == 1:
+                    del self._held[game_id]
+                else:
+                    self._held[game_id] -= 1
+
+    def evict_idle(self, idle_seconds: float) -> int:
+        """Release every game unused for ``idle_seconds``; returns how many."""
+        cutoff = time.monotonic() - idle_seconds
+        evicted = 0
+        for game in list(self._games.values()):
+            if game.last_used >= cutoff:
+                continue
+            try:
+                self.release(game.id)
+            except RuntimeError:
+                continue  # its rounds are still unwritten; next time
+            evicted += 1
+        registry.set_gauge("game_engine_games", len(self._games))
+        return evicted
+
+    def _evict(self, game_id):
+        # Its changes were quarantined, so memory is ahead of the database;
+        # the next request loads what the database has. Called from flush,
+        # possibly with the game's lock held by release, so not taken here.
+        with self._lock:
+            game = self._games.pop(game_id, None)
+        if game is not None:
+            game.closed = True
+
+    def _load(self, db: Session, game_id: uuid.UUID) -> LiveGame | None:
+        game = (
+            db.query(
+                Game.id,
+                Game.player_group,
+                Game.version,
+                Game.created_at,
+                Game.round_count,
+            )
+            .filter(Game.id == game_id, Game.status == "ongoing")
+            .first()
+        )
+        if game is None:
+            return None
+        players = (
+            db.query(
+                GamePlayer.id.label("game_player_id"),
+                GamePlayer.player_id,
+                Player.name,
+                Player.avatar,
+                GamePlayer.score,
+                GamePlayer.total_win,
+                GamePlayer.status,
+                GamePlayer.version,
+            )
+            .join(Player, Player.id == GamePlayer.player_id)
+            .filter(GamePlayer.game_id == game_id)
+            .all()
+        )
+        last_round_at = (
+            db.query(func.max(GameMatch.created_at))
+            .filter(GameMatch.game_id == game_id)
+            .scalar()
+        )
+        return LiveGame(
+            game.id,
+            game.player_group,
+            game.version,
+            game.round_count,
+            as_utc(last_round_at or game.created_at),
+            [LivePlayer(p) for p in players],
+        )
+
+    def add_winner(self, db: Session, game_id, player_id, player_group: str):
+        """Play a round in memory.
+
+        Returns the winner's state after the round, the points added and the
+        round number.
+        """
+        while True:
+            game = self.get(db, game_id, player_group)
+            winner = game and game.players.get(_as_uuid(player_id))
+            if winner is None:
+                raise HTTPException(
+                    status_code=404, detail=[{"msg": "No winner found for this game"}]
+                )
+            with game.lock:
+                if game.closed:
+                    continue
+                add_score = self._record_round(game, winner)
+                winner_data = {
+                    "player_id": winner.player_id,
+                    "name": winner.name,
+                    "avatar": winner.avatar,
+                    "total_win": winner.total_win,
+                    "score": winner.score,
+                }
+                return winner_data, add_score, game.rounds
+
+    def _record_round(self, game: LiveGame, winner: LivePlayer) -> int:
+        losers = [
+            p
+            for p in game.players.values()
+            if p is not winner and p.status == "active"
+        ]
+        add_score = len(losers)
+        if add_score == 0:
+            raise HTTPException(
+                status_code=404,
+                detail=[{"msg": "No active players found for this game"}],
+            )
+        added = {p.player_id: -1 for p in losers}
+        added[winner.player_id] = add_score
+        states = {
+            p.player_id: p.state(added.get(p.player_id, 0), int(p is winner))
+            for p in game.players.values()
+        }
+
+        ended_at = datetime.now(timezone.utc)
+        match_id = uuid.uuid4()
+        # Queued before anything changes, so a full journal leaves the
+        # scoreboard as it was.
+        self.journal.append(
+            {
+                "game_id": game.id,
+                "game_version": game.version,
+                "player_group": game.player_group,
+                "match": {
+                    "id": match_id,
+                    "game_id": game.id,
+                    "round": game.rounds + 1,
+                    "winner_id": winner.player_id,
+                    "score": add_score,
+                    "started_at": game.last_round_at,
+                    "created_at": ended_at,
+                    "updated_at": ended_at,
+                },
+                "match_players": [
+                    {
+                        "match_id": match_id,
+                        "player_id": player_id,
+                        "game_id": game.id,
+                        "status": state["status"],
+                        "score": state["score"],
+                        "score_added": added.get(player_id, 0),
+                    }
+                    for player_id, state in states.items()
+                ],
+                "players": list(states.values()),
+            }
+        )
+        for player_id, state in states.items():
+            game.players[player_id].apply(state)
+        game.rounds += 1
+        game.last_round_at = ended_at
+        return add_score
+
+    def set_status(
+        self, db: Session, game_id, player_id, status: str, player_group: str
+    ):
+        while True:
+            game = self.get(db, game_id, player_group)
+            player = game and game.players.get(_as_uuid(player_id))
+            if player is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=[{"msg": "Player not found in ongoing game"}],
+                )
+            with game.lock:
+                if game.closed:
+                    continue
+                state = player.state(status=status)
+                self.journal.append(
+                    {
+                        "game_id": game.id,
+                        "game_version": game.version,
+                        "player_group": game.player_group,
+                        "players": [state],
+                    }
+                )
+                player.apply(state)
+                return
+
+
+async def run_idle_eviction(idle_seconds: float):
+    """Drop games nobody has played for ``idle_seconds`` from memory."""
+    while True:
+        await asyncio.sleep(idle_seconds)
+        try:
+            await run_in_threadpool(game_engine.evict_idle, idle_seconds)
+        except Exception:
+            logger.exception("Game engine eviction failed")
+
+
+game_engine = GameEngine(
+    WriteBehindJournal(
+        settings.GAME_ENGINE_FLUSH_SECONDS,
+        settings.GAME_ENGINE_MAX_PENDING,
+        settings.GAME_ENGINE_FLUSH_ATTEMPTS,
+    )
+)
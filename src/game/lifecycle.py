@@ -0,0 +1,241 @@
+"""Ending games, by request or automatically.
+
+Score and round limits are checked by the endpoints that play rounds.
+Time limits are kept in ``game_timers``, a hashed timer wheel driven by one
+asyncio task: arming, cancelling and expiring a timer are O(1), and nothing
+polls the ``games`` table. Timers live in the process that created the
+game; on startup every process re-arms the ongoing timed games once. Two
+processes ending the same game is harmless, only the first one wins.
+"""
+
+import asyncio
+import datetime
+import logging
+import math
+import threading
+import time
+import uuid
+from datetime import timezone
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from src.core.cache import invalidate
+from src.core.config import settings
+from src.core.shards import shard_router
+from src.game.audit import audit_log
+from src.game.engine import game_engine
+from src.game.models import Game, GamePlayer, Winner
+from src.game.service import as_utc, game_key, ongoing_key
+from src.game.sync import record_changes
+
+logger = logging.getLogger(__name__)
+
+
+def end_game(db: Session, game_id, player_group: str, details: dict) -> int | None:
+    """Complete the game and record its winners.
+
+    Every player on the top score wins. Returns that score, or None when
+    the game was no longer ongoing (someone else ended it first).
+    """
+    # The game engine can't load the game again until the claim commits.
+    with game_engine.released(game_id):
+        return _end_game(db, game_id, player_group, details)
+
+
+def _end_game(db: Session, game_id, player_group: str, details: dict) -> int | None:
+    # Claim the game first: the UPDATE locks its row and bumps the version,
+    # so a round that is still being written either commits before the
+    # scores below are read or fails its version check and is retried.
+    ended = db.execute(
+        update(Game)
+        .where(
+            Game.id == game_id,
+            Game.player_group == player_group,
+            Game.status == "ongoing",
+        )
+        .values(
+            status="completed",
+            end_time=datetime.datetime.now(timezone.utc),
+            version=Game.version + 1,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not ended:
+        db.rollback()
+        return None
+
+    winners = (
+        db.query(GamePlayer.player_id, GamePlayer.score)
+        .filter(GamePlayer.game_id == game_id)
+        .order_by(GamePlayer.score.desc())
+        .all()
+    )
+    if not winners:
+        db.rollback()
+        raise HTTPException(
+            status_code=404, detail=[{"msg": "No players found in the game"}]
+        )
+
+    winner_score = winners[0].score
+    db.add_all(
+        Winner(game_id=game_id, player_id=winner.player_id, score=winner_score)
+        for winner in winners
+        if winner.score == winner_score
+    )
+    record_changes(db, player_group, [("game", game_id)])
+    invalidate(db, game_key(game_id), ongoing_key(player_group))
+    db.commit()
+    game_timers.cancel(game_id)
+
+    audit_log.log(
+        game_id, "game_ended", details={**details, "winner_score": winner_score}
+    )
+    return winner_score
+
+
+class TimerWheel:
+    """Hashed timer wheel with ``slots`` buckets of ``tick`` seconds.
+
+    A timer more than one revolution away carries the number of laps left,
+    so any delay fits. Timers fire up to one tick late. A timer whose expiry
+    fails is rescheduled after ``retry_base`` seconds, doubling on each
+    further failure up to ``retry_max``.
+    """
+
+    def __init__(
+        self,
+        tick: float = 1.0,
+        slots: int = 512,
+        retry_base: float = 5.0,
+        retry_max: float = 300.0,
+    ):
+        self.tick = tick
+        self.slots = slots
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._wheel = [{} for _ in range(slots)]  # game_id -> [laps, group]
+        self._where = {}  # game_id -> slot
+        self._failures = {}  # game_id -> consecutive failed expiries
+        self._cursor = 0
+        self._lock = threading.Lock()
+
+    def schedule(self, game_id, player_group: str, deadline: datetime.datetime):
+        if self.tick <= 0:
+            return
+        delay = (deadline - datetime.datetime.now(timezone.utc)).total_seconds()
+        ticks = max(1, math.ceil(delay / self.tick))
+        game_id = uuid.UUID(str(game_id))
+        with self._lock:
+            self._remove(game_id)
+            slot = (self._cursor + ticks) % self.slots
+            self._wheel[slot][game_id] = [(ticks - 1) // self.slots, player_group]
+            self._where[game_id] = slot
+
+    def cancel(self, game_id):
+        try:
+            game_id = uuid.UUID(str(game_id))
+        except ValueError:
+            return
+        with self._lock:
+            self._remove(game_id)
+            self._failures.pop(game_id, None)
+
+    def _remove(self, game_id):
+        slot = self._where.pop(game_id, None)
+        if slot is not None:
+            del self._wheel[slot][game_id]
+
+    def advance(self) -> list:
+        """Move one tick forward; returns the ``(game_id, group)`` now due."""
+        with self._lock:
+            self._cursor = (self._cursor + 1) % self.slots
+            bucket = self._wheel[self._cursor]
+            due = []
+            for game_id, entry in list(bucket.items()):
+                if entry[0] == 0:
+                    due.append((game_id, entry[1]))
+                    del bucket[game_id]
+                    del self._where[game_id]
+                else:
+                    entry[0] -= 1
+            return due
+
+    async def run(self, expire):
+        next_tick = time.monotonic() + self.tick
+        while True:
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+            # Catch up on ticks missed while the event loop was busy.
+            while next_tick <= time.monotonic():
+                next_tick += self.tick
+                for game_id, player_group in self.advance():
+                    try:
+                        await run_in_threadpool(expire, game_id, player_group)
+                    except Exception:
+                        self._retry_later(game_id, player_group)
+                    else:
+                        self._failures.pop(game_id, None)
+
+    def _retry_later(self, game_id, player_group: str):
+        failures = self._failures.get(game_id, 0) + 1
+        delay = min(self.retry_max, self.retry_base * 2 ** (failures - 1))
+        logger.exception(
+            "Could not end game at its time limit, retrying",
+            extra={"game_id": str(game_id), "attempt": failures, "retry_in": delay},
+        )
+        retry_at = datetime.datetime.now(timezone.utc) + datetime.timedelta(
+            seconds=delay
+        )
+        self.schedule(game_id, player_group, retry_at)
+        self._failures[game_id] = failures
+
+
+game_timers = TimerWheel(settings.GAME_TIMER_TICK_SECONDS)
+
+
+def schedule_time_limit(game) -> bool:
+    """Arm the timer for a game created with ``end_condition="time"``."""
+    if game.end_condition != "time" or not game.time_limit:
+        return False
+    limit = datetime.timedelta(seconds=game.time_limit)
+    game_timers.schedule(game.id, game.player_group, as_utc(game.start_time) + limit)
+    return True
+
+
+def expire_game(game_id, player_group: str):
+    shard, moving = shard_router.locate(player_group)
+    if moving:
+        # Writes are refused while the group is copied; try again after.
+        retry_at = datetime.datetime.now(timezone.utc) + datetime.timedelta(seconds=30)
+        game_timers.schedule(game_id, player_group, retry_at)
+        return
+    db = shard_router.session(shard)
+    try:
+        end_game(db, game_id, player_group, {"reason": "time_limit"})
+    finally:
+        db.close()
+
+
+def arm_game_timers() -> int:
+    """Arm a timer for every ongoing timed game; run once at startup."""
+    armed = 0
+    for shard in shard_router.engines:
+        db = shard_router.session(shard)
+        try:
+            games = db.query(
+                Game.id,
+                Game.player_group,
+                Game.start_time,
+                Game.end_condition,
+                Game.time_limit,
+            ).filter(Game.status == "ongoing", Game.end_condition == "time")
+            for game in games:
+                armed += schedule_time_limit(game)
+        finally:
+            db.close()
+    return armed
+
+
+async def run_game_timers():
+    await run_in_threadpool(arm_game_timers)
+    await game_timers.run(expire_game)
@@ -1,14 +1,27 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Enum,
+    Index,
+    Integer,
+    LargeBinary,
+    SmallInteger,
+    String,
+    Text,
+    event,
+)
 from src.core.database import Base
+from src.core.partitions import default_partition_ddl
+from src.core.types import GUID
 import datetime
 import uuid
-from sqlalchemy.dialects.postgresql import UUID
 
 
 class Player(Base):
     __tablename__ = "players"
     id = Column(
-        UUID(as_uuid=True),
+        GUID,
         primary_key=True,
         default=uuid.uuid4,
         unique=True,
@@ -33,7 +46,7 @@ class Player(Base):
 class Game(Base):
     __tablename__ = "games"
     id = Column(
-        UUID(as_uuid=True),
+        GUID,
         primary_key=True,
         default=uuid.uuid4,
         unique=True,
@@ -50,6 +63,13 @@ class Game(Base):
     )  # ongoing, completed, cancelled
     start_time = Column(DateTime, nullable=True)
     end_time = Column(DateTime, nullable=True)
+    # Kept in step with game_players / game_matches so the ongoing-game
+    # summary is a single row.
+    player_count = Column(Integer, default=0, nullable=False)
+    round_count = Column(Integer, default=0, nullable=False)
+    # Bumped by every write that a round depends on; rounds compare-and-swap
+    # on it instead of locking the row while they compute scores.
+    version = Column(Integer, default=0, nullable=False)
     created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
     updated_at = Column(
         DateTime,
@@ -61,18 +81,22 @@ class Game(Base):
 
 class GamePlayer(Base):
     __tablename__ = "game_players"
+    __table_args__ = (
+        Index("ix_game_players_game_id_player_id", "game_id", "player_id"),
+    )
     id = Column(
-        UUID(as_uuid=True),
+        GUID,
         primary_key=True,
         default=uuid.uuid4,
         unique=True,
         index=True,
     )
-    game_id = Column(UUID(as_uuid=True), nullable=False)
-    player_id = Column(UUID(as_uuid=True), nullable=False)
+    game_id = Column(GUID, nullable=False)
+    player_id = Column(GUID, nullable=False)
     total_win = Column(Integer, default=0, nullable=False)
     score = Column(Integer, default=0, nullable=False)
     status = Column(String(20), default="active", nullable=False)  # active, inactive
+    version = Column(Integer, default=0, nullable=False)  # see Game.version
     created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
     updated_at = Column(
         DateTime,
@@ -85,14 +109,14 @@ class GamePlayer(Base):
 class GameDetail(Base):
     __tablename__ = "game_details"
     id = Column(
-        UUID(as_uuid=True),
+        GUID,
         primary_key=True,
         default=uuid.uuid4,
         unique=True,
         index=True,
     )
-    game_id = Column(UUID(as_uuid=True), nullable=False)
-    winner_id = Column(UUID(as_uuid=True), nullable=True)
+    game_id = Column(GUID, nullable=False)
+    winner_id = Column(GUID, nullable=True)
     total_score = Column(Integer, default=0, nullable=False)
     details = Column(Text, nullable=True)  # JSON string or text for game details
     round_number = Column(Integer, default=1, nullable=False)
@@ -107,38 +131,50 @@ class GameDetail(Base):
 
 class GameLog(Base):
     __tablename__ = "game_logs"
+    # Monthly range partitions, see src/core/partitions.py. The partition key
+    # has to be part of the primary key, and ids can't be unique on their own.
+    __table_args__ = {"postgresql_partition_by": 'RANGE ("timestamp")'}
     id = Column(
-        UUID(as_uuid=True),
+        GUID,
         primary_key=True,
         default=uuid.uuid4,
-        unique=True,
         index=True,
     )
-    game_id = Column(UUID(as_uuid=True), nullable=False)
-    player_id = Column(UUID(as_uuid=True), nullable=True)
+    game_id = Column(GUID, nullable=False, index=True)
+    player_id = Column(GUID, nullable=True)
     action = Column(String(200), nullable=False)  # e.g., "draw_card", "play_card"
     details = Column(Text, nullable=True)  # Additional details about the action
-    timestamp = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    timestamp = Column(
+        DateTime, default=datetime.datetime.utcnow, nullable=False, primary_key=True
+    )
     created_by = Column(
-        UUID(as_uuid=True), nullable=True
+        GUID, nullable=True
     )  # User who performed the action
 
 
 class GameMatch(Base):
     __tablename__ = "game_matches"
+    # Monthly range partitions on created_at, see GameLog.
+    __table_args__ = (
+        Index("ix_game_matches_game_id_round", "game_id", "round"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
     id = Column(
-        UUID(as_uuid=True),
+        GUID,
         primary_key=True,
         default=uuid.uuid4,
-        unique=True,
         index=True,
     )
-    game_id = Column(UUID(as_uuid=True), nullable=False)
+    game_id = Column(GUID, nullable=False)
     round = Column(Integer, nullable=False)
-    winner_id = Column(UUID(as_uuid=True), nullable=True)
+    winner_id = Column(GUID, nullable=True)
     score = Column(Integer, default=0, nullable=True)
-    details = Column(Text, nullable=True)  # JSON string or text for match details
-    created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    # Legacy per-round JSON; new rounds store game_match_players rows instead.
+    details = Column(Text, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    created_at = Column(
+        DateTime, default=datetime.datetime.utcnow, nullable=False, primary_key=True
+    )
     updated_at = Column(
         DateTime,
         default=datetime.datetime.utcnow,
@@ -147,17 +183,40 @@ class GameMatch(Base):
     )
 
 
+# create_all makes the partitioned parents only; give them somewhere to put
+# rows until maintenance adds the month partitions.
+for _table in (GameLog.__table__, GameMatch.__table__):
+    event.listen(_table, "after_create", default_partition_ddl(_table.name))
+
+
+GAME_PLAYER_STATUSES = ("active", "disabled", "deleted")
+
+
+class GameMatchPlayer(Base):
+    """One player's state at the end of one round (match)."""
+
+    __tablename__ = "game_match_players"
+    match_id = Column(GUID, primary_key=True)
+    player_id = Column(GUID, primary_key=True)
+    game_id = Column(GUID, nullable=False, index=True)
+    status = Column(
+        Enum(*GAME_PLAYER_STATUSES, name="game_player_status"), nullable=False
+    )
+    score = Column(Integer, nullable=False)  # running score after the round
+    score_added = Column(SmallInteger, nullable=False)
+
+
 class Winner(Base):
     __tablename__ = "winners"
     id = Column(
-        UUID(as_uuid=True),
+        GUID,
         primary_key=True,
         default=uuid.uuid4,
         unique=True,
         index=True,
     )
-    game_id = Column(UUID(as_uuid=True), nullable=False)
-    player_id = Column(UUID(as_uuid=True), nullable=False)
+    game_id = Column(GUID, nullable=False)
+    player_id = Column(GUID, nullable=False)
     score = Column(Integer, nullable=False)
     created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
     updated_at = Column(
@@ -166,3 +225,36 @@ class Winner(Base):
         onupdate=datetime.datetime.utcnow,
         nullable=False,
     )
+
+
+class GameArchive(Base):
+    """A completed game's rounds, players and winners folded into one row."""
+
+    __tablename__ = "game_archives"
+    game_id = Column(GUID, primary_key=True)
+    player_group = Column(String(50), nullable=True, index=True)
+    player_count = Column(Integer, nullable=False)
+    winners = Column(Text, nullable=True)  # JSON list, read by /game/recent
+    payload = Column(LargeBinary, nullable=False)  # zlib-compressed JSON
+    archived_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+
+
+class SyncGroup(Base):
+    """Per-group change counter; its row lock orders a group's changes."""
+
+    __tablename__ = "sync_groups"
+    player_group = Column(String(50), primary_key=True)
+    seq = Column(BigInteger, default=0, nullable=False)
+
+
+class GroupChange(Base):
+    """Latest change to one entity of a group, for ``GET /game/sync``."""
+
+    __tablename__ = "group_changes"
+    __table_args__ = (
+        Index("ix_group_changes_player_group_seq", "player_group", "seq"),
+    )
+    player_group = Column(String(50), primary_key=True)
+    entity = Column(String(20), primary_key=True)  # player, game, round
+    entity_id = Column(GUID, primary_key=True)
+    seq = Column(BigInteger, nullable=False)
@@ -0,0 +1,265 @@
+"""Move player groups' game data between shards.
+
+    python -m src.game.rebalance pin
+    python -m src.game.rebalance move <player_group> <shard>
+    python -m src.game.rebalance rebalance
+    python -m src.game.rebalance purge <player_group> <shard>
+
+Run ``pin`` before changing ``DATABASE_SHARDS``: it records where every
+group's rows are now, so they keep being served from there. ``rebalance``
+then moves each pinned group to the shard the ring assigns it and drops
+the pins that have become redundant.
+
+A move is online. Writes for the group are refused (503) while its rows are
+copied, and reads keep hitting the old shard until the assignment flips.
+"""
+
+import argparse
+import logging
+import time
+from sqlalchemy import delete, func, insert, select
+from src.core.cache import invalidate
+from src.core.database import SessionLocal
+from src.core.partitions import PARTITIONED_TABLES, create_partitions
+from src.core.shards import ShardAssignment, shard_key, shard_router
+from src.game.models import (
+    Game,
+    GameArchive,
+    GameDetail,
+    GameMatch,
+    GameMatchPlayer,
+    GamePlayer,
+    GroupChange,
+    Player,
+    SyncGroup,
+    Winner,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rows that carry player_group themselves, and rows that belong to one of the
+# group's games. Games go last when deleting: the others are found through
+# them.
+GROUP_MODELS = (Player, GameArchive, SyncGroup, GroupChange, Game)
+GAME_MODELS = (GamePlayer, GameMatch, GameMatchPlayer, Winner, GameDetail)
+
+
+def _group_filter(model, player_group: str):
+    if model in GROUP_MODELS:
+        return model.player_group == player_group
+    return model.game_id.in_(select(Game.id).where(Game.player_group == player_group))
+
+
+def _current_shard(player_group: str) -> str:
+    db = SessionLocal()
+    try:
+        row = db.get(ShardAssignment, player_group)
+    finally:
+        db.close()
+    if row is not None:
+        return row.shard
+    return shard_router.ring.node_for(player_group)
+
+
+def ensure_partitions(player_group: str, source: str, target: str):
+    """Create the month partitions the group's rows need on ``target``.
+
+    Done in its own short transaction: creating a partition locks the
+    parent table, which the copy would otherwise hold for its whole length.
+    Rows outside these months would still land in the default partition.
+    """
+    if shard_router.engines[target].dialect.name != "postgresql":
+        return
+    src = shard_router.session(source)
+    try:
+        spans = {}
+        for model in GROUP_MODELS + GAME_MODELS:
+            table = model.__table__
+            if table.name not in PARTITIONED_TABLES:
+                continue
+            key = table.c[PARTITIONED_TABLES[table.name]]
+            first, last = src.execute(
+                select(func.min(key), func.max(key)).where(
+                    _group_filter(model, player_group)
+                )
+            ).one()
+            if first is not None:
+                spans[table.name] = (first.date(), last.date())
+    finally:
+        src.close()
+    with shard_router.engines[target].begin() as conn:
+        for table, (first, last) in spans.items():
+            create_partitions(conn, table, first, last)
+
+
+def copy_group(player_group: str, source: str, target: str, chunk_size: int = 1000):
+    """Copy the group's rows from ``source`` to ``target`` in one transaction."""
+    ensure_partitions(player_group, source, target)
+    src = shard_router.session(source)
+    dst = shard_router.session(target)
+    copied = 0
+    try:
+        for model in GROUP_MODELS + GAME_MODELS:
+            table = model.__table__
+            rows = src.execute(
+                select(table)
+                .where(_group_filter(model, player_group))
+                .execution_options(yield_per=chunk_size)
+            )
+            for chunk in rows.mappings().partitions():
+                dst.execute(insert(table), [dict(row) for row in chunk])
+                copied += len(chunk)
+        dst.commit()
+    finally:
+        src.close()
+        dst.close()
+    return copied
+
+
+def purge_group(player_group: str, shard: str) -> int:
+    if _current_shard(player_group) == shard:
+        raise ValueError(f"{player_group} is still served from {shard}")
+    db = shard_router.session(shard)
+    removed = 0
+    try:
+        for model in GAME_MODELS + GROUP_MODELS:
+            removed += db.execute(
+                delete(model.__table__).where(_group_filter(model, player_group))
+            ).rowcount
+        db.commit()
+    finally:
+        db.close()
+    return removed
+
+
+def move_group(player_group: str, target: str, drain_seconds: float = 5.0) -> int:
+    if target not in shard_router.engines:
+        raise ValueError(f"Unknown shard {target}")
+    source = _current_shard(player_group)
+    if source == target:
+        return 0
+
+    db = SessionLocal()
+    try:
+        shard_router.assign(db, player_group, source, moving=True)
+        # Let writes already past the check, and the game engine's journal,
+        # land on the source before copying.
+        time.sleep(drain_seconds)
+        try:
+            copied = copy_group(player_group, source, target)
+        except Exception:
+            shard_router.assign(db, player_group, source, moving=False)
+            raise
+        shard_router.assign(db, player_group, target, moving=False)
+    finally:
+        db.close()
+
+    purge_group(player_group, source)
+    logger.info(
+        "Moved player group",
+        extra={
+            "player_group": player_group,
+            "source": source,
+            "target": target,
+            "rows": copied,
+        },
+    )
+    return copied
+
+
+def pin_groups() -> int:
+    """Record each group's current shard; existing pins are left alone."""
+    found = {}
+    for shard in shard_router.engines:
+        db = shard_router.session(shard)
+        try:
+            groups = db.execute(
+                select(Player.player_group)
+                .where(Player.player_group.is_not(None))
+                .union(
+                    select(Game.player_group).where(Game.player_group.is_not(None))
+                )
+            ).scalars()
+            for group in groups:
+                if group in found:
+                    logger.warning(
+                        "Player group found on two shards",
+                        extra={"player_group": group, "shards": [found[group], shard]},
+                    )
+                found.setdefault(group, shard)
+        finally:
+            db.close()
+
+    db = SessionLocal()
+    try:
+        pinned = set(db.execute(select(ShardAssignment.player_group)).scalars())
+        new = [
+            ShardAssignment(player_group=group, shard=shard, moving=False)
+            for group, shard in found.items()
+            if group not in pinned
+        ]
+        db.add_all(new)
+        invalidate(db, *(shard_key(a.player_group) for a in new))
+        db.commit()
+    finally:
+        db.close()
+    return len(new)
+
+
+def rebalance(drain_seconds: float = 5.0, limit: int | None = None) -> int:
+    """Move pinned groups to their ring shard and drop pins that match it."""
+    db = SessionLocal()
+    try:
+        assignments = db.execute(select(ShardAssignment)).scalars().all()
+    finally:
+        db.close()
+
+    moved = 0
+    for assignment in assignments:
+        group = assignment.player_group
+        target = shard_router.ring.node_for(group)
+        if assignment.shard != target:
+            if limit is not None and moved >= limit:
+                break
+            move_group(group, target, drain_seconds)
+            moved += 1
+        db = SessionLocal()
+        try:
+            db.execute(
+                delete(ShardAssignment).where(ShardAssignment.player_group == group)
+            )
+            invalidate(db, shard_key(group))
+            db.commit()
+        finally:
+            db.close()
+    return moved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--drain-seconds", type=float, default=5.0)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("pin", help="record where every group lives now")
+    move = commands.add_parser("move", help="move one group to a shard")
+    move.add_argument("player_group")
+    move.add_argument("shard")
+    balance = commands.add_parser("rebalance", help="move groups to their ring shard")
+    balance.add_argument("--limit", type=int, default=None)
+    purge = commands.add_parser("purge", help="delete a moved group's leftovers")
+    purge.add_argument("player_group")
+    purge.add_argument("shard")
+    args = parser.parse_args()
+
+    if args.command == "pin":
+        print(f"Pinned {pin_groups()} groups")
+    elif args.command == "move":
+        rows = move_group(args.player_group, args.shard, args.drain_seconds)
+        print(f"Moved {rows} rows")
+    elif args.command == "rebalance":
+        print(f"Moved {rebalance(args.drain_seconds, args.limit)} groups")
+    else:
+        print(f"Deleted {purge_group(args.player_group, args.shard)} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,74 @@
 from itertools import count
-from fastapi import APIRouter, Depends, Response, HTTPException
+from fastapi import APIRouter, Depends, Header, Response, HTTPException
 from sqlalchemy.orm import Session
 from src.auth import service, schemas
 from src.core.database import SessionLocal
 from fastapi.responses import RedirectResponse
 from datetime import datetime, timezone
 from src.core.database import SessionLocal
-from src.dependencies import get_token_cookie, get_current_user
+from src.dependencies import (
+    get_current_user,
+    get_game_db,
+    get_read_db,
+    get_token_cookie,
+)
+from src.core.cache import invalidate, local_cache
 from src.core.config import settings
+from src.core.idempotency import idempotent
 from src.auth.models import OAuthSession, User
 from sqlalchemy.orm import Session
 from src.game import schemas as player_schemas
-from sqlalchemy import select, exists
+from sqlalchemy import exists, insert, select, update
 from src.game import models as player_models
-from src.game.models import Game, Player, GamePlayer, GameMatch
+from src.game.archive import archived_history
+from src.game.audit import audit_log
+from src.game.engine import game_engine
+from src.game.lifecycle import end_game, schedule_time_limit
+from src.game.sync import changes_since, record_changes
+from src.game.service import (
+    GAME_PROJECTIONS,
+    PLAYER_PROJECTIONS,
+    as_utc,
+    end_condition_met,
+    game_key,
+    match_details,
+    ongoing_game_summary,
+    ongoing_key,
+    roster_key,
+    select_fields,
+)
+from src.game.models import Game, GameArchive, Player, GamePlayer, GameMatch
 from fastapi import Query
 from typing import Annotated
 from fastapi import Form
 from sqlalchemy.dialects import postgresql
-from sqlalchemy import func
+from sqlalchemy import case, func, or_, tuple_
 import json
+import logging
+import uuid
 
-router = APIRouter(prefix="/game", tags=["game"])
-
+logger = logging.getLogger(__name__)
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+router = APIRouter(prefix="/game", tags=["game"])
 
 
 @router.get("/players")
 def get_players(
     response: Response,
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
     q: str = Query(default=None, max_length=100),
+    fields: str | None = Query(default=None, max_length=500),
+    projection: str = Query(default="full", pattern="^(summary|full)$"),
 ):
     user_group = "usergroup_" + str(user.id)
-    query = db.query(player_models.Player).filter(
+    columns = [
+        getattr(player_models.Player, name)
+        for name in select_fields(fields, projection, PLAYER_PROJECTIONS)
+    ]
+    query = db.query(*columns).filter(
         player_models.Player.player_group == user_group
     )
     if q:
@@ -55,7 +81,7 @@ def get_players(
         .all()
     )
     return {
-        "players": players,
+        "players": [player._asdict() for player in players],
         "total": total,
         "offset": offset,
         "limit": limit,
@@ -67,7 +93,7 @@ def delete_player(
     player_id: str,
     response: Response,
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_game_db),
 ):
     user_group = "usergroup_" + str(user.id)
 
@@ -83,7 +109,21 @@ def delete_player(
     if not player:
         raise HTTPException(status_code=404, detail=[{"msg": "Player not found"}])
 
+    # Finished games keep the player count they ended with.
+    db.execute(
+        update(Game)
+        .where(
+            Game.status == "ongoing",
+            Game.id.in_(
+                select(GamePlayer.game_id).where(GamePlayer.player_id == player.id)
+            ),
+        )
+        .values(player_count=Game.player_count - 1, version=Game.version + 1)
+        .execution_options(synchronize_session=False)
+    )
     db.delete(player)
+    record_changes(db, user_group, [("player", player.id)])
+    invalidate(db, roster_key(user_group), ongoing_key(user_group))
     db.commit()
 
     return {"message": "Player deleted successfully", "player": player.name}
@@ -95,7 +135,7 @@ def update_player(
     player: player_schemas.Player,
     response: Response,
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_game_db),
 ):
     user_group = "usergroup_" + str(user.id)
 
@@ -128,6 +168,8 @@ def update_player(
     for key, value in player.dict().items():
         setattr(existing_player, key, value)
 
+    record_changes(db, user_group, [("player", existing_player.id)])
+    invalidate(db, roster_key(user_group))
     db.commit()
     db.refresh(existing_player)
 
@@ -139,7 +181,7 @@ def create_player(
     player: player_schemas.Player,
     response: Response,
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_game_db),
 ):
     user_group = "usergroup_" + str(user.id)
 
@@ -160,6 +202,9 @@ def create_player(
     player_data["player_group"] = user_group
     db_player = player_models.Player(**player_data)
     db.add(db_player)
+    db.flush()
+    record_changes(db, user_group, [("player", db_player.id)])
+    invalidate(db, roster_key(user_group))
     db.commit()
     db.refresh(db_player)
 
@@ -171,19 +216,21 @@ def create_game(
     data: player_schemas.Game,
     response: Response,
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_game_db),
+    idempotency_key: str | None = Header(default=None, max_length=255),
 ):
+    return idempotent(
+        idempotency_key,
+        (user.id, "create_game"),
+        data.model_dump_json(),
+        lambda: _create_game(data, user, db),
+    )
+
+
+def _create_game(data: player_schemas.Game, user: User, db: Session):
     user_group = "usergroup_" + str(user.id)
 
-    existing_game = (
-        db.query(player_models.Game)
-        .filter(
-            player_models.Game.player_group == user_group,
-            player_models.Game.status == "ongoing",
-        )
-        .first()
-    )
-    if existing_game:
+    if ongoing_game_summary(db, user_group):
         raise HTTPException(
             status_code=422,
             detail=[{"msg": "There is already an ongoing game for this user"}],
@@ -219,6 +266,7 @@ def create_game(
         "player_group": user_group,
         "status": "ongoing",
         "start_time": datetime.now(timezone.utc),
+        "player_count": len(valid_player_ids),
     }
 
     game = player_models.Game(**game_data)
@@ -234,7 +282,16 @@ def create_game(
             status="active",
         )
         db.add(game_player)
+    record_changes(db, user_group, [("game", game.id)])
+    invalidate(db, ongoing_key(user_group))
     db.commit()
+    schedule_time_limit(game)
+
+    audit_log.log(
+        game.id,
+        "game_created",
+        details={"user_id": user.id, "players": sorted(map(str, valid_player_ids))},
+    )
 
     return {"message": "Game created successfully", "game_id": game.id}
 
@@ -242,61 +299,38 @@ def create_game(
 @router.get("/ongoing")
 def get_ongoing_game(
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_game_db),
     mode: str = Query(default=None, regex="^(play)$"),
 ):
     user_group = "usergroup_" + str(user.id)
 
-    ongoing_game = (
-        db.query(player_models.Game)
-        .filter(
-            player_models.Game.player_group == user_group,
-            player_models.Game.status == "ongoing",
-        )
-        .first()
-    )
-
+    ongoing_game = ongoing_game_summary(db, user_group)
     if not ongoing_game:
         raise HTTPException(status_code=404, detail=[{"msg": "No ongoing game found"}])
 
     match_data = 0
-
     if mode == "play":
-        matches = (
-            db.query(
-                player_models.GameMatch.round,
-            )
-            .filter(player_models.GameMatch.game_id == ongoing_game.id)
-            .count()
+        live_game = (
+            game_engine.peek(ongoing_game["id"], user_group)
+            if settings.GAME_ENGINE
+            else None
+        )
+        match_data = (
+            live_game.rounds if live_game is not None else ongoing_game["round_count"]
         )
 
-        match_data = matches
-
-    if ongoing_game:
-        total_players = (
-            db.query(player_models.GamePlayer)
-            .join(
-                player_models.Player,
-                player_models.GamePlayer.player_id == player_models.Player.id,
-            )
-            .filter(player_models.GamePlayer.game_id == ongoing_game.id)
-            .count()
-        )
-
-        ongoing_game_data = {
-            "id": ongoing_game.id,
-            "name": ongoing_game.name,
-            "status": ongoing_game.status,
-            "start_time": ongoing_game.start_time,
-            "end_condition": ongoing_game.end_condition,
-            "score_to_win": ongoing_game.score_to_win,
-            "max_rounds": ongoing_game.max_rounds,
-            "time_limit": ongoing_game.time_limit,
-            "total_players": total_players,
-            "match_data": match_data + 1,
-        }
-    else:
-        ongoing_game_data = None
+    ongoing_game_data = {
+        "id": ongoing_game["id"],
+        "name": ongoing_game["name"],
+        "status": ongoing_game["status"],
+        "start_time": ongoing_game["start_time"],
+        "end_condition": ongoing_game["end_condition"],
+        "score_to_win": ongoing_game["score_to_win"],
+        "max_rounds": ongoing_game["max_rounds"],
+        "time_limit": ongoing_game["time_limit"],
+        "total_players": ongoing_game["player_count"],
+        "match_data": match_data + 1,
+    }
 
     return {"data": ongoing_game_data}
 
@@ -304,11 +338,28 @@ def get_ongoing_game(
 @router.get("/players/{game_id}")
 def get_players_by_game(
     game_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: User = Depends(get_current_user),
 ):
     user_group = "usergroup_" + str(user.id)
 
+    if settings.GAME_ENGINE:
+        live_game = game_engine.peek(game_id, user_group)
+        if live_game is not None:
+            return {
+                "players": [
+                    {
+                        "id": player.player_id,
+                        "total_win": player.total_win,
+                        "name": player.name,
+                        "avatar": player.avatar,
+                        "score": player.score,
+                        "status": player.status,
+                    }
+                    for player in live_game.players.values()
+                ]
+            }
+
     players = (
         db.query(
             player_models.GamePlayer.player_id,
@@ -356,10 +407,22 @@ def get_players_by_game(
 @router.put("/play/player/status")
 def disable_player(
     data: player_schemas.PlayerStatus,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_game_db),
     user: User = Depends(get_current_user),
 ):
     user_group = "usergroup_" + str(user.id)
+    if settings.GAME_ENGINE:
+        game_engine.set_status(
+            db, data.game_id, data.player_id, data.status, user_group
+        )
+        audit_log.log(
+            data.game_id,
+            "player_status_changed",
+            player_id=data.player_id,
+            details={"user_id": user.id, "status": data.status},
+        )
+        return {"message": "Player status updated successfully"}
+
     game_player = (
         db.query(player_models.GamePlayer)
         .join(
@@ -383,8 +446,19 @@ def disable_player(
         )
 
     game_player.status = data.status
+    # Bumped in SQL, so a round that read the old status can't be saved.
+    game_player.version = player_models.GamePlayer.version + 1
+    record_changes(db, user_group, [("game", game_player.game_id)])
+    invalidate(db, game_key(data.game_id))
     db.commit()
 
+    audit_log.log(
+        data.game_id,
+        "player_status_changed",
+        player_id=data.player_id,
+        details={"user_id": user.id, "status": data.status},
+    )
+
     return {"message": "Player status updated successfully"}
 
 
@@ -392,203 +466,550 @@ def disable_player(
 def add_winner(
     data: player_schemas.PlayerWinner,
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_game_db),
+    idempotency_key: str | None = Header(default=None, max_length=255),
 ):
+    return idempotent(
+        idempotency_key,
+        (user.id, "add_winner"),
+        data.model_dump_json(),
+        lambda: _add_winner(data, user, db),
+    )
+
+
+def _add_winner_live(data: player_schemas.PlayerWinner, user: User, db: Session):
     user_group = "usergroup_" + str(user.id)
-    winner = (
+    winner_data, add_score, round_number = game_engine.add_winner(
+        db, data.game_id, data.player_id, user_group
+    )
+    audit_log.log(
+        data.game_id,
+        "round_won",
+        player_id=winner_data["player_id"],
+        details={
+            "user_id": user.id,
+            "round": round_number,
+            "score_added": add_score,
+        },
+    )
+    # The summary is cached, so the rules cost no query on most rounds.
+    game = ongoing_game_summary(db, user_group)
+    game_ended = False
+    if (
+        game is not None
+        and str(game["id"]) == str(data.game_id)
+        and end_condition_met(game, winner_data["score"], round_number)
+    ):
+        details = {"user_id": user.id, "reason": game["end_condition"]}
+        game_ended = end_game(db, data.game_id, user_group, details) is not None
+    return {"winner": winner_data, "game_ended": game_ended}
+
+
+def _add_winner(data: player_schemas.PlayerWinner, user: User, db: Session):
+    if settings.GAME_ENGINE:
+        return _add_winner_live(data, user, db)
+    user_group = "usergroup_" + str(user.id)
+    for _ in range(settings.SCORE_UPDATE_RETRIES):
+        result = _try_add_winner(data, user, user_group, db)
+        if result is not None:
+            return result
+    raise HTTPException(
+        status_code=409,
+        detail=[{"msg": "The game changed while saving the round, please retry"}],
+    )
+
+
+def _try_add_winner(
+    data: player_schemas.PlayerWinner, user: User, user_group: str, db: Session
+):
+    """Play one round against a snapshot of the scoreboard.
+
+    The writes are compare-and-swaps on the versions that were read, so if
+    another round or a status change got in first nothing is written and
+    None is returned for the caller to try again.
+    """
+    game = (
         db.query(
-            player_models.Player,
-            player_models.GamePlayer.total_win,
-            player_models.GamePlayer.score,
-        )
-        .join(
-            player_models.GamePlayer,
-            player_models.Player.id == player_models.GamePlayer.player_id,
-        )
-        .join(
-            player_models.Game,
-            player_models.Game.id == player_models.GamePlayer.game_id,
+            Game.id,
+            Game.version,
+            Game.round_count,
+            Game.created_at,
+            Game.end_condition,
+            Game.score_to_win,
+            Game.max_rounds,
         )
         .filter(
-            player_models.Game.id == data.game_id,
-            player_models.Player.id == data.player_id,
-            player_models.Game.player_group == user_group,
+            Game.id == data.game_id,
+            Game.player_group == user_group,
+            Game.status == "ongoing",
         )
         .first()
     )
-
+    players = []
+    if game:
+        players = (
+            db.query(
+                GamePlayer.id,
+                GamePlayer.player_id,
+                GamePlayer.score,
+                GamePlayer.total_win,
+                GamePlayer.status,
+                GamePlayer.version,
+                Player.name,
+                Player.avatar,
+            )
+            .join(Player, Player.id == GamePlayer.player_id)
+            .filter(GamePlayer.game_id == game.id)
+            .all()
+        )
+    try:
+        winner_id = uuid.UUID(data.player_id)
+    except ValueError:
+        winner_id = None
+    winner = next((p for p in players if p.player_id == winner_id), None)
     if not winner:
         raise HTTPException(
             status_code=404, detail=[{"msg": "No winner found for this game"}]
         )
 
-    add_score = (
-        db.query(player_models.GamePlayer)
-        .filter(
-            player_models.GamePlayer.game_id == data.game_id,
-            player_models.GamePlayer.player_id != winner.Player.id,
-            player_models.GamePlayer.status == "active",
-        )
-        .count()
-    )
-
+    loser_ids = {p.id for p in players if p is not winner and p.status == "active"}
+    add_score = len(loser_ids)
     if add_score == 0:
         raise HTTPException(
             status_code=404, detail=[{"msg": "No active players found for this game"}]
         )
 
-    score = winner.score + add_score
-
-    # Update the winner's score and total_win
-    db.query(player_models.GamePlayer).filter(
-        player_models.GamePlayer.game_id == data.game_id,
-        player_models.GamePlayer.player_id == winner.Player.id,
-    ).update(
-        {
-            player_models.GamePlayer.score: score,
-            player_models.GamePlayer.total_win: winner.total_win + 1,
-        }
+    last_round_at = (
+        db.query(func.max(GameMatch.created_at))
+        .filter(GameMatch.game_id == game.id)
+        .scalar()
     )
+    round_number = game.round_count + 1
+
+    # Claiming the game's version serializes rounds; the players' versions
+    # catch status changes made since they were read.
+    claimed = db.execute(
+        update(Game)
+        .where(Game.id == game.id, Game.version == game.version)
+        .values(version=Game.version + 1, round_count=round_number)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if claimed:
+        score_added = case(
+            (GamePlayer.id == winner.id, add_score),
+            (GamePlayer.id.in_(loser_ids), -1),
+            else_=0,
+        )
+        updated = db.execute(
+            update(GamePlayer)
+            .where(
+                tuple_(GamePlayer.id, GamePlayer.version).in_(
+                    [(p.id, p.version) for p in players]
+                )
+            )
+            .values(
+                score=GamePlayer.score + score_added,
+                total_win=GamePlayer.total_win
+                + case((GamePlayer.id == winner.id, 1), else_=0),
+                version=GamePlayer.version + 1,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    if not claimed or updated != len(players):
+        db.rollback()
+        return None
+
+    def added(p):
+        if p is winner:
+            return add_score
+        return -1 if p.id in loser_ids else 0
+
+    # Each player's state for the round goes into game_match_players,
+    # timestamps only once on the match.
+    match_id = uuid.uuid4()
+    db.execute(
+        insert(GameMatch),
+        [
+            {
+                "id": match_id,
+                "game_id": game.id,
+                "round": round_number,
+                "winner_id": winner.player_id,
+                "score": add_score,
+                "started_at": as_utc(last_round_at or game.created_at),
+                "created_at": datetime.now(timezone.utc),
+            }
+        ],
+    )
+    db.execute(
+        insert(player_models.GameMatchPlayer),
+        [
+            {
+                "match_id": match_id,
+                "player_id": p.player_id,
+                "game_id": game.id,
+                "status": p.status,
+                "score": p.score + added(p),
+                "score_added": added(p),
+            }
+            for p in players
+        ],
+    )
+    record_changes(db, user_group, [("game", game.id), ("round", match_id)])
+    invalidate(db, game_key(game.id), ongoing_key(user_group))
+    db.commit()
 
-    # Minus the score from other players
-    db.query(player_models.GamePlayer).filter(
-        player_models.GamePlayer.game_id == data.game_id,
-        player_models.GamePlayer.player_id != winner.Player.id,
-        player_models.GamePlayer.status == "active",
-    ).update(
-        {
-            player_models.GamePlayer.score: player_models.GamePlayer.score - 1,
+    audit_log.log(
+        game.id,
+        "round_won",
+        player_id=winner.player_id,
+        details={
+            "user_id": user.id,
+            "round": round_number,
+            "score_added": add_score,
         },
-        synchronize_session=False,
     )
 
-    db.commit()
+    winner_data = {
+        "player_id": winner.player_id,
+        "name": winner.name,
+        "avatar": winner.avatar,
+        "total_win": winner.total_win + 1,
+        "score": winner.score + add_score,
+    }
+
+    game_ended = False
+    if end_condition_met(game._mapping, winner_data["score"], round_number):
+        details = {"user_id": user.id, "reason": game.end_condition}
+        game_ended = end_game(db, game.id, user_group, details) is not None
 
-    game_match_count = (
-        db.query(GameMatch)
+    return {"winner": winner_data, "game_ended": game_ended}
+
+
+@router.post("/play/rounds")
+def add_rounds(
+    data: player_schemas.PlayerRounds,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_game_db),
+    idempotency_key: str | None = Header(default=None, max_length=255),
+):
+    return idempotent(
+        idempotency_key,
+        (user.id, "add_rounds"),
+        data.model_dump_json(),
+        lambda: _add_rounds(data, user, db),
+    )
+
+
+def _add_rounds(data: player_schemas.PlayerRounds, user: User, db: Session):
+    user_group = "usergroup_" + str(user.id)
+    with game_engine.released(data.game_id):
+        for _ in range(settings.SCORE_UPDATE_RETRIES):
+            result = _try_add_rounds(data, user, user_group, db)
+            if result is not None:
+                return result
+    raise HTTPException(
+        status_code=409,
+        detail=[{"msg": "The game changed while saving the rounds, please retry"}],
+    )
+
+
+def _try_add_rounds(
+    data: player_schemas.PlayerRounds, user: User, user_group: str, db: Session
+):
+    """Replay rounds recorded offline, all in one transaction.
+
+    Events are applied in order to an in-memory copy of the scoreboard,
+    exactly as ``add_winner`` and ``disable_player`` would have applied them
+    one by one. Events without ``played_at`` count as happening now. Like
+    ``_try_add_winner``, returns None if the game changed in the meantime.
+    """
+    game = (
+        db.query(
+            Game.id,
+            Game.version,
+            Game.created_at,
+            Game.round_count,
+            Game.end_condition,
+            Game.score_to_win,
+            Game.max_rounds,
+        )
         .filter(
-            GameMatch.game_id == data.game_id,
+            Game.id == data.game_id,
+            Game.player_group == user_group,
+            Game.status == "ongoing",
         )
-        .count()
+        .first()
     )
+    if not game:
+        raise HTTPException(status_code=404, detail=[{"msg": "No ongoing game found"}])
 
-    # create detail data
-    game_players = (
+    rows = (
         db.query(
+            player_models.GamePlayer.id,
+            player_models.GamePlayer.version,
             player_models.GamePlayer.player_id,
-            player_models.GamePlayer.status,
-            player_models.GamePlayer.score,
+            player_models.GamePlayer.total_win,
             player_models.Player.name,
+            player_models.Player.avatar,
+            player_models.GamePlayer.score,
+            player_models.GamePlayer.status,
         )
         .join(
             player_models.Player,
-            player_models.GamePlayer.player_id == player_models.Player.id,
+            player_models.Player.id == player_models.GamePlayer.player_id,
         )
-        .filter(player_models.GamePlayer.game_id == data.game_id)
+        .filter(player_models.GamePlayer.game_id == game.id)
         .all()
     )
+    players = {row.player_id: row._asdict() for row in rows}
+    before = {
+        pid: (p["score"], p["total_win"], p["status"]) for pid, p in players.items()
+    }
 
-    previous_match = (
-        db.query(GameMatch.created_at)
-        .filter(GameMatch.game_id == data.game_id)
-        .order_by(GameMatch.round.desc())
-        .first()
+    round_count = game.round_count
+    last_round_at = (
+        db.query(func.max(GameMatch.created_at))
+        .filter(GameMatch.game_id == game.id)
+        .scalar()
     )
-    if not previous_match:
-        previous_match_time = (
-            db.query(Game.created_at).filter(Game.id == data.game_id).first()
-        )
-        previous_match_time = (
-            previous_match_time.created_at.replace(tzinfo=timezone.utc) if previous_match_time else datetime.now(timezone.utc)
-        )
-    else:
-        if previous_match.created_at.tzinfo is None:
-            created_at_utc = previous_match.created_at.replace(tzinfo=timezone.utc)
-        else:
-            created_at_utc = previous_match.created_at
+    previous = as_utc(last_round_at or game.created_at)
+    now = datetime.now(timezone.utc)
+
+    matches, match_players, audit_events = [], [], []
+    game_ended = False
+    for index, event in enumerate(data.events):
+        if game_ended:
+            raise HTTPException(
+                status_code=422,
+                detail=[{"msg": f"Event {index}: the game had already ended"}],
+            )
+        try:
+            player = players.get(uuid.UUID(event.player_id))
+        except ValueError:
+            player = None
+        if player is None:
+            raise HTTPException(
+                status_code=404,
+                detail=[{"msg": f"Event {index}: player not found in this game"}],
+            )
+        played_at = min(as_utc(event.played_at), now) if event.played_at else now
+        if played_at < previous:
+            raise HTTPException(
+                status_code=422,
+                detail=[{"msg": f"Event {index}: events must be in the order played"}],
+            )
 
-        previous_match_time = created_at_utc
+        if event.type == "status":
+            if event.status is None:
+                raise HTTPException(
+                    status_code=422,
+                    detail=[{"msg": f"Event {index}: status events need a status"}],
+                )
+            player["status"] = event.status
+            audit_events.append(
+                (
+                    "player_status_changed",
+                    player["player_id"],
+                    {"user_id": user.id, "status": event.status},
+                )
+            )
+            continue
 
-    end_time = datetime.now(timezone.utc)
-    game_details = []
-    for player in game_players:
-        game_details.append(
+        losers = [
+            p
+            for p in players.values()
+            if p is not player and p["status"] == "active"
+        ]
+        add_score = len(losers)
+        if add_score == 0:
+            raise HTTPException(
+                status_code=404,
+                detail=[{"msg": f"Event {index}: no active players to beat"}],
+            )
+        player["score"] += add_score
+        player["total_win"] += 1
+        for p in losers:
+            p["score"] -= 1
+
+        round_count += 1
+        match_id = uuid.uuid4()
+        matches.append(
             {
-                "name": player.name,
-                "start_time": (
-                    previous_match_time.isoformat() if previous_match_time else None
-                ),
-                "end_time": end_time.isoformat() if end_time else None,
-                "status": player.status,
-                "score": player.score,
-                "is_winner": player.player_id == winner.Player.id,
+                "id": match_id,
+                "game_id": game.id,
+                "round": round_count,
+                "winner_id": player["player_id"],
+                "score": add_score,
+                "started_at": previous,
+                "created_at": played_at,
+            }
+        )
+        match_players.extend(
+            {
+                "match_id": match_id,
+                "player_id": p["player_id"],
+                "game_id": game.id,
+                "status": p["status"],
+                "score": p["score"],
                 "score_added": (
                     add_score
-                    if player.player_id == winner.Player.id
-                    else (-1 if player.status == "active" else 0)
+                    if p is player
+                    else (-1 if p["status"] == "active" else 0)
                 ),
             }
+            for p in players.values()
         )
-
-    # Create a new GameMatch entry
-    game_match = GameMatch(
-        game_id=data.game_id,
-        round=game_match_count + 1,  # Assuming this is the first round for the match
-        winner_id=winner.Player.id,
-        score=add_score,
-        details=json.dumps(game_details),
-        created_at=end_time,
+        audit_events.append(
+            (
+                "round_won",
+                player["player_id"],
+                {"user_id": user.id, "round": round_count, "score_added": add_score},
+            )
+        )
+        previous = played_at
+        game_ended = end_condition_met(game._mapping, player["score"], round_count)
+
+    claimed = db.execute(
+        update(Game)
+        .where(Game.id == game.id, Game.version == game.version)
+        .values(version=Game.version + 1, round_count=round_count)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        return None
+
+    # One UPDATE for the whole batch, applied as deltas. Every player row is
+    # matched on the version read, so a status change made meanwhile sends
+    # the batch round again.
+    changed = {
+        pid: p
+        for pid, p in players.items()
+        if (p["score"], p["total_win"], p["status"]) != before[pid]
+    }
+    values = {GamePlayer.version: GamePlayer.version + 1}
+    if changed:
+        player_id = GamePlayer.player_id
+        values.update(
+            {
+                GamePlayer.score: GamePlayer.score
+                + case(
+                    *[
+                        (player_id == pid, p["score"] - before[pid][0])
+                        for pid, p in changed.items()
+                    ],
+                    else_=0,
+                ),
+                GamePlayer.total_win: GamePlayer.total_win
+                + case(
+                    *[
+                        (player_id == pid, p["total_win"] - before[pid][1])
+                        for pid, p in changed.items()
+                    ],
+                    else_=0,
+                ),
+                GamePlayer.status: case(
+                    *[(player_id == pid, p["status"]) for pid, p in changed.items()],
+                    else_=GamePlayer.status,
+                ),
+            }
+        )
+    updated = (
+        db.query(GamePlayer)
+        .filter(
+            tuple_(GamePlayer.id, GamePlayer.version).in_(
+                [(p["id"], p["version"]) for p in players.values()]
+            )
+        )
+        .update(values, synchronize_session=False)
+    )
+    if updated != len(players):
+        db.rollback()
+        return None
+    if matches:
+        db.execute(insert(GameMatch), matches)
+        db.execute(insert(player_models.GameMatchPlayer), match_players)
+    record_changes(
+        db,
+        user_group,
+        [("game", game.id)] + [("round", match["id"]) for match in matches],
     )
-    db.add(game_match)
+    invalidate(db, game_key(game.id), ongoing_key(user_group))
     db.commit()
 
-    winner_data = {
-        "player_id": winner.Player.id,
-        "name": winner.Player.name,
-        "avatar": winner.Player.avatar,
-        "total_win": winner.total_win + 1,
-        "score": score,
-    }
+    for action, player_id, details in audit_events:
+        audit_log.log(game.id, action, player_id=player_id, details=details)
 
-    return {"winner": winner_data}
+    if game_ended:
+        details = {"user_id": user.id, "reason": game.end_condition}
+        game_ended = end_game(db, game.id, user_group, details) is not None
+
+    return {
+        "rounds": round_count,
+        "game_ended": game_ended,
+        "players": [
+            {
+                "id": p["player_id"],
+                "total_win": p["total_win"],
+                "name": p["name"],
+                "avatar": p["avatar"],
+                "score": p["score"],
+                "status": p["status"],
+            }
+            for p in players.values()
+        ],
+    }
 
 
 @router.get("/play/player/available/{game_id}")
 def get_available_players(
-    game_id: str, db: Session = Depends(get_db), user: User = Depends(get_current_user)
+    game_id: str,
+    db: Session = Depends(get_game_db),
+    user: User = Depends(get_current_user),
 ):
     user_group = "usergroup_" + str(user.id)
-    print(user_group)
-    players = (
-        db.query(
-            player_models.Player, player_models.GamePlayer.id.label("game_player_id")
-        )
-        .outerjoin(
-            player_models.GamePlayer,
-            player_models.GamePlayer.player_id == player_models.Player.id,
+    logger.debug("Listing available players", extra={"game_id": game_id})
+
+    # The group's active roster only changes on player writes, which evict
+    # it. With it cached, the game's own members are all that's left to
+    # look up, straight from the (game_id, player_id) index.
+    roster = local_cache.get(roster_key(user_group))
+    if roster is not None:
+        in_game = set(
+            db.scalars(
+                select(GamePlayer.player_id).where(GamePlayer.game_id == game_id)
+            )
         )
-        .filter(
-            ~player_models.Player.id.in_(
-                db.query(player_models.GamePlayer.player_id).filter(
-                    player_models.GamePlayer.game_id == game_id
-                )
-            ),
-            player_models.Player.status == "active",
-            player_models.Player.player_group == user_group,
+        players = [p for p in roster if p["id"] not in in_game]
+    else:
+        version = local_cache.version
+        players = [
+            p._asdict()
+            for p in db.query(Player.id, Player.name, Player.avatar)
+            .filter(
+                Player.status == "active",
+                Player.player_group == user_group,
+                ~exists().where(
+                    GamePlayer.game_id == game_id, GamePlayer.player_id == Player.id
+                ),
+            )
+            .order_by(Player.name)
+        ]
+        local_cache.set(
+            roster_key(user_group),
+            [
+                p._asdict()
+                for p in db.query(Player.id, Player.name, Player.avatar)
+                .filter(Player.status == "active", Player.player_group == user_group)
+                .order_by(Player.name)
+            ],
+            version,
         )
-        .distinct(player_models.Player.id)
-        .all()
-    )
 
-    available_players = [
-        {
-            "id": player.Player.id,
-            "name": player.Player.name,
-            "avatar": player.Player.avatar,
-            "game_player_id": player.game_player_id,
-        }
-        for player in players
-    ]
+    # Nobody available is in this game, so there is no game_players row to
+    # point at; the field stays for response compatibility.
+    available_players = [{**player, "game_player_id": None} for player in players]
 
     return {"available_players": available_players}
 
@@ -596,7 +1017,7 @@ def get_available_players(
 @router.post("/play/player/add")
 def add_player_to_game(
     data: player_schemas.AddPlayerToGame,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_game_db),
     user: User = Depends(get_current_user),
 ):
     user_group = "usergroup_" + str(user.id)
@@ -618,35 +1039,57 @@ def add_player_to_game(
     )
     valid_player_ids = {p.id for p in valid_players}
 
-    # Check if player is already in the game_players table for this game
-    existing_players = (
-        db.query(player_models.GamePlayer.player_id)
-        .filter(
-            player_models.GamePlayer.game_id == data.game_id,
-            player_models.GamePlayer.player_id.in_(valid_player_ids),
+    # Out of the game engine until the new players are committed.
+    with game_engine.released(data.game_id):
+        # Check if player is already in the game_players table for this game
+        existing_players = (
+            db.query(player_models.GamePlayer.player_id)
+            .filter(
+                player_models.GamePlayer.game_id == data.game_id,
+                player_models.GamePlayer.player_id.in_(valid_player_ids),
+            )
+            .all()
         )
-        .all()
-    )
-    existing_player_ids = {p.player_id for p in existing_players}
-
-    new_players = valid_player_ids - existing_player_ids
-    print(f"New players to add: {new_players}")
+        existing_player_ids = {p.player_id for p in existing_players}
 
-    if not new_players:
-        raise HTTPException(
-            status_code=400,
-            detail=[{"msg": "No new players to add to the game"}],
+        new_players = valid_player_ids - existing_player_ids
+        logger.debug(
+            "Adding players to game",
+            extra={"game_id": data.game_id, "count": len(new_players)},
         )
 
-    for player_id in new_players:
-        new_game_player = player_models.GamePlayer(
-            game_id=data.game_id,
-            player_id=player_id,
-            status="active",
+        if not new_players:
+            raise HTTPException(
+                status_code=400,
+                detail=[{"msg": "No new players to add to the game"}],
+            )
+
+        for player_id in new_players:
+            new_game_player = player_models.GamePlayer(
+                game_id=data.game_id,
+                player_id=player_id,
+                status="active",
+            )
+            db.add(new_game_player)
+        db.execute(
+            update(Game)
+            .where(Game.id == data.game_id)
+            .values(
+                player_count=Game.player_count + len(new_players),
+                version=Game.version + 1,
+            )
+            .execution_options(synchronize_session=False)
         )
-        db.add(new_game_player)
 
-    db.commit()
+        record_changes(db, user_group, [("game", data.game_id)])
+        invalidate(db, game_key(data.game_id), ongoing_key(user_group))
+        db.commit()
+
+    audit_log.log(
+        data.game_id,
+        "players_added",
+        details={"user_id": user.id, "players": sorted(map(str, new_players))},
+    )
 
     return {
         "message": "Players added to the game successfully",
@@ -656,60 +1099,44 @@ def add_player_to_game(
 @router.post("/ongoing/end")
 def end_ongoing_game(
     user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_game_db),
 ):
     user_group = "usergroup_" + str(user.id)
 
-    ongoing_game = (
-        db.query(player_models.Game)
-        .filter(
-            player_models.Game.player_group == user_group,
-            player_models.Game.status == "ongoing",
-        )
-        .first()
-    )
-
+    ongoing_game = ongoing_game_summary(db, user_group)
     if not ongoing_game:
         raise HTTPException(status_code=404, detail=[{"msg": "No ongoing game found"}])
 
-    # We can have many winners, so we will get the top players based on their scores.
-    winners = (
-        db.query(player_models.GamePlayer.player_id, player_models.GamePlayer.score)
-        .filter(
-            player_models.GamePlayer.game_id == ongoing_game.id,
-        )
-        .order_by(player_models.GamePlayer.score.desc())
-        .all()
+    # We can have many winners: everyone on the top score.
+    winner_score = end_game(
+        db, ongoing_game["id"], user_group, {"user_id": user.id, "reason": "manual"}
     )
+    if winner_score is None:
+        raise HTTPException(status_code=404, detail=[{"msg": "No ongoing game found"}])
 
-    if not winners:
-        raise HTTPException(
-            status_code=404, detail=[{"msg": "No players found in the game"}]
-        )
+    return {"message": "Game ended successfully", "game_id": ongoing_game["id"]}
 
-    winner_score = winners[0].score
-    for winner in winners:
-        if winner.score < winner_score:
-            continue
-        new_winner = player_models.Winner(
-            game_id=ongoing_game.id,
-            player_id=winner.player_id,
-            score=winner_score,
-        )
-        db.add(new_winner)
-        db.commit()
 
-    ongoing_game.status = "completed"
-    ongoing_game.end_time = datetime.now(timezone.utc)
-    db.commit()
+@router.get("/sync")
+def sync_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(500, ge=1, le=1000),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db),
+):
+    """Players, games and rounds changed after ``since``.
 
-    return {"message": "Game ended successfully", "game_id": ongoing_game.id}
+    Pass the returned ``seq`` as ``since`` next time; while ``has_more`` is
+    set there are further changes to fetch right away.
+    """
+    user_group = "usergroup_" + str(user.id)
+    return changes_since(db, user_group, since, limit)
 
 
 @router.get("/history/{game_id}")
 def get_game_history(
     game_id: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: User = Depends(get_current_user),
 ):
     user_group = "usergroup_" + str(user.id)
@@ -726,6 +1153,30 @@ def get_game_history(
     if not game:
         raise HTTPException(status_code=404, detail=[{"msg": "Game not found"}])
 
+    game_data = {
+        "id": game.id,
+        "name": game.name,
+        "status": game.status,
+        "start_time": game.start_time.isoformat() if game.start_time else None,
+        "end_time": game.end_time.isoformat() if game.end_time else None,
+        "end_condition": game.end_condition,
+        "score_to_win": game.score_to_win,
+        "max_rounds": game.max_rounds,
+        "time_limit": game.time_limit,
+    }
+
+    # Only completed games are ever archived.
+    if game.status == "completed":
+        archive = db.get(player_models.GameArchive, game.id)
+        if archive:
+            return {"game": game_data, **archived_history(archive)}
+
+    # game_matches is partitioned by created_at; bounding it by the game's
+    # lifetime lets Postgres skip partitions outside it.
+    match_window = [player_models.GameMatch.created_at >= game.created_at]
+    if game.end_time:
+        match_window.append(player_models.GameMatch.created_at <= game.end_time)
+
     matches = (
         db.query(
             player_models.GameMatch,
@@ -734,9 +1185,10 @@ def get_game_history(
             player_models.GameMatch.winner_id,
             player_models.GameMatch.score,
             player_models.GameMatch.details,
+            player_models.GameMatch.started_at,
             player_models.GameMatch.created_at,
         )
-        .filter(player_models.GameMatch.game_id == game_id)
+        .filter(player_models.GameMatch.game_id == game_id, *match_window)
         .join(
             player_models.Player,
             player_models.GameMatch.winner_id == player_models.Player.id,
@@ -745,6 +1197,25 @@ def get_game_history(
         .all()
     )
 
+    match_players = {}
+    for row in (
+        db.query(
+            player_models.GameMatchPlayer.match_id,
+            player_models.GameMatchPlayer.player_id,
+            player_models.GameMatchPlayer.status,
+            player_models.GameMatchPlayer.score,
+            player_models.GameMatchPlayer.score_added,
+            player_models.Player.name,
+        )
+        .join(
+            player_models.Player,
+            player_models.GameMatchPlayer.player_id == player_models.Player.id,
+        )
+        .filter(player_models.GameMatchPlayer.game_id == game_id)
+        .all()
+    ):
+        match_players.setdefault(row.match_id, []).append(row)
+
     players = (
         db.query(player_models.GamePlayer, player_models.Player.name)
         .join(
@@ -772,24 +1243,23 @@ def get_game_history(
     )
 
     return {
-        "game": {
-            "id": game.id,
-            "name": game.name,
-            "status": game.status,
-            "start_time": game.start_time.isoformat() if game.start_time else None,
-            "end_time": game.end_time.isoformat() if game.end_time else None,
-            "end_condition": game.end_condition,
-            "score_to_win": game.score_to_win,
-            "max_rounds": game.max_rounds,
-            "time_limit": game.time_limit,
-        },
+        "game": game_data,
         "matches": [
             {
                 "round": match.round,
                 "player_name": match.name,
                 "winner_id": match.winner_id,
                 "score": match.score,
-                "details": json.loads(match.details),
+                "details": (
+                    json.loads(match.details)
+                    if match.details is not None
+                    else match_details(
+                        match_players.get(match.GameMatch.id, []),
+                        match.started_at,
+                        match.created_at,
+                        match.winner_id,
+                    )
+                ),
                 "created_at": match.created_at.isoformat(),
             }
             for match in matches
@@ -813,62 +1283,83 @@ def get_game_history(
 
 @router.get("/recent")
 def get_all_game_history(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user: User = Depends(get_current_user),
+    fields: str | None = Query(default=None, max_length=500),
+    projection: str = Query(default="full", pattern="^(summary|full)$"),
 ):
     user_group = "usergroup_" + str(user.id)
-
+    selected = select_fields(fields, projection, GAME_PROJECTIONS)
+
+    # Archived games have no game_players rows left; their count and
+    # winners come from the archive row instead. Only the requested columns
+    # are selected, so the subqueries behind them only run when asked for.
+    computed = {
+        "player_count": func.coalesce(
+            select(GameArchive.player_count)
+            .where(GameArchive.game_id == Game.id)
+            .scalar_subquery(),
+            select(func.count(player_models.GamePlayer.id))
+            .where(player_models.GamePlayer.game_id == Game.id)
+            .scalar_subquery(),
+        ),
+        "winner": select(GameArchive.winners)
+        .where(GameArchive.game_id == Game.id)
+        .scalar_subquery(),
+    }
+    columns = [
+        (computed[name] if name in computed else getattr(Game, name)).label(name)
+        for name in selected
+    ]
     games = (
-        db.query(
-            player_models.Game,
-            func.count(player_models.GamePlayer.id).label("player_count"),
-        )
-        .filter(player_models.Game.player_group == user_group)
-        .join(
-            player_models.GamePlayer,
-            player_models.Game.id == player_models.GamePlayer.game_id,
+        db.query(*columns)
+        .filter(
+            Game.player_group == user_group,
+            or_(
+                exists().where(player_models.GamePlayer.game_id == Game.id),
+                exists().where(GameArchive.game_id == Game.id),
+            ),
         )
-        .group_by(player_models.Game.id)
-        .order_by(player_models.Game.start_time.desc())
+        .order_by(Game.start_time.desc())
         .all()
     )
 
-    print(games)
+    logger.debug("Loaded game history", extra={"count": len(games)})
 
     if not games:
         raise HTTPException(status_code=404, detail=[{"msg": "No game history found"}])
 
-    return {
-        "games": [
-            {
-                "id": game.id,
-                "name": game.name,
-                "status": game.status,
-                "start_time": game.start_time.isoformat() if game.start_time else None,
-                "end_condition": game.end_condition,
-                "score_to_win": game.score_to_win,
-                "max_rounds": game.max_rounds,
-                "time_limit": game.time_limit,
-                "player_count": player_count,
-                "end_time": game.end_time.isoformat() if game.end_time else None,
-                "winner": [
-                    {
-                        "player_id": winner.player_id,
-                        "player_name": winner.name,
-                    }
-                    for winner in db.query(
-                        player_models.Winner,
-                        player_models.Player.name,
-                        player_models.Winner.player_id,
-                    )
-                    .filter(player_models.Winner.game_id == game.id)
-                    .join(
-                        player_models.Player,
-                        player_models.Winner.player_id == player_models.Player.id,
-                    )
-                    .all()
-                ],
-            }
-            for game, player_count in games
-        ]
-    }
+    winners = {}
+    if "winner" in selected:
+        # One query for every live game's winners instead of one per game.
+        live_ids = [game.id for game in games if game.winner is None]
+        for winner in (
+            db.query(
+                player_models.Winner.game_id,
+                player_models.Winner.player_id,
+                player_models.Player.name,
+            )
+            .join(
+                player_models.Player,
+                player_models.Winner.player_id == player_models.Player.id,
+            )
+            .filter(player_models.Winner.game_id.in_(live_ids))
+        ):
+            winners.setdefault(winner.game_id, []).append(
+                {"player_id": winner.player_id, "player_name": winner.name}
+            )
+
+    def _game(game):
+        data = game._asdict()
+        for name in ("start_time", "end_time"):
+            if data.get(name) is not None:
+                data[name] = data[name].isoformat()
+        if "winner" in data:
+            data["winner"] = (
+                json.loads(game.winner)
+                if game.winner is not None
+                else winners.get(game.id, [])
+            )
+        return data
+
+    return {"games": [_game(game) for game in games]}
@@ -1,31 +1,44 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import datetime
 
 
 class PlayerStatus(BaseModel):
     player_id: str = Field(description="ID of the player")
     game_id: str = Field(description="ID of the game")
-    status: str = Field(
+    # Stored in the game_player_status enum, so it is checked here rather
+    # than through __get_validators__, which pydantic 2 no longer calls.
+    status: Literal["active", "disabled", "deleted"] = Field(
         "active",
         description="Status of the player (allowed: 'active', 'disabled', 'deleted')",
     )
 
-    @classmethod
-    def __get_validators__(cls):
-        yield cls.validate_status
 
-    @staticmethod
-    def validate_status(value):
-        allowed = {"active", "disabled", "deleted"}
-        if value not in allowed:
-            raise ValueError(f"status must be one of {allowed}")
-        return value
+class PlayerWinner(BaseModel):
+    player_id: str = Field(description="ID of the player")
+    game_id: str = Field(description="ID of the game")
 
 
-class PlayerWinner(BaseModel):
+class RoundEvent(BaseModel):
+    type: Literal["winner", "status"] = Field(
+        "winner", description="'winner' plays a round, 'status' changes a player"
+    )
     player_id: str = Field(description="ID of the player")
+    status: Optional[Literal["active", "disabled", "deleted"]] = Field(
+        None, description="New status, for 'status' events"
+    )
+    played_at: Optional[datetime] = Field(
+        None, description="When the event happened on the client; defaults to now"
+    )
+
+
+class PlayerRounds(BaseModel):
     game_id: str = Field(description="ID of the game")
+    events: List[RoundEvent] = Field(
+        min_length=1,
+        max_length=500,
+        description="Winners and status changes, in the order they happened",
+    )
 
 
 class Player(BaseModel):
@@ -0,0 +1,155 @@
+from datetime import timezone
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from src.core.cache import local_cache
+from src.game.models import Game
+
+
+def roster_key(user_group: str) -> str:
+    return f"roster:{user_group}"
+
+
+def ongoing_key(user_group: str) -> str:
+    return f"ongoing:{user_group}"
+
+
+def game_key(game_id) -> str:
+    return f"game:{game_id}"
+
+
+ONGOING_SUMMARY_FIELDS = (
+    "id",
+    "name",
+    "status",
+    "start_time",
+    "end_condition",
+    "score_to_win",
+    "max_rounds",
+    "time_limit",
+    "player_count",
+    "round_count",
+)
+
+
+def ongoing_game_summary(db: Session, user_group: str) -> dict | None:
+    """The group's ongoing game as a dict, or None if it has none.
+
+    Cached under ``ongoing_key``, which every write to the ongoing game
+    (create, rounds, players, end) invalidates. Absence is cached too.
+    """
+    summary = local_cache.get(ongoing_key(user_group))
+    if summary is None:
+        version = local_cache.version
+        game = (
+            db.query(*(getattr(Game, name) for name in ONGOING_SUMMARY_FIELDS))
+            .filter(Game.player_group == user_group, Game.status == "ongoing")
+            .first()
+        )
+        summary = game._asdict() if game else {}
+        local_cache.set(ongoing_key(user_group), summary, version)
+    return summary or None
+
+
+def end_condition_met(game, top_score: int, rounds: int) -> bool:
+    """Whether ``game`` is finished after a round.
+
+    ``game`` is any mapping with the game's end-condition columns. Only a
+    round's winner gains points, so the winner's new score is the running
+    maximum and no other player has to be looked at. Time limits are
+    enforced by ``src.game.lifecycle.game_timers`` instead.
+    """
+    if game["end_condition"] == "score":
+        return bool(game["score_to_win"]) and top_score >= game["score_to_win"]
+    if game["end_condition"] == "rounds":
+        return bool(game["max_rounds"]) and rounds >= game["max_rounds"]
+    return False
+
+
+# Named projections for list endpoints; "full" is the complete response.
+PLAYER_PROJECTIONS = {
+    "summary": ("id", "name"),
+    "full": (
+        "id",
+        "name",
+        "player_group",
+        "avatar",
+        "win",
+        "loss",
+        "games_played",
+        "status",
+        "created_at",
+        "updated_at",
+    ),
+}
+GAME_PROJECTIONS = {
+    "summary": ("id", "name", "status"),
+    "full": (
+        "id",
+        "name",
+        "status",
+        "start_time",
+        "end_condition",
+        "score_to_win",
+        "max_rounds",
+        "time_limit",
+        "player_count",
+        "end_time",
+        "winner",
+    ),
+}
+
+
+def select_fields(
+    fields: str | None, projection: str, projections: dict[str, tuple]
+) -> list[str]:
+    """Field names a list endpoint should return, in the order given.
+
+    An explicit comma-separated ``fields`` wins over the named
+    ``projection``; ``id`` is always included.
+    """
+    allowed = projections["full"]
+    if not fields:
+        return list(projections[projection])
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=[{"msg": f"Unknown fields: {', '.join(unknown)}"}],
+        )
+    return ["id"] + [f for f in requested if f != "id"]
+
+
+def as_utc(value):
+    """Timestamps are stored naive in UTC; attach the zone back."""
+    if value is not None and value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _iso_utc(value):
+    if value is None:
+        return None
+    return as_utc(value).isoformat()
+
+
+def match_details(players, started_at, ended_at, winner_id) -> list[dict]:
+    """Rebuild a round's ``details`` list from its game_match_players rows.
+
+    ``players`` yields objects with ``player_id``, ``name``, ``status``,
+    ``score`` and ``score_added``; the output matches the JSON that used to
+    be stored in ``game_matches.details``.
+    """
+    start, end = _iso_utc(started_at), _iso_utc(ended_at)
+    return [
+        {
+            "name": p.name,
+            "start_time": start,
+            "end_time": end,
+            "status": p.status,
+            "score": p.score,
+            "is_winner": p.player_id == winner_id,
+            "score_added": p.score_added,
+        }
+        for p in players
+    ]
@@ -0,0 +1,250 @@
+"""Per-group change feed behind ``GET /game/sync``.
+
+Every write records which players, games and rounds it touched, each under
+a new per-group sequence number. Only the latest number per entity is kept,
+so a client that was away for a while downloads each changed entity once,
+in its current state, however often it changed.
+
+Archiving and restoring a game count as changes to it. An archived game's
+scoreboard and rounds are served from its ``game_archives`` row, marked
+``"archived": true``, and are never reported as deleted.
+"""
+
+import datetime
+import json
+import uuid
+import zlib
+from sqlalchemy import and_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from src.game.models import (
+    Game,
+    GameArchive,
+    GameMatch,
+    GamePlayer,
+    GroupChange,
+    Player,
+    SyncGroup,
+)
+
+ENTITIES = ("player", "game", "round")
+
+
+def _upsert(db: Session, model):
+    dialect = sqlite if db.get_bind().dialect.name == "sqlite" else postgresql
+    return dialect.insert(model)
+
+
+def record_changes(db: Session, player_group: str, changes):
+    """Give each ``(entity, entity_id)`` in ``changes`` a new sequence number.
+
+    Runs in the caller's transaction. The group's counter row stays locked
+    until that commits, so a group's changes become visible in sequence
+    order and a client can't skip past one that committed late.
+    """
+    changes = list(dict.fromkeys(changes))
+    if not changes:
+        return
+    count = len(changes)
+    counter = _upsert(db, SyncGroup).values(player_group=player_group, seq=count)
+    last = db.execute(
+        counter.on_conflict_do_update(
+            index_elements=["player_group"], set_={"seq": SyncGroup.seq + count}
+        ).returning(SyncGroup.seq)
+    ).scalar_one()
+
+    stmt = _upsert(db, GroupChange)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["player_group", "entity", "entity_id"],
+            set_={"seq": stmt.excluded.seq},
+        ),
+        [
+            {
+                "player_group": player_group,
+                "entity": entity,
+                "entity_id": entity_id,
+                "seq": last - count + 1 + i,
+            }
+            for i, (entity, entity_id) in enumerate(changes)
+        ],
+    )
+
+
+def _payloads(archives) -> dict:
+    # Same encoding as src/game/archive.py writes.
+    return {a.game_id: json.loads(zlib.decompress(a.payload)) for a in archives}
+
+
+def _uuid(value):
+    return uuid.UUID(value) if value else None
+
+
+def _datetime(value):
+    return datetime.datetime.fromisoformat(value) if value else None
+
+
+def changes_since(db: Session, player_group: str, since: int, limit: int) -> dict:
+    rows = (
+        db.query(GroupChange.entity, GroupChange.entity_id, GroupChange.seq)
+        .filter(GroupChange.player_group == player_group, GroupChange.seq > since)
+        .order_by(GroupChange.seq)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    ids = {entity: [] for entity in ENTITIES}
+    for row in rows:
+        ids[row.entity].append(row.entity_id)
+
+    players = []
+    if ids["player"]:
+        players = [
+            {
+                "id": p.id,
+                "name": p.name,
+                "avatar": p.avatar,
+                "win": p.win,
+                "loss": p.loss,
+                "games_played": p.games_played,
+                "status": p.status,
+            }
+            for p in db.query(Player).filter(
+                Player.id.in_(ids["player"]), Player.player_group == player_group
+            )
+        ]
+
+    games = []
+    if ids["game"]:
+        archives = _payloads(
+            db.query(GameArchive).filter(
+                GameArchive.game_id.in_(ids["game"]),
+                GameArchive.player_group == player_group,
+            )
+        )
+        scoreboards = {
+            game_id: [
+                {
+                    "player_id": _uuid(p["player_id"]),
+                    "score": p["score"],
+                    "total_win": p["total_win"],
+                    "status": p.get("status", "active"),
+                }
+                for p in payload["players"]
+            ]
+            for game_id, payload in archives.items()
+        }
+        for gp in db.query(
+            GamePlayer.game_id,
+            GamePlayer.player_id,
+            GamePlayer.score,
+            GamePlayer.total_win,
+            GamePlayer.status,
+        ).filter(GamePlayer.game_id.in_(ids["game"])):
+            scoreboards.setdefault(gp.game_id, []).append(
+                {
+                    "player_id": gp.player_id,
+                    "score": gp.score,
+                    "total_win": gp.total_win,
+                    "status": gp.status,
+                }
+            )
+        games = [
+            {
+                "id": g.id,
+                "name": g.name,
+                "status": g.status,
+                "end_condition": g.end_condition,
+                "score_to_win": g.score_to_win,
+                "max_rounds": g.max_rounds,
+                "time_limit": g.time_limit,
+                "start_time": g.start_time,
+                "end_time": g.end_time,
+                "archived": g.id in archives,
+                "players": scoreboards.get(g.id, []),
+            }
+            for g in db.query(Game).filter(
+                Game.id.in_(ids["game"]), Game.player_group == player_group
+            )
+        ]
+
+    rounds = []
+    if ids["round"]:
+        rounds = [
+            {
+                "id": m.id,
+                "game_id": m.game_id,
+                "round": m.round,
+                "winner_id": m.winner_id,
+                "score": m.score,
+                "started_at": m.started_at,
+                "created_at": m.created_at,
+            }
+            for m in db.query(
+                GameMatch.id,
+                GameMatch.game_id,
+                GameMatch.round,
+                GameMatch.winner_id,
+                GameMatch.score,
+                GameMatch.started_at,
+                GameMatch.created_at,
+            )
+            .join(Game, Game.id == GameMatch.game_id)
+            .filter(GameMatch.id.in_(ids["round"]), Game.player_group == player_group)
+        ]
+        live = {m["id"] for m in rounds}
+        missing = [r for r in rows if r.entity == "round" and r.entity_id not in live]
+        if missing:
+            # Archiving a game records a change to it, so a round archived
+            # since it changed belongs to a game changed later than it.
+            wanted = {r.entity_id for r in missing}
+            archives = _payloads(
+                db.query(GameArchive)
+                .join(
+                    GroupChange,
+                    and_(
+                        GroupChange.player_group == GameArchive.player_group,
+                        GroupChange.entity == "game",
+                        GroupChange.entity_id == GameArchive.game_id,
+                    ),
+                )
+                .filter(
+                    GameArchive.player_group == player_group,
+                    GroupChange.seq > min(r.seq for r in missing),
+                )
+            )
+            rounds += [
+                {
+                    "id": _uuid(m["id"]),
+                    "game_id": _uuid(m["game_id"]),
+                    "round": m["round"],
+                    "winner_id": _uuid(m["winner_id"]),
+                    "score": m["score"],
+                    "started_at": _datetime(m.get("started_at")),
+                    "created_at": _datetime(m["created_at"]),
+                }
+                for payload in archives.values()
+                for m in payload["matches"]
+                if _uuid(m["id"]) in wanted
+            ]
+
+    found = {
+        "player": {p["id"] for p in players},
+        "game": {g["id"] for g in games},
+        "round": {m["id"] for m in rounds},
+    }
+    deleted = [
+        {"entity": row.entity, "id": row.entity_id}
+        for row in rows
+        if row.entity_id not in found[row.entity]
+    ]
+
+    return {
+        "seq": rows[-1].seq if rows else since,
+        "has_more": has_more,
+        "players": players,
+        "games": games,
+        "rounds": rounds,
+        "deleted": deleted,
+    }
@@ -0,0 +1,253 @@
+"""Check game scoreboards against their round history.
+
+    python -m src.game.verify [--repair] [--workers 4] [--chunk-size 500]
+
+``game_players.score`` and ``total_win`` are running totals: they should
+equal the sum of the player's ``score_added`` over ``game_match_players``
+and the number of rounds they won. ``games.round_count`` should equal the
+number of rounds.
+
+Game ids are streamed from each shard with a server-side cursor and handed
+out in chunks to a pool of worker processes, which compare a whole chunk
+in one query. ``--repair`` rewrites the drifted rows with one UPDATE per
+chunk and table, matched on the versions read, so a round played meanwhile
+is never overwritten. Ongoing games are left out unless
+``--include-ongoing`` is given; so are archived games and games with rounds
+that still only exist as legacy JSON in ``game_matches.details``.
+"""
+
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from sqlalchemy import and_, exists, func, or_, select, update
+from src.core.cache import invalidate
+from src.core.shards import shard_router
+from src.game.models import (
+    Game,
+    GameArchive,
+    GameMatch,
+    GameMatchPlayer,
+    GamePlayer,
+)
+from src.game.service import game_key
+from src.game.sync import record_changes
+
+
+def player_drift(game_ids):
+    """Game players whose totals differ from what their rounds add up to."""
+    scores = (
+        select(
+            GameMatchPlayer.game_id,
+            GameMatchPlayer.player_id,
+            func.sum(GameMatchPlayer.score_added).label("score"),
+        )
+        .where(GameMatchPlayer.game_id.in_(game_ids))
+        .group_by(GameMatchPlayer.game_id, GameMatchPlayer.player_id)
+        .subquery()
+    )
+    wins = (
+        select(
+            GameMatch.game_id,
+            GameMatch.winner_id,
+            func.count().label("wins"),
+        )
+        .where(GameMatch.game_id.in_(game_ids))
+        .group_by(GameMatch.game_id, GameMatch.winner_id)
+        .subquery()
+    )
+    expected_score = func.coalesce(scores.c.score, 0)
+    expected_wins = func.coalesce(wins.c.wins, 0)
+    return (
+        select(
+            GamePlayer.id,
+            GamePlayer.game_id,
+            GamePlayer.player_id,
+            GamePlayer.version,
+            GamePlayer.score,
+            GamePlayer.total_win,
+            expected_score.label("expected_score"),
+            expected_wins.label("expected_wins"),
+        )
+        .outerjoin(
+            scores,
+            and_(
+                scores.c.game_id == GamePlayer.game_id,
+                scores.c.player_id == GamePlayer.player_id,
+            ),
+        )
+        .outerjoin(
+            wins,
+            and_(
+                wins.c.game_id == GamePlayer.game_id,
+                wins.c.winner_id == GamePlayer.player_id,
+            ),
+        )
+        .where(
+            GamePlayer.game_id.in_(game_ids),
+            or_(
+                GamePlayer.score != expected_score,
+                GamePlayer.total_win != expected_wins,
+            ),
+        )
+    )
+
+
+def round_drift(game_ids):
+    """Games whose ``round_count`` differs from their number of rounds."""
+    rounds = (
+        select(GameMatch.game_id, func.count().label("rounds"))
+        .where(GameMatch.game_id.in_(game_ids))
+        .group_by(GameMatch.game_id)
+        .subquery()
+    )
+    expected_rounds = func.coalesce(rounds.c.rounds, 0)
+    return (
+        select(
+            Game.id,
+            Game.player_group,
+            Game.version,
+            Game.round_count,
+            expected_rounds.label("expected_rounds"),
+        )
+        .outerjoin(rounds, rounds.c.game_id == Game.id)
+        .where(Game.id.in_(game_ids), Game.round_count != expected_rounds)
+    )
+
+
+def check_games(shard: str, game_ids, repair: bool = False) -> dict:
+    """Compare (and with ``repair``, fix) one chunk of games on ``shard``."""
+    db = shard_router.session(shard)
+    try:
+        players = [row._asdict() for row in db.execute(player_drift(game_ids))]
+        games = [row._asdict() for row in db.execute(round_drift(game_ids))]
+        repaired = 0
+        if repair and (players or games):
+            drift = player_drift(game_ids).subquery()
+            repaired += db.execute(
+                update(GamePlayer)
+                .where(
+                    GamePlayer.id == drift.c.id,
+                    GamePlayer.version == drift.c.version,
+                )
+                .values(
+                    score=drift.c.expected_score,
+                    total_win=drift.c.expected_wins,
+                    version=GamePlayer.version + 1,
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            drift = round_drift(game_ids).subquery()
+            repaired += db.execute(
+                update(Game)
+                .where(Game.id == drift.c.id, Game.version == drift.c.version)
+                .values(
+                    round_count=drift.c.expected_rounds,
+                    version=Game.version + 1,
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            changed = {p["game_id"] for p in players} | {g["id"] for g in games}
+            groups = {}
+            for game_id, player_group in db.execute(
+                select(Game.id, Game.player_group).where(Game.id.in_(changed))
+            ):
+                groups.setdefault(player_group, []).append(("game", game_id))
+            for player_group, changes in groups.items():
+                if player_group is not None:
+                    record_changes(db, player_group, changes)
+            invalidate(db, *(game_key(game_id) for game_id in changed))
+            db.commit()
+        return {
+            "games": len(game_ids),
+            "players": players,
+            "rounds": games,
+            "repaired": repaired,
+        }
+    finally:
+        db.close()
+
+
+def _stream_game_ids(shard: str, chunk_size: int, include_ongoing: bool):
+    db = shard_router.session(shard)
+    try:
+        query = select(Game.id).where(
+            ~exists().where(GameArchive.game_id == Game.id),
+            ~exists().where(
+                GameMatch.game_id == Game.id, GameMatch.details.is_not(None)
+            ),
+        )
+        if not include_ongoing:
+            query = query.where(Game.status != "ongoing")
+        # yield_per streams through a server-side cursor on Postgres.
+        result = db.execute(query.execution_options(yield_per=chunk_size))
+        for chunk in result.scalars().partitions():
+            yield list(chunk)
+    finally:
+        db.close()
+
+
+def _init_worker():
+    # Connections inherited through fork belong to the parent.
+    for shard_engine in shard_router.engines.values():
+        shard_engine.dispose(close=False)
+
+
+def verify(
+    repair: bool = False,
+    workers: int = 4,
+    chunk_size: int = 500,
+    include_ongoing: bool = False,
+    report=print,
+) -> dict:
+    totals = {"games": 0, "players": 0, "rounds": 0, "repaired": 0}
+
+    def collect(future):
+        result = future.result()
+        totals["games"] += result["games"]
+        totals["players"] += len(result["players"])
+        totals["rounds"] += len(result["rounds"])
+        totals["repaired"] += result["repaired"]
+        for p in result["players"]:
+            report(
+                f"game {p['game_id']} player {p['player_id']}: "
+                f"score {p['score']} (rounds say {p['expected_score']}), "
+                f"wins {p['total_win']} (rounds say {p['expected_wins']})"
+            )
+        for g in result["rounds"]:
+            report(
+                f"game {g['id']}: round_count {g['round_count']} "
+                f"(rounds say {g['expected_rounds']})"
+            )
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker) as pool:
+        pending = set()
+        for shard in shard_router.engines:
+            for game_ids in _stream_game_ids(shard, chunk_size, include_ongoing):
+                # Keep only a few chunks in flight, so memory stays flat
+                # however many games there are.
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+                pending.add(pool.submit(check_games, shard, game_ids, repair))
+        for future in wait(pending).done:
+            collect(future)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repair", action="store_true")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--include-ongoing", action="store_true")
+    args = parser.parse_args()
+
+    totals = verify(args.repair, args.workers, args.chunk_size, args.include_ongoing)
+    print(
+        f"Checked {totals['games']} games: {totals['players']} players and "
+        f"{totals['rounds']} games drifted, {totals['repaired']} rows repaired"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,119 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse
+from src.auth.models import User
 from src.auth.router import router as auth_router
-from src.core.database import Base, engine
+from src.auth.service import run_revocation_sync, run_session_sweeper
+from src.core.database import (
+    Base,
+    SessionLocal,
+    engine,
+    is_sqlite,
+    read_engine,
+    warm_pool,
+)
 from fastapi.middleware.cors import CORSMiddleware
+from src.core.cache import InvalidationListener
 from src.core.config import settings
+from src.core.http import close_http_client
+from src.core.log import configure_logging, shutdown_logging
+from src.core.metrics import MetricsMiddleware, registry
+from src.core.partitions import run_partition_maintenance
+from src.core.shards import shard_router
+from src.dependencies import PRIMARY_PIN_COOKIE, find_session
+from src.game.audit import audit_log
+from src.game.engine import game_engine, run_idle_eviction
+from src.game.lifecycle import run_game_timers
 from src.game.router import router as game_router
 
 
-Base.metadata.create_all(bind=engine)
+def warm_hot_statements():
+    # Run the per-request auth lookups once so their compiled SQL is already
+    # in the engine's statement cache when the first real request arrives.
+    db = SessionLocal()
+    try:
+        find_session(db, "")
+        db.get(User, 0)
+    finally:
+        db.close()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging(settings.LOG_LEVEL, settings.LOG_SAMPLE_RATE)
+    # Schema changes belong to Alembic; create_all is only for throwaway
+    # local databases and SQLite, which the Postgres migrations don't cover.
+    if settings.CREATE_SCHEMA or is_sqlite:
+        for bind in shard_router.engines.values():
+            Base.metadata.create_all(bind=bind)
+    if settings.DB_POOL_WARM > 0:
+        warm_pool(settings.DB_POOL_WARM)
+        warm_hot_statements()
+    # LISTEN/NOTIFY and partitions are Postgres-only; a SQLite deployment is
+    # a single process with one unpartitioned file.
+    listeners = []
+    if not is_sqlite:
+        # Invalidations are NOTIFYed on whichever shard the write went to.
+        listeners = [
+            InvalidationListener(bind) for bind in shard_router.engines.values()
+        ]
+        for listener in listeners:
+            listener.start()
+    audit_log.start()
+    if settings.GAME_ENGINE:
+        game_engine.journal.start()
+    tasks = []
+    if settings.SESSION_SWEEP_SECONDS > 0:
+        tasks.append(
+            asyncio.create_task(
+                run_session_sweeper(
+                    settings.SESSION_SWEEP_SECONDS, settings.SESSION_SWEEP_BATCH
+                )
+            )
+        )
+    if settings.PARTITION_MAINTENANCE_SECONDS > 0 and not is_sqlite:
+        tasks.append(
+            asyncio.create_task(
+                run_partition_maintenance(
+                    settings.PARTITION_MAINTENANCE_SECONDS,
+                    settings.PARTITION_MONTHS_AHEAD,
+                    {
+                        "game_matches": settings.GAME_MATCHES_RETAIN_MONTHS,
+                        "game_logs": settings.GAME_LOGS_RETAIN_MONTHS,
+                    },
+                    settings.PARTITION_DROP_DETACHED,
+                    shard_router.engines.values(),
+                )
+            )
+        )
+    if settings.GAME_ENGINE and settings.GAME_ENGINE_IDLE_SECONDS > 0:
+        tasks.append(
+            asyncio.create_task(run_idle_eviction(settings.GAME_ENGINE_IDLE_SECONDS))
+        )
+    if settings.GAME_TIMER_TICK_SECONDS > 0:
+        tasks.append(asyncio.create_task(run_game_timers()))
+    if settings.SESSION_MODE == "signed":
+        tasks.append(
+            asyncio.create_task(run_revocation_sync(settings.REVOCATION_SYNC_SECONDS))
+        )
+    yield
+    for task in tasks:
+        task.cancel()
+    for listener in listeners:
+        listener.stop()
+    if settings.GAME_ENGINE:
+        game_engine.journal.stop()
+    audit_log.stop()
+    await close_http_client()
+    shard_router.dispose()
+    engine.dispose()
+    if read_engine is not None:
+        read_engine.dispose()
+    shutdown_logging()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 origins = [settings.FRONTEND_URL]
 
@@ -19,5 +124,40 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    MetricsMiddleware,
+    dev_mode=settings.DEV_MODE,
+    n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD,
+)
+
+
+if read_engine is not None:
+
+    @app.middleware("http")
+    async def pin_writers_to_primary(request: Request, call_next):
+        # Replica lag is usually well under READ_YOUR_WRITES_SECONDS, so the
+        # writer's next reads see its own change.
+        response = await call_next(request)
+        if request.method not in ("GET", "HEAD") and response.status_code < 400:
+            response.set_cookie(
+                key=PRIMARY_PIN_COOKIE,
+                value="1",
+                max_age=settings.READ_YOUR_WRITES_SECONDS,
+                httponly=True,
+                secure=settings.COOKIE_SECURE,
+                samesite=settings.COOKIE_SAMESITE,
+                domain=settings.COOKIE_DOMAIN,
+                path="/",
+            )
+        return response
+
+
 app.include_router(auth_router)
 app.include_router(game_router)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(
+        registry.render(), media_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,133 @@
+import os
+import secrets
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+
+# Settings are read when src is first imported, so the test environment has
+# to be in place before that. The default database is a throwaway SQLite
+# file; Postgres runs are opt-in through TEST_POSTGRES_URL.
+_tmp = tempfile.mkdtemp(prefix="uno-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/default.db")
+os.environ.setdefault("GOOGLE_CLIENT_ID", "test-client")
+os.environ.setdefault("GOOGLE_CLIENT_SECRET", "test-secret")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("FRONTEND_URL", "http://localhost:3000")
+os.environ.setdefault("FRONTEND_URL_DEV", "http://localhost:3000")
+os.environ.setdefault("BACKEND_URL", "http://localhost:8000")
+os.environ.setdefault("DB_POOL_WARM", "0")
+os.environ.setdefault("GAME_TIMER_TICK_SECONDS", "0")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from src.auth.models import OAuthSession, User
+from src.core.cache import local_cache
+from src.core.database import Base, SessionLocal, make_engine
+from src.core.idempotency import idempotency_store
+from src.core.shards import DEFAULT_SHARD, HashRing, shard_router
+from src.main import app as main_app  # registers every model on Base.metadata
+
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+def _postgres_engine():
+    if not POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL is not set")
+    bind = make_engine(POSTGRES_URL)
+    try:
+        with bind.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except Exception as exc:
+        bind.dispose()
+        pytest.skip(f"Postgres is not available: {exc}")
+    return bind
+
+
+def use_engines(monkeypatch, engines: dict):
+    """Point sessions and the shard router at ``engines`` for one test."""
+    monkeypatch.setattr(shard_router, "engines", engines)
+    monkeypatch.setattr(shard_router, "ring", HashRing(engines))
+    monkeypatch.setitem(SessionLocal.kw, "bind", engines[DEFAULT_SHARD])
+    local_cache.clear()
+    idempotency_store._entries.clear()
+
+
+def fresh_sqlite_engine(name: str = "db"):
+    return make_engine(f"sqlite:///{_tmp}/{name}-{uuid.uuid4().hex}.db")
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def db_engine(request, monkeypatch):
+    """A clean database on each backend; Postgres is skipped when absent."""
+    bind = fresh_sqlite_engine() if request.param == "sqlite" else _postgres_engine()
+    Base.metadata.drop_all(bind)
+    Base.metadata.create_all(bind)
+    use_engines(monkeypatch, {DEFAULT_SHARD: bind})
+    yield bind
+    local_cache.clear()
+    if request.param == "postgresql":
+        Base.metadata.drop_all(bind)
+    bind.dispose()
+
+
+@pytest.fixture
+def sqlite_engine(monkeypatch):
+    bind = fresh_sqlite_engine()
+    Base.metadata.create_all(bind)
+    use_engines(monkeypatch, {DEFAULT_SHARD: bind})
+    yield bind
+    local_cache.clear()
+    bind.dispose()
+
+
+def create_user(email: str = None) -> tuple[User, str]:
+    """A user with a live opaque session; returns it and the session token."""
+    db = SessionLocal()
+    try:
+        user = User(email=email or f"{uuid.uuid4().hex}@example.com", name="Tester")
+        db.add(user)
+        db.flush()
+        token = secrets.token_urlsafe(32)
+        db.add(
+            OAuthSession(
+                user_id=user.id,
+                session_token=token,
+                expires=datetime.utcnow() + timedelta(days=1),
+            )
+        )
+        db.commit()
+        db.refresh(user)
+        db.expunge(user)
+        return user, token
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def app():
+    return main_app
+
+
+def make_client(app, token: str) -> TestClient:
+    # No context manager: the lifespan (listeners, timers, audit writer)
+    # stays off, tests drive everything through the endpoints.
+    client = TestClient(app)
+    client.cookies.set("session_token", token)
+    return client
+
+
+@pytest.fixture
+def client(db_engine, app):
+    user, token = create_user()
+    client = make_client(app, token)
+    client.user = user
+    return client
+
+
+@pytest.fixture
+def sqlite_client(sqlite_engine, app):
+    user, token = create_user()
+    client = make_client(app, token)
+    client.user = user
+    return client
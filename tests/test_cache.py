@@ -0,0 +1,23 @@
+from sqlalchemy.orm import sessionmaker
+from src.core.cache import LocalCache, invalidate, local_cache
+
+
+def test_reads_keep_entries_from_eviction():
+    cache = LocalCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+
+def test_commit_evicts_from_any_session_factory(sqlite_engine):
+    local_cache.set("roster", ["Alice"])
+    db = sessionmaker(bind=sqlite_engine)()
+    try:
+        invalidate(db, "roster")
+        assert local_cache.get("roster") == ["Alice"]
+        db.commit()
+        assert local_cache.get("roster") is None
+    finally:
+        db.close()
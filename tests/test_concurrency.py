@@ -0,0 +1,71 @@
+import threading
+import uuid
+from collections import Counter
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from src.core.database import SessionLocal
+from src.core.shards import DEFAULT_SHARD
+from src.game.models import Game, GameMatch, GamePlayer
+from src.game.router import _add_winner
+from src.game.schemas import PlayerWinner
+from src.game.verify import check_games
+from tests.test_game_endpoints import add_players, start_game
+
+THREADS = 8
+ROUNDS_PER_THREAD = 20
+
+
+def test_concurrent_winners_keep_scoreboard_consistent(client):
+    ids = add_players(client, "Alice", "Bob", "Carol")
+    game_id = start_game(client, ids, end_condition="rounds", max_rounds=10_000)
+    outcomes = Counter()
+    lock = threading.Lock()
+    start = threading.Barrier(THREADS)
+
+    def play(worker: int):
+        start.wait()
+        for i in range(ROUNDS_PER_THREAD):
+            data = PlayerWinner(game_id=game_id, player_id=ids[(worker + i) % 3])
+            db = SessionLocal()
+            try:
+                _add_winner(data, client.user, db)
+                outcome = "ok"
+            except HTTPException as exc:
+                outcome = exc.status_code
+            finally:
+                db.close()
+            with lock:
+                outcomes[outcome] += 1
+
+    threads = [threading.Thread(target=play, args=(n,)) for n in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Losing the compare-and-swap too often is a 409, never a lost round.
+    assert set(outcomes) <= {"ok", 409}
+    assert sum(outcomes.values()) == THREADS * ROUNDS_PER_THREAD
+    game_uuid = uuid.UUID(game_id)
+    db = SessionLocal()
+    try:
+        round_count = db.execute(
+            select(Game.round_count).where(Game.id == game_uuid)
+        ).scalar()
+        rounds = db.execute(
+            select(func.count(func.distinct(GameMatch.round))).where(
+                GameMatch.game_id == game_uuid
+            )
+        ).scalar()
+        total = db.execute(
+            select(func.sum(GamePlayer.score)).where(GamePlayer.game_id == game_uuid)
+        ).scalar()
+    finally:
+        db.close()
+    assert round_count == rounds == outcomes["ok"]
+    assert total == 0
+
+    report = check_games(DEFAULT_SHARD, [game_uuid])
+    assert report["players"] == []
+    assert report["rounds"] == []
@@ -0,0 +1,194 @@
+import uuid
+
+from src.core.database import SessionLocal
+from src.game.archive import archive_game, unarchive_game
+from src.game.models import Game
+
+
+def add_players(client, *names):
+    for name in names:
+        response = client.post("/game/player", json={"name": name, "avatar": "a"})
+        assert response.status_code == 200, response.text
+    players = client.get("/game/players", params={"limit": 100}).json()["players"]
+    ids = {p["name"]: p["id"] for p in players}
+    return [ids[name] for name in names]
+
+
+def start_game(client, player_ids, **rules):
+    body = {"name": "Friday game", "game_players": player_ids, **rules}
+    response = client.post("/game/create", json=body)
+    assert response.status_code == 200, response.text
+    return response.json()["game_id"]
+
+
+def test_players(client):
+    alice, bob = add_players(client, "Alice", "Bob")
+
+    response = client.post("/game/player", json={"name": "alice", "avatar": "a"})
+    assert response.status_code == 422
+
+    summary = client.get("/game/players", params={"projection": "summary"}).json()
+    assert summary["total"] == 2
+    assert {tuple(sorted(p)) for p in summary["players"]} == {("id", "name")}
+
+    renamed = client.put(f"/game/player/{bob}", json={"name": "Bobby", "avatar": "b"})
+    assert renamed.status_code == 200
+    assert client.delete(f"/game/player/{alice}").status_code == 200
+    players = client.get("/game/players").json()["players"]
+    assert [p["name"] for p in players] == ["Bobby"]
+
+
+def test_create_and_ongoing(client):
+    ids = add_players(client, "Alice", "Bob", "Carol")
+    assert client.get("/game/ongoing").status_code == 404
+
+    game_id = start_game(client, ids, end_condition="rounds", max_rounds=10)
+    assert client.post(
+        "/game/create", json={"name": "Second", "game_players": ids}
+    ).status_code == 422
+
+    ongoing = client.get("/game/ongoing", params={"mode": "play"}).json()["data"]
+    assert ongoing["id"] == game_id
+    assert ongoing["total_players"] == 3
+    assert ongoing["match_data"] == 1
+
+
+def test_winner(client):
+    alice, bob, carol = add_players(client, "Alice", "Bob", "Carol")
+    game_id = start_game(client, [alice, bob, carol], end_condition="rounds")
+
+    response = client.put(
+        "/game/play/winner", json={"game_id": game_id, "player_id": alice}
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["winner"]["score"] == 2
+    assert body["winner"]["total_win"] == 1
+    assert body["game_ended"] is False
+
+    scores = {
+        p["id"]: p["score"]
+        for p in client.get(f"/game/players/{game_id}").json()["players"]
+    }
+    assert scores == {alice: 2, bob: -1, carol: -1}
+    ongoing = client.get("/game/ongoing", params={"mode": "play"}).json()["data"]
+    assert ongoing["match_data"] == 2
+
+
+def test_winner_ends_game_at_max_rounds(client):
+    alice, bob = add_players(client, "Alice", "Bob")
+    game_id = start_game(client, [alice, bob], end_condition="rounds", max_rounds=2)
+    body = {"game_id": game_id, "player_id": bob}
+
+    assert client.put("/game/play/winner", json=body).json()["game_ended"] is False
+    assert client.put("/game/play/winner", json=body).json()["game_ended"] is True
+    assert client.get("/game/ongoing").status_code == 404
+    assert client.put("/game/play/winner", json=body).status_code == 404
+
+
+def test_rounds(client):
+    alice, bob, carol = add_players(client, "Alice", "Bob", "Carol")
+    game_id = start_game(client, [alice, bob, carol], end_condition="rounds")
+    events = [
+        {"player_id": alice},
+        {"type": "status", "player_id": carol, "status": "disabled"},
+        {"player_id": bob},
+    ]
+
+    response = client.post(
+        "/game/play/rounds", json={"game_id": game_id, "events": events}
+    )
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["rounds"] == 2
+    scores = {p["id"]: p["score"] for p in body["players"]}
+    assert scores == {alice: 1, bob: 0, carol: -1}
+
+    unknown = [{"player_id": "00000000-0000-0000-0000-000000000000"}]
+    response = client.post(
+        "/game/play/rounds", json={"game_id": game_id, "events": unknown}
+    )
+    assert response.status_code == 404
+
+
+def test_history_and_recent(client):
+    alice, bob = add_players(client, "Alice", "Bob")
+    game_id = start_game(client, [alice, bob], end_condition="score")
+    assert client.get("/game/recent").json()["games"][0]["winner"] == []
+
+    client.put("/game/play/winner", json={"game_id": game_id, "player_id": bob})
+    assert client.post("/game/ongoing/end").status_code == 200
+
+    history = client.get(f"/game/history/{game_id}").json()
+    assert history["game"]["status"] == "completed"
+    assert [m["winner_id"] for m in history["matches"]] == [bob]
+    assert history["winners"] == [{"player_id": bob, "name": "Bob"}]
+
+    recent = client.get("/game/recent").json()["games"]
+    assert len(recent) == 1
+    assert recent[0]["player_count"] == 2
+    assert recent[0]["winner"] == [{"player_id": bob, "player_name": "Bob"}]
+    summary = client.get("/game/recent", params={"fields": "name"}).json()["games"]
+    assert summary == [{"id": game_id, "name": "Friday game"}]
+
+    assert client.delete(f"/game/player/{alice}").status_code == 200
+    db = SessionLocal()
+    try:
+        assert db.get(Game, uuid.UUID(game_id)).player_count == 2
+    finally:
+        db.close()
+
+
+def test_sync(client):
+    first = client.get("/game/sync").json()
+    assert first["seq"] == 0
+
+    alice, bob = add_players(client, "Alice", "Bob")
+    game_id = start_game(client, [alice, bob], end_condition="score")
+    client.put("/game/play/winner", json={"game_id": game_id, "player_id": alice})
+
+    changes = client.get("/game/sync").json()
+    assert {p["id"] for p in changes["players"]} == {alice, bob}
+    assert [g["id"] for g in changes["games"]] == [game_id]
+    assert len(changes["rounds"]) == 1
+
+    client.delete(f"/game/player/{bob}")
+    later = client.get("/game/sync", params={"since": changes["seq"]}).json()
+    assert later["deleted"] == [{"entity": "player", "id": bob}]
+    assert later["seq"] > changes["seq"]
+
+
+
+def test_sync_archived_game(client):
+    alice, bob = add_players(client, "Alice", "Bob")
+    game_id = start_game(client, [alice, bob], end_condition="score")
+    client.put("/game/play/winner", json={"game_id": game_id, "player_id": bob})
+    assert client.post("/game/ongoing/end").status_code == 200
+    seq = client.get("/game/sync").json()["seq"]
+
+    db = SessionLocal()
+    try:
+        archive_game(db, db.get(Game, uuid.UUID(game_id)))
+    finally:
+        db.close()
+
+    changes = client.get("/game/sync", params={"since": seq}).json()
+    assert changes["deleted"] == []
+    [game] = changes["games"]
+    assert game["archived"] is True
+    scores = {p["player_id"]: p["score"] for p in game["players"]}
+    assert scores == {alice: -1, bob: 1}
+
+    # A client that never synced gets the rounds from the archive.
+    everything = client.get("/game/sync").json()
+    assert everything["deleted"] == []
+    assert [r["winner_id"] for r in everything["rounds"]] == [bob]
+
+    db = SessionLocal()
+    try:
+        assert unarchive_game(db, uuid.UUID(game_id))
+    finally:
+        db.close()
+    restored = client.get("/game/sync", params={"since": changes["seq"]}).json()
+    assert [g["archived"] for g in restored["games"]] == [False]
+    assert len(restored["games"][0]["players"]) == 2
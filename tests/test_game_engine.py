@@ -0,0 +1,184 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+from src.core.config import settings
+from src.core.database import SessionLocal
+from src.game import engine
+from src.game.engine import WriteBehindJournal, game_engine
+from src.game.models import Game
+from tests.test_game_endpoints import add_players, start_game
+
+
+class FlakyJournal(WriteBehindJournal):
+    """Records what would be written; fails for the games in ``broken``."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.broken = set()
+        self.written = []
+        self.evicted = []
+        self.on_quarantine = self.evicted.append
+
+    def _write(self, shard, entries):
+        if self.broken & {e["game_id"] for e in entries}:
+            raise RuntimeError("database says no")
+        self.written.extend(entries)
+
+
+def entry(game_id):
+    return {
+        "game_id": game_id,
+        "game_version": 0,
+        "player_group": "usergroup_test",
+        "players": [],
+    }
+
+
+@pytest.fixture
+def audited(monkeypatch):
+    """Entries the journal quarantined into the audit log."""
+    rows = []
+
+    def log(game_id, action, player_id=None, details=None):
+        if action == "journal_quarantined":
+            rows.append({"game_id": game_id, "details": details})
+
+    monkeypatch.setattr(engine.audit_log, "log", log)
+    return rows
+
+
+def test_failing_game_does_not_block_others(audited):
+    journal = FlakyJournal(max_attempts=3)
+    good, bad = uuid.uuid4(), uuid.uuid4()
+    journal.broken.add(bad)
+
+    journal.append(entry(good))
+    journal.append(entry(bad))
+    with pytest.raises(RuntimeError):
+        journal.flush(bad)
+    assert [e["game_id"] for e in journal.written] == [good]
+
+    # Every flush is another pass for bad; good's entries are not held up.
+    journal.append(entry(good))
+    journal.flush(good)
+    assert [e["game_id"] for e in journal.written] == [good, good]
+    assert journal.evicted == []
+
+    # The third failed pass sets bad's entries aside, reports them to the
+    # caller and evicts the game.
+    journal.append(entry(bad))
+    with pytest.raises(RuntimeError):
+        journal.flush()
+    assert journal.evicted == [bad]
+    assert journal.quarantined == 2
+    assert [len(a["details"]["entries"]) for a in audited] == [2]
+    assert journal._pending == []
+    journal.flush()
+
+
+def test_pending_entries_are_capped(audited):
+    journal = FlakyJournal(max_pending=4, max_attempts=100)
+    games = [uuid.uuid4() for _ in range(3)]
+    journal.broken.update(games)
+    for game_id in games:
+        journal.append(entry(game_id))
+        journal.append(entry(game_id))
+        with pytest.raises(RuntimeError):
+            journal.flush()
+    # Six entries waiting, four allowed: the oldest game goes.
+    assert journal.evicted == [games[0]]
+    assert len(journal._pending) == 4
+
+
+def test_engine_rounds_reach_database(client, monkeypatch):
+    monkeypatch.setattr(settings, "GAME_ENGINE", True)
+    alice, bob = add_players(client, "Alice", "Bob")
+    game_id = start_game(client, [alice, bob], end_condition="rounds")
+    body = {"game_id": game_id, "player_id": alice}
+    for _ in range(3):
+        assert client.put("/game/play/winner", json=body).status_code == 200
+
+    game_engine.release(game_id)
+    history = client.get(f"/game/history/{game_id}").json()
+    assert [m["round"] for m in history["matches"]] == [1, 2, 3]
+    scores = {
+        p["id"]: p["score"]
+        for p in client.get(f"/game/players/{game_id}").json()["players"]
+    }
+    assert scores == {alice: 3, bob: -3}
+
+
+def scores(client, game_id):
+    players = client.get(f"/game/players/{game_id}").json()["players"]
+    return {p["id"]: p["score"] for p in players}
+
+
+@pytest.fixture
+def live_game(client, monkeypatch):
+    """An ongoing game of Alice and Bob played through the game engine."""
+    monkeypatch.setattr(settings, "GAME_ENGINE", True)
+    alice, bob = add_players(client, "Alice", "Bob")
+    game_id = start_game(client, [alice, bob], end_condition="rounds")
+    yield game_id, alice, bob
+    engine_game = game_engine.peek(game_id, "usergroup_" + str(client.user.id))
+    if engine_game is not None:
+        game_engine._evict(engine_game.id)
+
+
+def test_full_journal_refuses_rounds_before_they_count(client, live_game, monkeypatch):
+    game_id, alice, bob = live_game
+    journal = WriteBehindJournal(max_pending=1)
+    monkeypatch.setattr(game_engine, "journal", journal)
+    body = {"game_id": game_id, "player_id": alice}
+    assert client.put("/game/play/winner", json=body).status_code == 200
+    assert client.put("/game/play/winner", json=body).status_code == 503
+    assert scores(client, game_id) == {alice: 1, bob: -1}
+
+
+def test_rounds_wait_while_the_game_changes_in_the_database(client, live_game):
+    game_id, alice, bob = live_game
+    body = {"game_id": game_id, "player_id": alice}
+    assert client.put("/game/play/winner", json=body).status_code == 200
+    with game_engine.released(game_id):
+        assert client.put("/game/play/winner", json=body).status_code == 409
+    assert client.put("/game/play/winner", json=body).status_code == 200
+    game_engine.release(game_id)
+    assert scores(client, game_id) == {alice: 2, bob: -2}
+
+
+def test_game_changed_behind_the_engine_is_quarantined(client, live_game, audited):
+    game_id, alice, bob = live_game
+    body = {"game_id": game_id, "player_id": alice}
+    assert client.put("/game/play/winner", json=body).status_code == 200
+    # Another process ends the game without going through this engine.
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(Game)
+            .where(Game.id == uuid.UUID(game_id))
+            .values(status="completed", version=Game.version + 1)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    with pytest.raises(RuntimeError):
+        game_engine.journal.flush()
+    assert [a["game_id"] for a in audited] == [uuid.UUID(game_id)]
+    assert game_engine.peek(game_id, "usergroup_" + str(client.user.id)) is None
+    assert scores(client, game_id) == {alice: 0, bob: 0}
+
+
+def test_idle_games_leave_memory(client, live_game):
+    game_id, alice, bob = live_game
+    body = {"game_id": game_id, "player_id": alice}
+    assert client.put("/game/play/winner", json=body).status_code == 200
+    group = "usergroup_" + str(client.user.id)
+    assert game_engine.evict_idle(60) == 0
+
+    game_engine.peek(game_id, group).last_used -= 120
+    assert game_engine.evict_idle(60) == 1
+    assert game_engine.peek(game_id, group) is None
+    assert scores(client, game_id) == {alice: 1, bob: -1}
@@ -0,0 +1,195 @@
+import asyncio
+import datetime
+import time
+from http.cookies import SimpleCookie
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from google.auth import crypt
+from google.auth import jwt as google_jwt
+from jose import jwt as jose_jwt
+from src.auth import service
+from src.core import http
+from src.core.config import settings
+
+
+def make_signer():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "test")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(1)
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    certs = {"test-kid": cert.public_bytes(serialization.Encoding.PEM).decode()}
+    return crypt.RSASigner.from_string(pem, key_id="test-kid"), certs
+
+
+SIGNER, CERTS = make_signer()
+
+
+class FakeGoogle:
+    """Stands in for GOOGLE_TOKEN_URL and GOOGLE_CERTS_URL."""
+
+    def __init__(self, issuer: str = "https://accounts.google.com"):
+        self.issuer = issuer
+        self.cert_fetches = 0
+        self.max_age = 3600
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        if str(request.url) == settings.GOOGLE_CERTS_URL:
+            self.cert_fetches += 1
+            await asyncio.sleep(0.01)  # long enough for logins to pile up
+            headers = {}
+            if self.max_age is not None:
+                headers["cache-control"] = f"public, max-age={self.max_age}"
+            return httpx.Response(200, json=CERTS, headers=headers)
+        assert str(request.url) == settings.GOOGLE_TOKEN_URL
+        now = int(time.time())
+        id_token = google_jwt.encode(
+            SIGNER,
+            {
+                "iss": self.issuer,
+                "aud": settings.GOOGLE_CLIENT_ID,
+                "sub": "1234",
+                "email": "player@example.com",
+                "name": "Player",
+                "iat": now,
+                "exp": now + 600,
+            },
+        )
+        return httpx.Response(200, json={"id_token": id_token.decode()})
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def google(monkeypatch):
+    fake = FakeGoogle()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(fake))
+    monkeypatch.setattr(http, "_client", client)
+    monkeypatch.setattr(
+        service, "google_certs", service.GoogleCertCache(settings.GOOGLE_CERTS_URL)
+    )
+    clock = Clock()
+    monkeypatch.setattr(service, "time", SimpleNamespace(monotonic=clock.monotonic))
+    fake.clock = clock
+    return fake
+
+
+def login():
+    return service.exchange_code("code", redirect_uri="http://localhost/callback")
+
+
+def test_certs_fetched_once_within_max_age(google):
+    async def scenario():
+        first = await login()
+        google.clock.now += 3599
+        second = await login()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first["email"] == second["email"] == "player@example.com"
+    assert google.cert_fetches == 1
+
+
+def test_certs_refetched_after_expiry(google):
+    async def scenario():
+        await login()
+        google.clock.now += 3600
+        await login()
+
+    asyncio.run(scenario())
+    assert google.cert_fetches == 2
+
+
+def test_certs_kept_for_default_ttl_without_max_age(google):
+    google.max_age = None
+
+    async def scenario():
+        await login()
+        google.clock.now += 3599
+        await login()
+        google.clock.now += 1
+        await login()
+
+    asyncio.run(scenario())
+    assert google.cert_fetches == 2
+
+
+def test_wrong_issuer_rejected(google):
+    google.issuer = "https://evil.example.com"
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(login())
+    assert exc.value.status_code == 400
+    assert "Wrong issuer" in exc.value.detail
+
+
+def test_concurrent_logins_share_one_fetch(google):
+    async def scenario():
+        return await asyncio.gather(*(login() for _ in range(20)))
+
+    results = asyncio.run(scenario())
+    assert {r["email"] for r in results} == {"player@example.com"}
+    assert google.cert_fetches == 1
+
+
+def test_callback_signs_in(google, sqlite_engine, app):
+    client = TestClient(app)
+    response = client.get(
+        "/auth/callback", params={"code": "code"}, follow_redirects=False
+    )
+    assert response.status_code == 303
+    # Set for the production domain, so the test client won't keep it.
+    token = SimpleCookie(response.headers["set-cookie"])["session_token"].value
+
+    client.cookies.set("session_token", token)
+    me = client.get("/auth/me")
+    assert me.status_code == 200, me.text
+    assert me.json()["email"] == "player@example.com"
+    assert google.cert_fetches == 1
+
+
+def test_signed_session_jti_is_not_a_session_token(
+    google, sqlite_engine, app, monkeypatch
+):
+    monkeypatch.setattr(settings, "SESSION_MODE", "signed")
+    client = TestClient(app)
+    response = client.get(
+        "/auth/callback", params={"code": "code"}, follow_redirects=False
+    )
+    token = SimpleCookie(response.headers["set-cookie"])["session_token"].value
+    jti = jose_jwt.get_unverified_claims(token)["jti"]
+
+    client.cookies.set("session_token", jti)
+    assert client.get("/auth/me").status_code == 401
+
+    client.cookies.set("session_token", token)
+    assert client.get("/auth/me").status_code == 200
+    assert client.post("/auth/logout").status_code == 200
+    client.cookies.set("session_token", token)
+    assert client.get("/auth/me").status_code == 401
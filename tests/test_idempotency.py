@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+from fastapi import HTTPException
+from src.core.idempotency import IdempotencyStore
+
+
+def start_request(store, key):
+    """Run a request with ``key`` in a thread until the returned event is set."""
+    started, release = threading.Event(), threading.Event()
+
+    def handler():
+        started.set()
+        return release.wait()
+
+    thread = threading.Thread(target=store.run, args=(key, "f", handler))
+    thread.start()
+    started.wait()
+    return thread, release
+
+
+def test_retry_gets_stored_response():
+    store = IdempotencyStore()
+    calls = []
+    assert store.run("k", "f", lambda: calls.append(1) or "first") == "first"
+    assert store.run("k", "f", lambda: calls.append(1) or "second") == "first"
+    assert calls == [1]
+
+
+def test_retry_gives_up_waiting_on_a_running_request():
+    store = IdempotencyStore(wait_timeout=0.05)
+    thread, release = start_request(store, "k")
+    try:
+        with pytest.raises(HTTPException) as exc:
+            store.run("k", "f", lambda: "duplicate")
+        assert exc.value.status_code == 409
+    finally:
+        release.set()
+        thread.join()
+    assert store.run("k", "f", lambda: "duplicate") is True
+
+
+def test_running_requests_are_not_evicted():
+    store = IdempotencyStore(max_entries=2)
+    thread, release = start_request(store, "running")
+    try:
+        for key in ("a", "b", "c"):
+            store.run(key, "f", lambda: key)
+        assert list(store._entries) == ["running", "c"]
+    finally:
+        release.set()
+        thread.join()
@@ -0,0 +1,63 @@
+import json
+import logging
+import queue
+import sys
+
+from src.core.log import (
+    REDACTED,
+    DrainingQueueListener,
+    DroppingQueueHandler,
+    JSONFormatter,
+)
+
+
+def format_record(msg, *args, exc_info=None, **extra):
+    record = logging.getLogger("test").makeRecord(
+        "test", logging.ERROR, __file__, 1, msg, args, exc_info, extra=extra
+    )
+    return json.loads(JSONFormatter().format(record))
+
+
+def test_message_is_redacted():
+    line = format_record(
+        "Token exchange failed: %s", {"error": "bad", "client_secret": "s3cr3t"}
+    )
+    assert "s3cr3t" not in line["msg"]
+    assert "'error': 'bad'" in line["msg"]
+    assert f"'client_secret': '{REDACTED}'" in line["msg"]
+
+
+def test_exception_text_is_redacted():
+    try:
+        raise ValueError("callback?code=4/abc&state=x, Authorization: Bearer eyJ.x.y")
+    except ValueError:
+        line = format_record("Login failed", exc_info=sys.exc_info())
+    assert "4/abc" not in line["exc"]
+    assert "eyJ.x.y" not in line["exc"]
+    assert "state=x" in line["exc"]
+
+
+def test_extra_fields_are_redacted():
+    line = format_record(
+        "Request", session_token="abc", url="/auth/callback?code=xyz", status_code=400
+    )
+    assert line["session_token"] == REDACTED
+    assert line["url"] == f"/auth/callback?code={REDACTED}"
+    assert line["status_code"] == 400
+
+
+def test_listener_stops_with_a_full_queue():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    written = []
+    sink = logging.Handler()
+    sink.emit = written.append
+    listener = DrainingQueueListener(handler.queue, sink)
+    logger = logging.getLogger("test.full")
+    logger.addHandler(handler)
+    logger.propagate = False
+    for i in range(5):
+        logger.warning("record %d", i)
+    listener.start()
+    listener.stop()
+    assert len(written) == 2
+    assert handler.dropped == 3
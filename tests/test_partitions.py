@@ -0,0 +1,40 @@
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy import text
+from src.core.partitions import maintain_partitions
+from src.game.models import GameMatch
+
+
+def count(conn, table: str) -> int:
+    return conn.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+
+
+def test_maintenance_moves_rows_out_of_default_partition(db_engine):
+    if db_engine.dialect.name != "postgresql":
+        pytest.skip("partitions are Postgres-only")
+    old = datetime.datetime(2020, 3, 14, 12, 0)
+    with db_engine.begin() as conn:
+        conn.execute(
+            GameMatch.__table__.insert(),
+            {
+                "id": uuid.uuid4(),
+                "game_id": uuid.uuid4(),
+                "round": 1,
+                "created_at": old,
+                "updated_at": old,
+            },
+        )
+        assert count(conn, "game_matches_default") == 1
+
+    with db_engine.begin() as conn:
+        assert maintain_partitions(conn, months_ahead=1, retain_months={})
+
+    with db_engine.connect() as conn:
+        assert count(conn, "game_matches_default") == 0
+        assert count(conn, "game_matches_p2020_03") == 1
+        assert count(conn, "game_matches") == 1
+        this_month = datetime.date.today().replace(day=1)
+        current = f"game_matches_p{this_month.year:04d}_{this_month.month:02d}"
+        assert conn.execute(text("SELECT to_regclass(:n)"), {"n": current}).scalar()
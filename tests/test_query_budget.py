@@ -0,0 +1,61 @@
+import pytest
+from src.core.database import assert_query_budget
+from tests.test_game_endpoints import add_players, start_game
+
+PLAYERS = 8
+
+# Statements per request, authentication included. None of them may grow
+# with the number of players, rounds or games.
+BUDGETS = {
+    "players": 4,
+    "game_players": 3,
+    "ongoing": 3,
+    "ongoing_play": 3,
+    "winner": 11,
+    "rounds": 11,
+    "history": 7,
+    "recent": 4,
+    "sync": 8,
+}
+
+
+def request(client, name, game_id, ids):
+    if name == "players":
+        return client.get("/game/players")
+    if name == "game_players":
+        return client.get(f"/game/players/{game_id}")
+    if name == "ongoing":
+        return client.get("/game/ongoing")
+    if name == "ongoing_play":
+        return client.get("/game/ongoing", params={"mode": "play"})
+    if name == "winner":
+        body = {"game_id": game_id, "player_id": ids[0]}
+        return client.put("/game/play/winner", json=body)
+    if name == "rounds":
+        events = [{"player_id": player_id} for player_id in ids]
+        return client.post(
+            "/game/play/rounds", json={"game_id": game_id, "events": events}
+        )
+    if name == "history":
+        return client.get(f"/game/history/{game_id}")
+    if name == "recent":
+        return client.get("/game/recent")
+    return client.get("/game/sync")
+
+
+@pytest.mark.parametrize("name", BUDGETS)
+def test_query_budget(client, name):
+    ids = add_players(client, *(f"Player {i}" for i in range(PLAYERS)))
+    # A finished game and a running one with a few rounds, so list
+    # endpoints have several rows to (not) loop over.
+    for game in range(2):
+        game_id = start_game(client, ids, end_condition="rounds", max_rounds=100)
+        for player_id in ids:
+            body = {"game_id": game_id, "player_id": player_id}
+            assert client.put("/game/play/winner", json=body).status_code == 200
+        if game == 0:
+            assert client.post("/game/ongoing/end").status_code == 200
+
+    with assert_query_budget(BUDGETS[name]):
+        response = request(client, name, game_id, ids)
+    assert response.status_code == 200, response.text
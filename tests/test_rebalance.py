@@ -0,0 +1,115 @@
+import datetime
+import uuid
+
+import pytest
+from sqlalchemy import func, select, text
+from src.core.database import Base
+from src.core.shards import DEFAULT_SHARD, shard_router
+from src.game.models import Game, GameMatch, GamePlayer, Player
+from src.game.rebalance import copy_group, move_group, purge_group
+from tests.conftest import (
+    _postgres_engine,
+    create_user,
+    fresh_sqlite_engine,
+    make_client,
+    use_engines,
+)
+from tests.test_game_endpoints import add_players, start_game
+
+
+@pytest.fixture
+def shards(monkeypatch):
+    engines = {
+        DEFAULT_SHARD: fresh_sqlite_engine("default"),
+        "b": fresh_sqlite_engine("b"),
+    }
+    for bind in engines.values():
+        Base.metadata.create_all(bind)
+    use_engines(monkeypatch, engines)
+    yield engines
+    for bind in engines.values():
+        bind.dispose()
+
+
+def count(shard: str, model, group: str) -> int:
+    db = shard_router.session(shard)
+    try:
+        query = select(func.count()).select_from(model)
+        if model in (GamePlayer, GameMatch):
+            query = query.join(Game, Game.id == model.game_id)
+            model = Game
+        return db.execute(query.where(model.player_group == group)).scalar()
+    finally:
+        db.close()
+
+
+def test_move_and_purge_group(shards, app):
+    user, token = create_user()
+    client = make_client(app, token)
+    group = "usergroup_" + str(user.id)
+    source = shard_router.locate(group)[0]
+    target = next(name for name in shards if name != source)
+
+    alice, bob = add_players(client, "Alice", "Bob")
+    game_id = start_game(client, [alice, bob], end_condition="score")
+    client.put("/game/play/winner", json={"game_id": game_id, "player_id": alice})
+
+    copied = move_group(group, target, drain_seconds=0)
+    assert copied > 0
+    assert shard_router.locate(group) == (target, False)
+    for model, rows in ((Player, 2), (Game, 1), (GamePlayer, 2), (GameMatch, 1)):
+        assert count(target, model, group) == rows
+        assert count(source, model, group) == 0
+
+    # Served from the new shard, and writes are accepted there again.
+    players = client.get(f"/game/players/{game_id}").json()["players"]
+    assert {p["id"]: p["score"] for p in players} == {alice: 1, bob: -1}
+    response = client.put(
+        "/game/play/winner", json={"game_id": game_id, "player_id": bob}
+    )
+    assert response.status_code == 200, response.text
+    assert count(target, GameMatch, group) == 2
+
+    with pytest.raises(ValueError):
+        purge_group(group, target)
+    assert purge_group(group, source) == 0
+
+    # Leftovers from an interrupted move are what purge is for.
+    leftovers = copy_group(group, target, source)
+    assert count(source, Game, group) == 1
+    assert purge_group(group, source) == leftovers
+    assert count(source, Game, group) == 0
+    assert count(target, Game, group) == 1
+
+
+def test_copy_creates_partitions_on_postgres_target(monkeypatch):
+    target = _postgres_engine()
+    Base.metadata.drop_all(target)
+    Base.metadata.create_all(target)
+    source = fresh_sqlite_engine("source")
+    Base.metadata.create_all(source)
+    use_engines(monkeypatch, {DEFAULT_SHARD: source, "pg": target})
+    group = "usergroup_moved"
+    old = datetime.datetime(2021, 5, 2, 9, 30)
+    db = shard_router.session(DEFAULT_SHARD)
+    try:
+        game = Game(
+            id=uuid.uuid4(), name="Old", player_group=group, end_condition="score"
+        )
+        db.add(game)
+        db.add(GameMatch(game_id=game.id, round=1, created_at=old, updated_at=old))
+        db.commit()
+    finally:
+        db.close()
+
+    try:
+        assert copy_group(group, DEFAULT_SHARD, "pg") == 2
+        with target.connect() as conn:
+            moved = conn.execute(text("SELECT count(*) FROM game_matches_p2021_05"))
+            assert moved.scalar() == 1
+            rest = conn.execute(text("SELECT count(*) FROM game_matches_default"))
+            assert rest.scalar() == 0
+    finally:
+        Base.metadata.drop_all(target)
+        target.dispose()
+        source.dispose()
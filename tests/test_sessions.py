@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+from src.auth.models import OAuthSession
+from src.auth.service import _SWEEP_LOCK_ID, sweep_expired_sessions
+from src.core.database import SessionLocal
+from src.dependencies import get_current_user
+from src.main import warm_hot_statements
+
+from tests.conftest import create_user
+
+
+def expire_sessions(db, count: int):
+    for _ in range(count):
+        _, token = create_user()
+        db.query(OAuthSession).filter_by(session_token=token).update(
+            {"expires": datetime.utcnow() - timedelta(minutes=1)}
+        )
+        db.commit()
+
+
+def test_sweep_removes_expired_sessions(db_engine):
+    db = SessionLocal()
+    try:
+        expire_sessions(db, 3)
+        live, _ = create_user()
+        assert sweep_expired_sessions(db, batch_size=2) == 3
+        assert [s.user_id for s in db.query(OAuthSession)] == [live.id]
+    finally:
+        db.close()
+
+
+def test_sweep_skipped_while_another_worker_sweeps(db_engine):
+    if db_engine.dialect.name != "postgresql":
+        pytest.skip("advisory locks are Postgres-only")
+    db = SessionLocal()
+    try:
+        expire_sessions(db, 2)
+        with db_engine.begin() as other:
+            other.execute(
+                text("SELECT pg_advisory_xact_lock(:id)"), {"id": _SWEEP_LOCK_ID}
+            )
+            assert sweep_expired_sessions(db, batch_size=10) == 0
+        assert sweep_expired_sessions(db, batch_size=10) == 2
+    finally:
+        db.close()
+
+
+def test_warm_up_compiles_the_auth_lookups(sqlite_engine):
+    user, token = create_user()
+    warm_hot_statements()
+    compiled = len(sqlite_engine._compiled_cache)
+    db = SessionLocal()
+    try:
+        assert get_current_user(token, db).id == user.id
+    finally:
+        db.close()
+    assert len(sqlite_engine._compiled_cache) == compiled
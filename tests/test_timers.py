@@ -0,0 +1,32 @@
+import asyncio
+import datetime
+import time
+import uuid
+
+from src.game.lifecycle import TimerWheel
+
+
+def test_failed_expiry_is_retried_with_backoff():
+    wheel = TimerWheel(tick=0.01, retry_base=0.05, retry_max=0.1)
+    attempts = []
+
+    def expire(game_id, player_group):
+        attempts.append(time.monotonic())
+        if len(attempts) < 4:
+            raise RuntimeError("database unavailable")
+
+    async def scenario():
+        now = datetime.datetime.now(datetime.timezone.utc)
+        wheel.schedule(uuid.uuid4(), "usergroup_1", now)
+        runner = asyncio.create_task(wheel.run(expire))
+        while len(attempts) < 4:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.2)
+        runner.cancel()
+
+    asyncio.run(scenario())
+    assert len(attempts) == 4
+    gaps = [b - a for a, b in zip(attempts, attempts[1:])]
+    # Timers fire on tick boundaries, so allow one tick of slack.
+    assert all(gap + 0.01 >= want for gap, want in zip(gaps, (0.05, 0.1, 0.1)))
+    assert wheel._failures == {}